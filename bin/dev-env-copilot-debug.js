@@ -39,12 +39,12 @@ function findPythonPackage() {
 
     if (fs.existsSync(srcPath)) {
         debug('Found local package');
-        return ['-m', 'dev_environment_mcp.mcp_server'];
+        return ['-m', 'dev_environment_mcp'];
     }
 
     debug('Using installed package fallback');
     // Fallback: try to run as installed package
-    return ['-m', 'dev_environment_mcp.mcp_server'];
+    return ['-m', 'dev_environment_mcp'];
 }
 
 async function findWorkingPython() {
@@ -32,32 +32,32 @@ function findPython() {
     throw new Error('Python not found. Please install Python 3.7 or later.');
 }
 
-// Get the path to the Python server
-function getServerPath() {
-    // This script is in bin/, server is in src/dev_environment_mcp/
-    const serverPath = path.join(__dirname, '..', 'src', 'dev_environment_mcp', 'server.py');
+// Get the directory holding the Python package
+function getSourcePath() {
+    // This script is in bin/, the package is in src/dev_environment_mcp/
+    const sourcePath = path.join(__dirname, '..', 'src');
     
-    if (!fs.existsSync(serverPath)) {
-        throw new Error(`MCP server not found at: ${serverPath}`);
+    if (!fs.existsSync(path.join(sourcePath, 'dev_environment_mcp', '__main__.py'))) {
+        throw new Error(`MCP server package not found in: ${sourcePath}`);
     }
     
-    return serverPath;
+    return sourcePath;
 }
 
 async function main() {
     try {
         const python = findPython();
-        const serverPath = getServerPath();
+        const sourcePath = getSourcePath();
         
         console.error(`Starting Dev Environment Copilot MCP Server...`);
         console.error(`Python: ${python}`);
-        console.error(`Server: ${serverPath}`);
+        console.error(`Package: ${sourcePath}`);
           // Start the Python MCP server
-        const serverProcess = spawn(python, [serverPath], {
+        const serverProcess = spawn(python, ['-m', 'dev_environment_mcp', ...process.argv.slice(2)], {
             stdio: ['inherit', 'inherit', 'inherit'],
             env: {
                 ...process.env,
-                PYTHONPATH: path.join(__dirname, '..', 'src')
+                PYTHONPATH: sourcePath
             }
         });
         
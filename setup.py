@@ -36,11 +36,12 @@ setup(
     
     # Dependencies
     install_requires=[
-        "mcp[cli]>=1.9.0",
+        "mcp[cli]>=1.30.0",
         "httpx",
         "pydantic>=2.7.0",
         "typer",
         "rich",
+        "tomli>=1.1.0; python_version < '3.11'",
     ],
     
     # Optional dependencies for development
@@ -52,13 +53,17 @@ setup(
             "ruff",
             "mypy",
         ],
+        "fast": [
+            "orjson>=3.0",
+        ],
     },
     
     # Console scripts / entry points
     entry_points={
         "console_scripts": [
-            "dev-env-copilot=dev_environment_mcp.mcp_server:main",
-            "dev-env-copilot-server=dev_environment_mcp.mcp_server:main",
+            "dev-env-copilot=dev_environment_mcp.__main__:cli",
+            "dev-env-copilot-server=dev_environment_mcp.__main__:cli",
+            "dev-env-copilot-loadgen=dev_environment_mcp.loadgen:cli",
         ],
     },
     
@@ -3,15 +3,36 @@ Development Environment MCP Server
 
 A Model Context Protocol server for intelligent environment detection
 and cross-platform development command assistance.
+
+Importing the package is deliberately cheap: submodules (and the ``mcp``
+dependency) are only loaded when one of the names below is first used.
 """
 
 __version__ = "1.0.0"
 __author__ = "Your Name"
 __email__ = "your.email@example.com"
 
-try:
-    from .server import EnvironmentMCPServer, main
-    __all__ = ["EnvironmentMCPServer", "main"]
-except ImportError:
-    # Handle case where server module is not yet available
-    __all__ = []
+# public name -> submodule that defines it
+_LAZY_EXPORTS = {
+    "main": "server",
+    "app": "server",
+    "EnvironmentDetector": "environment",
+    "EnvironmentInfo": "environment",
+    "CommandSyntaxProvider": "commands",
+}
+
+__all__ = list(_LAZY_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+    value = getattr(import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
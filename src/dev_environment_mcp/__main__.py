@@ -1,10 +1,121 @@
 #!/usr/bin/env python3
 """
 Entry point for running the dev_environment_mcp module
+
+``--version`` and ``--health-check`` are answered before the server (and
+its ``mcp`` dependency) is imported, so they stay cheap enough for health
+probes.
 """
 
-import anyio
-from .server import main
+import sys
+
+from . import __version__
+
+
+def _health_check() -> int:
+    """Check that runtime dependencies are installed without importing them"""
+    from importlib.util import find_spec
+    missing = [name for name in ("mcp", "anyio") if find_spec(name) is None]
+    if missing:
+        print(f"UNHEALTHY: missing {', '.join(missing)}", file=sys.stderr)
+        return 1
+    print("OK")
+    return 0
+
+
+def cli(argv=None) -> int:
+    """Command line entry point"""
+    argv = sys.argv[1:] if argv is None else argv
+
+    # Fast paths that must not pay for argparse or the server imports
+    if argv == ["--version"]:
+        print(f"dev-env-copilot {__version__}")
+        return 0
+    if argv == ["--health-check"]:
+        return _health_check()
+
+    import argparse
+    parser = argparse.ArgumentParser(
+        prog="dev-env-copilot",
+        description="MCP server for development environment detection",
+    )
+    parser.add_argument("--version", action="version",
+                        version=f"dev-env-copilot {__version__}")
+    parser.add_argument("--health-check", action="store_true",
+                        help="check that dependencies are installed and exit")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="report per-module import time and time to first "
+                             "initialize response, then exit")
+    parser.add_argument("--budget-ms", type=float,
+                        help="with --profile-startup, exit 1 if time to "
+                             "initialize exceeds this many milliseconds")
+    parser.add_argument("--json", action="store_true",
+                        help="with --profile-startup, print the report as JSON")
+    parser.add_argument("--workspace",
+                        help="workspace to detect and index in the background at "
+                             "startup (default: $DEV_ENV_MCP_WORKSPACE)")
+    parser.add_argument("--no-warmup", action="store_true",
+                        help="do not start environment detection until the "
+                             "first tool call")
+    parser.add_argument("--stats-file",
+                        help="write server metrics to this JSON file on shutdown "
+                             "(default: $DEV_ENV_MCP_STATS_FILE)")
+    parser.add_argument("--trace-file",
+                        help="export request tracing spans as JSON lines to this "
+                             "file (default: $DEV_ENV_MCP_TRACE_FILE)")
+    parser.add_argument("--transport", choices=["stdio", "http"], default="stdio",
+                        help="serve one client over stdio, or many over "
+                             "streamable HTTP (default: stdio)")
+    parser.add_argument("--host",
+                        help="with --transport http, address to listen on "
+                             "(default: 127.0.0.1)")
+    parser.add_argument("--allow-remote", action="store_true",
+                        help="with --transport http, allow --host to be a "
+                             "non-loopback address; the server has no "
+                             "authentication and its tools can read any path "
+                             "this process can")
+    parser.add_argument("--port", type=int,
+                        help="with --transport http, port to listen on (default: 8765)")
+    parser.add_argument("--uds",
+                        help="with --transport http, listen on this unix socket "
+                             "instead of a TCP port")
+    parser.add_argument("--max-sessions", type=int,
+                        help="with --transport http, concurrent sessions allowed; "
+                             "new sessions beyond this get HTTP 503 (default: 64)")
+    parser.add_argument("--session-idle-timeout", type=float,
+                        help="with --transport http, seconds before an idle "
+                             "session is closed (default: 1800)")
+    parser.add_argument("--compact-json", action="store_true",
+                        help="encode tool results without indentation "
+                             "(default: $DEV_ENV_MCP_JSON or pretty)")
+    args = parser.parse_args(argv)
+
+    if args.health_check:
+        return _health_check()
+    if args.profile_startup:
+        from .startup import profile_startup
+        return profile_startup(budget_ms=args.budget_ms, as_json=args.json)
+
+    import anyio
+    from .server import main
+    http = None
+    if args.transport == "http":
+        from .http_transport import HttpConfig, check_config
+        options = {
+            "host": args.host, "port": args.port, "uds": args.uds,
+            "max_sessions": args.max_sessions,
+            "session_idle_timeout": args.session_idle_timeout,
+        }
+        http = HttpConfig(allow_remote=args.allow_remote,
+                          **{k: v for k, v in options.items() if v is not None})
+        try:
+            check_config(http)
+        except ValueError as e:
+            parser.error(str(e))
+    anyio.run(main, args.workspace, not args.no_warmup, args.stats_file,
+              args.trace_file, http, True if args.compact_json else None)
+    return 0
+
 
 if __name__ == "__main__":
-    anyio.run(main)
+    sys.exit(cli())
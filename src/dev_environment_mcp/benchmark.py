@@ -0,0 +1,236 @@
+"""
+Benchmark suite
+
+Micro-benchmarks for environment detection, command syntax generation and
+``list_tools``, plus macro-benchmarks of JSON-RPC ``tools/call`` round trips
+against a server subprocess over stdio.
+
+    python -m dev_environment_mcp.benchmark run --output bench.json
+    python -m dev_environment_mcp.benchmark compare baseline.json bench.json
+
+``compare`` exits with status 1 when any benchmark's median is slower than
+the baseline by more than the threshold.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import anyio
+
+from . import __version__
+from .client import SAMPLE_TOOL_CALLS, StdioClient
+from .commands import CommandSyntaxProvider
+from .environment import EnvironmentDetector
+
+DEFAULT_ITERATIONS = 200
+DEFAULT_ROUND_TRIPS = 50
+DEFAULT_THRESHOLD = 0.25
+
+# Slowdowns smaller than this are timer noise on microsecond benchmarks
+DEFAULT_MIN_DELTA_MS = 0.01
+
+
+def summarize(samples_ms: List[float]) -> Dict[str, float]:
+    """Summary statistics for a list of durations in milliseconds"""
+    ordered = sorted(samples_ms)
+    return {
+        "iterations": len(ordered),
+        "min_ms": ordered[0],
+        "median_ms": statistics.median(ordered),
+        "mean_ms": statistics.fmean(ordered),
+        "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        "max_ms": ordered[-1],
+    }
+
+
+def measure(func: Callable[[], Any], iterations: int,
+            setup: Optional[Callable[[], Any]] = None) -> Dict[str, float]:
+    """Time ``func`` over ``iterations`` runs; ``setup`` runs untimed before each"""
+    samples = []
+    for _ in range(iterations):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000.0)
+    return summarize(samples)
+
+
+def bench_detection(iterations: int) -> Dict[str, Dict[str, float]]:
+    """detect_environment with fresh detectors (cold) and a primed one (warm)
+
+    Cold runs start without in-memory caches; persisted on-disk caches still
+    apply, as they would for a restarted server.
+    """
+    workspace = os.getcwd()
+    detectors: List[EnvironmentDetector] = []
+    results = {
+        "detect_environment.cold": measure(
+            lambda: detectors[-1].detect_environment(workspace),
+            max(1, iterations // 10),
+            setup=lambda: detectors.append(EnvironmentDetector(cache_ttl=0)),
+        ),
+    }
+    warm = EnvironmentDetector()
+    warm.detect_environment(workspace)
+    results["detect_environment.warm"] = measure(
+        lambda: warm.detect_environment(workspace), iterations)
+    return results
+
+
+def bench_command_syntax(iterations: int) -> Dict[str, Dict[str, float]]:
+    """get_command_syntax for every registered intent, memo cleared and hot"""
+    provider = CommandSyntaxProvider(EnvironmentDetector().detect_environment(os.getcwd()))
+    results = {}
+    for name in CommandSyntaxProvider.INTENTS:
+        results[f"get_command_syntax.{name}.cold"] = measure(
+            lambda: provider.get_command_syntax(name), iterations,
+            setup=CommandSyntaxProvider._memo.clear)
+        results[f"get_command_syntax.{name}.warm"] = measure(
+            lambda: provider.get_command_syntax(name), iterations)
+    return results
+
+
+def bench_list_tools(iterations: int) -> Dict[str, Dict[str, float]]:
+    """The list_tools handler, timed inside a single event loop"""
+    from .server import list_tools
+
+    async def run() -> List[float]:
+        samples = []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            await list_tools()
+            samples.append((time.perf_counter() - started) * 1000.0)
+        return samples
+
+    return {"list_tools": summarize(anyio.run(run))}
+
+
+def bench_round_trips(iterations: int) -> Dict[str, Dict[str, float]]:
+    """tools/list and tools/call round trips against a stdio server"""
+    results = {}
+    with StdioClient() as client:
+        client.initialize()
+        samples = []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            client.request("tools/list")
+            samples.append((time.perf_counter() - started) * 1000.0)
+        results["stdio.tools/list"] = summarize(samples)
+
+        for tool, arguments in SAMPLE_TOOL_CALLS.items():
+            samples = []
+            for _ in range(iterations):
+                started = time.perf_counter()
+                response = client.call_tool(tool, arguments)
+                samples.append((time.perf_counter() - started) * 1000.0)
+                if "error" in response:
+                    raise RuntimeError(f"{tool} failed: {response['error']}")
+            results[f"stdio.tools/call.{tool}"] = summarize(samples)
+    return results
+
+
+def run_suite(iterations: int = DEFAULT_ITERATIONS,
+              round_trips: int = DEFAULT_ROUND_TRIPS,
+              include_stdio: bool = True) -> Dict[str, Any]:
+    """Run every benchmark and return the machine-readable report"""
+    results: Dict[str, Dict[str, float]] = {}
+    results.update(bench_detection(iterations))
+    results.update(bench_command_syntax(iterations))
+    results.update(bench_list_tools(iterations))
+    if include_stdio:
+        results.update(bench_round_trips(round_trips))
+    return {
+        "meta": {
+            "version": __version__,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        },
+        "results": results,
+    }
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any],
+            threshold: float = DEFAULT_THRESHOLD,
+            min_delta_ms: float = DEFAULT_MIN_DELTA_MS) -> List[Dict[str, Any]]:
+    """Per-benchmark median ratios
+
+    An entry is a regression when its median is more than ``1 + threshold``
+    times the baseline and slower by at least ``min_delta_ms``.
+    """
+    rows = []
+    for name, now in sorted(current["results"].items()):
+        before = baseline["results"].get(name)
+        if before is None or before["median_ms"] <= 0:
+            continue
+        ratio = now["median_ms"] / before["median_ms"]
+        rows.append({
+            "name": name,
+            "baseline_ms": before["median_ms"],
+            "current_ms": now["median_ms"],
+            "ratio": ratio,
+            "regression": (ratio > 1.0 + threshold
+                           and now["median_ms"] - before["median_ms"] >= min_delta_ms),
+        })
+    return rows
+
+
+def _load(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m dev_environment_mcp.benchmark",
+                                     description="Run or compare performance benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the benchmark suite")
+    run_parser.add_argument("--output", "-o", help="write JSON results to this file")
+    run_parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS)
+    run_parser.add_argument("--round-trips", type=int, default=DEFAULT_ROUND_TRIPS)
+    run_parser.add_argument("--no-stdio", action="store_true",
+                            help="skip the server subprocess round-trip benchmarks")
+
+    compare_parser = commands.add_parser("compare", help="compare results to a baseline")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                                help="allowed slowdown as a fraction (default 0.25)")
+    compare_parser.add_argument("--min-delta-ms", type=float, default=DEFAULT_MIN_DELTA_MS,
+                                help="ignore slowdowns smaller than this (default 0.01)")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        report = run_suite(args.iterations, args.round_trips, not args.no_stdio)
+        text = json.dumps(report, indent=2)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                f.write(text + "\n")
+        else:
+            print(text)
+        return 0
+
+    rows = compare(_load(args.baseline), _load(args.current),
+                   args.threshold, args.min_delta_ms)
+    for row in rows:
+        flag = "REGRESSION" if row["regression"] else ""
+        print(f"{row['name']:<55} {row['baseline_ms']:9.3f} -> "
+              f"{row['current_ms']:9.3f} ms  x{row['ratio']:.2f} {flag}")
+    regressions = [row for row in rows if row["regression"]]
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+"""
+On-disk cache helpers
+
+Small JSON documents stored under the user cache directory
+(``$XDG_CACHE_HOME/dev-env-copilot`` by default). Every document carries a
+format version; documents written by another version are ignored.
+"""
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+# Bump when the layout of any cached document changes
+CACHE_VERSION = 2
+
+APP_NAME = 'dev-env-copilot'
+
+
+def cache_dir() -> Path:
+    """Directory holding the server's cache files"""
+    override = os.getenv('DEV_ENV_MCP_CACHE_DIR')
+    if override:
+        return Path(override)
+    if sys.platform.startswith('win'):
+        base = os.getenv('LOCALAPPDATA') or os.path.expanduser('~\\AppData\\Local')
+    else:
+        base = os.getenv('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+    return Path(base) / APP_NAME
+
+
+def disk_cache_enabled() -> bool:
+    """Persistence can be turned off with DEV_ENV_MCP_DISK_CACHE=0"""
+    return os.getenv('DEV_ENV_MCP_DISK_CACHE', '1').lower() not in ('0', 'false', 'no')
+
+
+def load_json(name: str) -> Optional[Dict[str, Any]]:
+    """Read a cached document, or None if missing, corrupt or outdated"""
+    if not disk_cache_enabled():
+        return None
+    try:
+        with open(cache_dir() / name, 'r', encoding='utf-8') as f:
+            document = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(document, dict) or document.get('version') != CACHE_VERSION:
+        return None
+    return document.get('data')
+
+
+def save_json(name: str, data: Dict[str, Any]) -> bool:
+    """Atomically write a cached document; failures are not fatal"""
+    if not disk_cache_enabled():
+        return False
+    directory = cache_dir()
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=str(directory), prefix='.' + name, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'version': CACHE_VERSION, 'data': data}, f, separators=(',', ':'))
+            os.replace(tmp_path, directory / name)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except OSError:
+        return False
+    return True
+
+
+def prune(prefix: str, keep: int) -> int:
+    """Delete all but the ``keep`` most recently written ``prefix*.json`` documents"""
+    directory = cache_dir()
+    try:
+        with os.scandir(directory) as it:
+            found = []
+            for entry in it:
+                if entry.name.startswith(prefix) and entry.name.endswith('.json'):
+                    try:
+                        found.append((entry.stat().st_mtime_ns, entry.name))
+                    except OSError:
+                        pass
+    except OSError:
+        return 0
+    found.sort(reverse=True)
+    removed = 0
+    for _, name in found[keep:]:
+        try:
+            os.unlink(directory / name)
+            removed += 1
+        except OSError:
+            pass
+    return removed
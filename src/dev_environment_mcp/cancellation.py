@@ -0,0 +1,110 @@
+"""
+Request cancellation
+
+Every tool call runs with a CancelToken in a context variable. When a
+client sends ``notifications/cancelled`` the MCP session cancels the
+handler task; ``run_sync`` then stops waiting for its worker thread and
+cancels the token, and the blocking code in that thread (PATH indexing,
+workspace and search walks, version probes) sees it at its next check and
+raises Cancelled. Child processes started through
+``process.run_subprocess`` are killed as soon as the token is cancelled.
+
+Context variables are copied into anyio worker threads, so blocking code
+finds the request's token without it being passed around.
+"""
+
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, List, Optional
+
+import anyio
+
+
+class Cancelled(Exception):
+    """Raised by blocking work whose request was cancelled"""
+
+
+class CancelToken:
+    """Cancellation flag shared by a request and the work it started"""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable[[], None]] = []
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self) -> None:
+        """Mark the work cancelled and run the registered callbacks once"""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                pass
+
+    def check(self) -> None:
+        """Raise Cancelled if the work was cancelled"""
+        if self._event.is_set():
+            raise Cancelled()
+
+    def add_callback(self, callback: Callable[[], None]) -> None:
+        """Call ``callback`` on cancellation (right away if already cancelled)"""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def remove_callback(self, callback: Callable[[], None]) -> None:
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+
+_current: ContextVar[Optional[CancelToken]] = ContextVar('dev_env_mcp_cancel', default=None)
+
+
+def current() -> Optional[CancelToken]:
+    """Token of the request being served, or None outside a request"""
+    return _current.get()
+
+
+def check() -> None:
+    """Raise Cancelled if the current request was cancelled"""
+    token = _current.get()
+    if token is not None:
+        token.check()
+
+
+@contextmanager
+def scope(token: CancelToken) -> Iterator[CancelToken]:
+    """Make ``token`` the current token inside the block"""
+    reset = _current.set(token)
+    try:
+        yield token
+    finally:
+        _current.reset(reset)
+
+
+async def run_sync(func: Callable, *args):
+    """``anyio.to_thread.run_sync`` that does not wait out a cancelled call
+
+    Inside a request the thread is abandoned on cancellation and the
+    request's token cancelled, so it stops at its next check.
+    """
+    token = _current.get()
+    if token is None:
+        return await anyio.to_thread.run_sync(func, *args)
+    try:
+        return await anyio.to_thread.run_sync(func, *args, abandon_on_cancel=True)
+    except anyio.get_cancelled_exc_class():
+        token.cancel()
+        raise
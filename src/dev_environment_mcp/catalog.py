@@ -0,0 +1,230 @@
+"""
+Tool catalog
+
+The tools/list result is built once, at import, from the intent registry:
+the ``intent`` enums and the ``options`` schema come from the @intent
+declarations, so they cannot drift from what get_command_syntax accepts.
+The result is immutable and served as-is on every request. Its
+``catalogVersion`` (in ``_meta``) is a hash of the tool definitions, so a
+client can tell that a cached catalog is still current.
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass
+from typing import Any, Dict, List, Tuple
+
+from mcp.types import ListToolsResult, Tool
+
+from .commands import CommandSyntaxProvider, IntentSpec
+from .search import DEFAULT_MAX_RESULTS, MAX_SEARCH_RESULTS
+
+# Maximum number of intents accepted by get_command_syntax_batch
+MAX_BATCH_ITEMS = 100
+
+_JSON_TYPES = ((bool, 'boolean'), (int, 'integer'), (float, 'number'),
+               (str, 'string'), (list, 'array'), (dict, 'object'))
+
+
+def _json_type(value: Any) -> str:
+    """JSON schema type of an option, from the type of its default"""
+    for python_type, json_type in _JSON_TYPES:
+        if isinstance(value, python_type):
+            return json_type
+    return 'string'
+
+
+def _intent_schema(intents: Dict[str, IntentSpec]) -> Dict[str, Any]:
+    """Schema of the ``intent`` argument, one enum value per registered intent"""
+    return {
+        "type": "string",
+        "description": "The development task intent: " + "; ".join(
+            f"{name} ({spec.description})" for name, spec in intents.items()),
+        "enum": list(intents),
+    }
+
+
+def _options_schema(intents: Dict[str, IntentSpec]) -> Dict[str, Any]:
+    """Schema of ``options``: every option any intent takes, with its users"""
+    properties: Dict[str, Dict[str, Any]] = {}
+    for name, spec in intents.items():
+        for option, default in spec.options:
+            schema = properties.setdefault(option, {"type": _json_type(default),
+                                                    "description": "Used by"})
+            schema["description"] += f" {name}"
+    for schema in properties.values():
+        if schema["type"] == "array":
+            schema["items"] = {"type": "string"}
+    return {
+        "type": "object",
+        "description": "Additional options for the command (unused options are ignored)",
+        "properties": properties,
+    }
+
+
+# Arguments shared by the command syntax tools
+_ENVIRONMENT_PROPERTIES = {
+    "workspace_path": {
+        "type": "string",
+        "description": "Optional workspace path for context"
+    },
+    "refresh": {
+        "type": "boolean",
+        "description": "Ignore cached environment and re-run detection"
+    },
+}
+
+
+def build_tools(intents: Dict[str, IntentSpec]) -> List[Tool]:
+    """Tool definitions for the given intent registry"""
+    intent_schema = _intent_schema(intents)
+    options_schema = _options_schema(intents)
+    return [
+        Tool(
+            name="detect_environment",
+            description="Detect current development environment configuration",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "workspace_path": {
+                        "type": "string",
+                        "description": "Optional workspace path to analyze"
+                    },
+                    "refresh": {
+                        "type": "boolean",
+                        "description": "Ignore cached results and re-run detection"
+                    }
+                }
+            }
+        ),
+        Tool(
+            name="get_command_syntax",
+            description="Get platform-specific command syntax for development tasks",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "intent": intent_schema,
+                    "options": options_schema,
+                    **_ENVIRONMENT_PROPERTIES,
+                },
+                "required": ["intent"]
+            }
+        ),
+        Tool(
+            name="get_command_syntax_batch",
+            description="Get command syntax for several development tasks in one call",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "items": {
+                        "type": "array",
+                        "description": "Intents to resolve, each with optional options",
+                        "maxItems": MAX_BATCH_ITEMS,
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "intent": {"type": "string", "enum": list(intents)},
+                                "options": options_schema,
+                            },
+                            "required": ["intent"]
+                        }
+                    },
+                    **_ENVIRONMENT_PROPERTIES,
+                },
+                "required": ["items"]
+            }
+        ),
+        Tool(
+            name="repo_state",
+            description="Git repository state read directly from .git, without running git: "
+                        "branch, HEAD commit, index entry count and any merge, rebase, "
+                        "cherry-pick, revert or bisect in progress",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "workspace_path": {
+                        "type": "string",
+                        "description": "Path inside the repository (default: the server's "
+                                       "working directory)"
+                    }
+                }
+            }
+        ),
+        Tool(
+            name="search_files",
+            description="Find files by glob in a workspace, skipping .gitignored and "
+                        "vendored directories. Matches are also streamed as progress "
+                        "notifications when the request has a progress token",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "pattern": {
+                        "type": "string",
+                        "description": "Glob matched against file names (*.py), or against "
+                                       "paths relative to the workspace when it contains "
+                                       "a slash (src/**/test_*.py)"
+                    },
+                    "workspace_path": {
+                        "type": "string",
+                        "description": "Directory to search (default: the server's "
+                                       "working directory)"
+                    },
+                    "max_results": {
+                        "type": "integer",
+                        "description": "Stop after this many matches",
+                        "minimum": 1,
+                        "maximum": MAX_SEARCH_RESULTS,
+                        "default": DEFAULT_MAX_RESULTS
+                    },
+                    "include_hidden": {
+                        "type": "boolean",
+                        "description": "Also search hidden files and directories"
+                    }
+                },
+                "required": ["pattern"]
+            }
+        ),
+        Tool(
+            name="server_stats",
+            description="Report server metrics: per-tool latency, probe timings, "
+                        "cache hit ratios and workspace cache occupancy",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "reset": {
+                        "type": "boolean",
+                        "description": "Clear the metrics after reporting them"
+                    }
+                }
+            }
+        ),
+    ]
+
+
+def catalog_version(tools: List[Tool]) -> str:
+    """Content hash of the tool definitions"""
+    payload = json.dumps(
+        [tool.model_dump(mode="json", by_alias=True, exclude_none=True) for tool in tools],
+        sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass(frozen=True)
+class ToolCatalog:
+    """The served tools/list result and its version"""
+    version: str
+    names: Tuple[str, ...]
+    result: ListToolsResult
+
+
+def build_catalog(intents: Dict[str, IntentSpec]) -> ToolCatalog:
+    tools = build_tools(intents)
+    version = catalog_version(tools)
+    return ToolCatalog(
+        version=version,
+        names=tuple(tool.name for tool in tools),
+        result=ListToolsResult(tools=tools, _meta={"catalogVersion": version}),
+    )
+
+
+CATALOG = build_catalog(CommandSyntaxProvider.INTENTS)
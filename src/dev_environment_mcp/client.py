@@ -0,0 +1,139 @@
+"""
+Minimal MCP stdio client
+
+Drives a server subprocess over newline-delimited JSON-RPC, including the
+initialize handshake. Used by the startup profiler and the performance
+tooling; it is not a general purpose MCP client.
+"""
+
+import json
+import os
+import queue
+import subprocess
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+PROTOCOL_VERSION = "2024-11-05"
+
+CLIENT_INFO = {"name": "dev-env-copilot-client", "version": "1.0.0"}
+
+# Representative tools/call arguments used by the benchmark and load tools
+SAMPLE_TOOL_CALLS: Dict[str, Dict[str, Any]] = {
+    "detect_environment": {},
+    "get_command_syntax": {"intent": "run_tests"},
+    "get_command_syntax_batch": {"items": [
+        {"intent": "install_packages"}, {"intent": "run_tests"},
+        {"intent": "start_server"}, {"intent": "git_status"},
+    ]},
+}
+
+
+def server_command() -> List[str]:
+    """Command line that starts the stdio server from this source tree"""
+    return [sys.executable, "-m", "dev_environment_mcp"]
+
+
+def server_env(extra: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """Environment for the server subprocess, with this package importable"""
+    env = dict(os.environ)
+    src_dir = str(Path(__file__).resolve().parent.parent)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [src_dir, env.get("PYTHONPATH")]))
+    env.update(extra or {})
+    return env
+
+
+class StdioClient:
+    """Synchronous JSON-RPC client for a server subprocess"""
+
+    def __init__(self, command: Optional[List[str]] = None,
+                 env: Optional[Dict[str, str]] = None):
+        self.command = command or server_command()
+        self.env = env or server_env()
+        self.proc: Optional[subprocess.Popen] = None
+        self._lines: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._next_id = 1
+
+    def start(self) -> None:
+        self.proc = subprocess.Popen(
+            self.command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            bufsize=1,
+            env=self.env,
+        )
+        threading.Thread(target=self._read_stdout, daemon=True).start()
+
+    def _read_stdout(self) -> None:
+        for line in self.proc.stdout:
+            self._lines.put(line)
+        self._lines.put(None)
+
+    def send(self, message: Dict[str, Any]) -> None:
+        self.proc.stdin.write(json.dumps(message) + "\n")
+        self.proc.stdin.flush()
+
+    def notify(self, method: str, params: Optional[Dict[str, Any]] = None) -> None:
+        message = {"jsonrpc": "2.0", "method": method}
+        if params is not None:
+            message["params"] = params
+        self.send(message)
+
+    def request(self, method: str, params: Optional[Dict[str, Any]] = None,
+                timeout: float = 10.0) -> Dict[str, Any]:
+        """Send a request and wait for the response with the same id"""
+        request_id = self._next_id
+        self._next_id += 1
+        message = {"jsonrpc": "2.0", "id": request_id, "method": method}
+        if params is not None:
+            message["params"] = params
+        self.send(message)
+
+        while True:
+            try:
+                line = self._lines.get(timeout=timeout)
+            except queue.Empty:
+                raise TimeoutError(f"No response to {method} within {timeout}s")
+            if line is None:
+                raise ConnectionError("Server closed stdout")
+            if not line.strip():
+                continue
+            response = json.loads(line)
+            if response.get("id") == request_id:
+                return response
+
+    def initialize(self) -> Dict[str, Any]:
+        """Perform the initialize / notifications/initialized handshake"""
+        response = self.request("initialize", {
+            "protocolVersion": PROTOCOL_VERSION,
+            "capabilities": {},
+            "clientInfo": CLIENT_INFO,
+        })
+        self.notify("notifications/initialized")
+        return response
+
+    def call_tool(self, name: str, arguments: Optional[Dict[str, Any]] = None,
+                  timeout: float = 10.0) -> Dict[str, Any]:
+        return self.request("tools/call", {"name": name, "arguments": arguments or {}},
+                            timeout=timeout)
+
+    def close(self) -> None:
+        if self.proc is None:
+            return
+        try:
+            self.proc.stdin.close()
+            self.proc.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            self.proc.kill()
+            self.proc.wait()
+        self.proc = None
+
+    def __enter__(self) -> "StdioClient":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
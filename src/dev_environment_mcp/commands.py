@@ -0,0 +1,420 @@
+"""
+Command syntax assistance
+
+Maps development intents (list files, run tests, ...) to the right command
+syntax for a detected environment.
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .environment import EnvironmentInfo
+from .metrics import metrics
+from .tracing import tracer
+
+# Upper bound on memoized command results shared by all providers
+MAX_MEMOIZED_COMMANDS = 1024
+
+# Package manager -> command adding packages to the project
+ADD_COMMANDS = {
+    'npm': 'npm install {packages}',
+    'yarn': 'yarn add {packages}',
+    'pnpm': 'pnpm add {packages}',
+    'bun': 'bun add {packages}',
+    'uv': 'uv add {packages}',
+    'poetry': 'poetry add {packages}',
+    'pdm': 'pdm add {packages}',
+    'pipenv': 'pipenv install {packages}',
+    'pip': '{python} -m pip install {packages}',
+}
+
+# Python package managers that run commands in the project's environment
+PYTHON_RUNNERS = {'uv': 'uv run', 'poetry': 'poetry run', 'pdm': 'pdm run',
+                  'pipenv': 'pipenv run'}
+
+# Console scripts named like a server entry point (serve, demo-server,
+# app_dev, ...); other entry points are CLIs and not suggested as servers
+SERVER_SCRIPT_RE = re.compile(r'(?:^|[-_.])(?:serve|server|dev|start)$')
+
+
+@dataclass(frozen=True)
+class IntentSpec:
+    """Registered command intent and the options its handler accepts"""
+    name: str
+    handler: str
+    description: str
+    options: Tuple[Tuple[str, Any], ...] = ()
+
+
+def intent(name: str, description: str, **defaults: Any) -> Callable:
+    """Mark a CommandSyntaxProvider method as the handler for an intent
+    
+    Keyword arguments name the options the handler takes and their defaults.
+    """
+    def decorator(func: Callable) -> Callable:
+        func.intent_spec = IntentSpec(name, func.__name__, description,
+                                      tuple(defaults.items()))
+        return func
+    return decorator
+
+
+def _freeze(value: Any) -> Any:
+    """Convert an option value into a hashable memo key component"""
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((str(k), _freeze(v)) for k, v in value.items()))
+    try:
+        hash(value)
+    except TypeError:
+        return repr(value)
+    return value
+
+
+class CommandSyntaxProvider:
+    """Provides cross-platform command syntax assistance"""
+    
+    # intent name -> IntentSpec, filled in once from the @intent handlers below
+    INTENTS: Dict[str, IntentSpec] = {}
+    
+    _memo: "OrderedDict[tuple, Dict[str, str]]" = OrderedDict()
+    _memo_lock = threading.Lock()
+    
+    def __init__(self, environment: EnvironmentInfo,
+                 memo: Optional["OrderedDict[tuple, Dict[str, str]]"] = None):
+        self.env = environment
+        # A workspace context's memo, evicted with it; otherwise the shared one
+        self._memo_store = self._memo if memo is None else memo
+    
+    def get_command_syntax(self, intent: str, options: Dict[str, Any] = None) -> Dict[str, str]:
+        """Get platform-specific command syntax for a given intent
+        
+        Only the handler for ``intent`` runs; its result is memoized by
+        environment fingerprint, intent and the options the handler uses.
+        """
+        spec = self.INTENTS.get(intent)
+        if spec is None:
+            return {'error': f'Unknown intent: {intent}'}
+        
+        options = options or {}
+        kwargs = {name: options.get(name, default) for name, default in spec.options}
+        key = (self.env.fingerprint(), intent,
+               tuple(_freeze(value) for value in kwargs.values()))
+        
+        memo = self._memo_store
+        with self._memo_lock:
+            cached = memo.get(key)
+            if cached is not None:
+                memo.move_to_end(key)
+        metrics.cache_lookup('commands', cached is not None)
+        if cached is not None:
+            return dict(cached)
+        
+        with tracer.span('commands.build', intent=intent):
+            commands = getattr(self, spec.handler)(**kwargs)
+        
+        with self._memo_lock:
+            memo[key] = commands
+            if len(memo) > MAX_MEMOIZED_COMMANDS:
+                memo.popitem(last=False)
+        return dict(commands)
+    
+    @intent('list_files', 'List files and directories')
+    def _list_files_command(self) -> Dict[str, str]:
+        if self.env.os_type == 'windows':
+            return {
+                'powershell': 'Get-ChildItem',
+                'cmd': 'dir',
+                'description': 'List files and directories'
+            }
+        else:
+            return {
+                'bash': 'ls -la',
+                'zsh': 'ls -la',
+                'description': 'List files and directories with details'
+            }
+    
+    @intent('change_directory', 'Change the working directory', path='.')
+    def _change_directory_command(self, path: str) -> Dict[str, str]:
+        return {
+            'universal': f'cd "{path}"',
+            'description': f'Change to directory: {path}'
+        }
+    
+    @intent('create_directory', 'Create a directory', path='newdir')
+    def _create_directory_command(self, path: str) -> Dict[str, str]:
+        if self.env.os_type == 'windows':
+            return {
+                'powershell': f'New-Item -ItemType Directory -Path "{path}"',
+                'cmd': f'mkdir "{path}"',
+                'description': f'Create directory: {path}'
+            }
+        else:
+            return {
+                'bash': f'mkdir -p "{path}"',
+                'description': f'Create directory (with parents): {path}'
+            }
+    
+    @intent('copy_file', 'Copy a file', source='file1', dest='file2')
+    def _copy_file_command(self, source: str, dest: str) -> Dict[str, str]:
+        if self.env.os_type == 'windows':
+            return {
+                'powershell': f'Copy-Item "{source}" "{dest}"',
+                'cmd': f'copy "{source}" "{dest}"',
+                'description': f'Copy {source} to {dest}'
+            }
+        else:
+            return {
+                'bash': f'cp "{source}" "{dest}"',
+                'description': f'Copy {source} to {dest}'
+            }
+    
+    @intent('move_file', 'Move or rename a file', source='file1', dest='file2')
+    def _move_file_command(self, source: str, dest: str) -> Dict[str, str]:
+        if self.env.os_type == 'windows':
+            return {
+                'powershell': f'Move-Item "{source}" "{dest}"',
+                'cmd': f'move "{source}" "{dest}"',
+                'description': f'Move {source} to {dest}'
+            }
+        else:
+            return {
+                'bash': f'mv "{source}" "{dest}"',
+                'description': f'Move {source} to {dest}'
+            }
+    
+    @intent('delete_file', 'Delete a file', path='file')
+    def _delete_file_command(self, path: str) -> Dict[str, str]:
+        if self.env.os_type == 'windows':
+            return {
+                'powershell': f'Remove-Item "{path}"',
+                'cmd': f'del "{path}"',
+                'description': f'Delete: {path}'
+            }
+        else:
+            return {
+                'bash': f'rm "{path}"',
+                'description': f'Delete: {path}'
+            }
+    
+    @intent('view_file', 'Print file contents', path='file')
+    def _view_file_command(self, path: str) -> Dict[str, str]:
+        if self.env.os_type == 'windows':
+            return {
+                'powershell': f'Get-Content "{path}"',
+                'cmd': f'type "{path}"',
+                'description': f'View file contents: {path}'
+            }
+        else:
+            return {
+                'bash': f'cat "{path}"',
+                'description': f'View file contents: {path}'
+            }
+    
+    @intent('edit_file', 'Open a file in an editor', path='file')
+    def _edit_file_command(self, path: str) -> Dict[str, str]:
+        if self.env.os_type == 'windows':
+            return {
+                'powershell': f'notepad "{path}"',
+                'cmd': f'notepad "{path}"',
+                'description': f'Edit file: {path}'
+            }
+        else:
+            return {
+                'bash': f'nano "{path}"',
+                'vim': f'vim "{path}"',
+                'description': f'Edit file: {path}'
+            }
+    
+    @intent('find_files', 'Find files by name pattern', pattern='*')
+    def _find_files_command(self, pattern: str) -> Dict[str, str]:
+        if self.env.os_type == 'windows':
+            return {
+                'powershell': f'Get-ChildItem -Recurse -Name "{pattern}"',
+                'cmd': f'dir /s /b "{pattern}"',
+                'description': f'Find files matching: {pattern}'
+            }
+        else:
+            return {
+                'bash': f'find . -name "{pattern}"',
+                'description': f'Find files matching: {pattern}'
+            }
+    
+    @intent('install_packages', 'Install project packages', packages=[])
+    def _install_packages_command(self, packages: List[str]) -> Dict[str, str]:
+        if not packages:
+            packages = ['package-name']
+        
+        commands = {}
+        pkg_list = ' '.join(packages)
+        
+        if self.env.package_managers:
+            # Only the managers the workspace's lockfiles say it uses
+            for manager in self.env.package_managers.values():
+                template = ADD_COMMANDS.get(manager)
+                if template:
+                    commands[manager] = template.format(
+                        packages=pkg_list, python=self.env.python_cmd)
+        elif self.env.project_type == 'nodejs':
+            commands['npm'] = f'npm install {pkg_list}'
+            commands['yarn'] = f'yarn add {pkg_list}'
+        elif self.env.project_type == 'python':
+            commands['pip'] = f'{self.env.python_cmd} -m pip install {pkg_list}'
+        
+        commands['description'] = f'Install packages: {", ".join(packages)}'
+        return commands
+    
+    def _manifest(self, name: str) -> Dict[str, Any]:
+        """Parsed root manifest of the workspace, empty if it has none"""
+        return (self.env.manifests or {}).get(name) or {}
+    
+    def _make_targets(self) -> List[str]:
+        for name in ('GNUmakefile', 'makefile', 'Makefile'):
+            targets = self._manifest(name).get('targets')
+            if targets:
+                return targets
+        return []
+    
+    def _node_script(self, script: str) -> Tuple[str, str]:
+        """(manager, command) running a package.json script"""
+        manager = (self.env.package_managers or {}).get('node', 'npm')
+        if manager == 'npm':
+            command = f'npm {script}' if script in ('test', 'start') else f'npm run {script}'
+        elif manager == 'bun':
+            # "bun test" is bun's own test runner, not the script
+            command = f'bun run {script}'
+        else:
+            command = f'{manager} {script}'
+        return manager, command
+    
+    def _python_run(self, command: str) -> str:
+        """Run a Python tool in the project's environment"""
+        runner = PYTHON_RUNNERS.get((self.env.package_managers or {}).get('python'))
+        if runner:
+            return f'{runner} {command}'
+        return f'{self.env.python_cmd} -m {command}'
+    
+    @staticmethod
+    def _sources(sources: List[str]) -> str:
+        """Description suffix naming the manifests commands were taken from"""
+        return f' (from {", ".join(sources)})' if sources else ''
+    
+    @intent('run_tests', 'Run project tests')
+    def _run_tests_command(self) -> Dict[str, str]:
+        commands = {}
+        sources = []
+        
+        scripts = self._manifest('package.json').get('scripts', {})
+        if 'test' in scripts:
+            manager, command = self._node_script('test')
+            commands[manager] = command
+            sources.append('package.json')
+        pyproject = self._manifest('pyproject.toml')
+        if 'test' in pyproject.get('hatch_scripts', []):
+            commands['hatch'] = 'hatch run test'
+        if pyproject.get('pytest'):
+            commands['pytest'] = self._python_run('pytest')
+        if pyproject and ('hatch' in commands or 'pytest' in commands):
+            sources.append('pyproject.toml')
+        target = next((t for t in ('test', 'check') if t in self._make_targets()), None)
+        if target:
+            commands['make'] = f'make {target}'
+            sources.append('Makefile')
+        cargo = self._manifest('Cargo.toml')
+        if cargo:
+            commands['cargo'] = 'cargo test --workspace' if cargo.get('workspace') else 'cargo test'
+            sources.append('Cargo.toml')
+        
+        if not commands:
+            if self.env.project_type == 'nodejs':
+                commands['npm'] = 'npm test'
+                commands['yarn'] = 'yarn test'
+            elif self.env.project_type == 'python':
+                commands['pytest'] = 'pytest'
+                commands['unittest'] = f'{self.env.python_cmd} -m unittest'
+        
+        commands['description'] = 'Run project tests' + self._sources(sources)
+        return commands
+    
+    @intent('start_server', 'Start the development server')
+    def _start_server_command(self) -> Dict[str, str]:
+        commands = {}
+        sources = []
+        
+        scripts = self._manifest('package.json').get('scripts', {})
+        script = next((s for s in ('dev', 'start', 'serve') if s in scripts), None)
+        if script:
+            manager, command = self._node_script(script)
+            commands[manager] = command
+            sources.append('package.json')
+        if 'manage.py' in (self.env.manifests or {}):
+            commands['django'] = f'{self.env.python_cmd} manage.py runserver'
+            sources.append('manage.py')
+        pyproject = self._manifest('pyproject.toml')
+        hatch_script = next((s for s in ('dev', 'serve', 'start')
+                             if s in pyproject.get('hatch_scripts', [])), None)
+        if hatch_script:
+            commands['hatch'] = f'hatch run {hatch_script}'
+        elif 'django' not in commands:
+            entry_point = next((s for s in pyproject.get('scripts', [])
+                                if SERVER_SCRIPT_RE.search(s)), None)
+            if entry_point:
+                runner = PYTHON_RUNNERS.get((self.env.package_managers or {}).get('python'))
+                commands['script'] = f'{runner} {entry_point}' if runner else entry_point
+        if 'hatch' in commands or 'script' in commands:
+            sources.append('pyproject.toml')
+        target = next((t for t in ('dev', 'run', 'serve', 'start') if t in self._make_targets()), None)
+        if target:
+            commands['make'] = f'make {target}'
+            sources.append('Makefile')
+        if self._manifest('Cargo.toml'):
+            commands['cargo'] = 'cargo run'
+            sources.append('Cargo.toml')
+        
+        if not commands:
+            if self.env.project_type == 'nodejs':
+                commands['npm'] = 'npm start'
+                commands['yarn'] = 'yarn start'
+            elif self.env.project_type == 'python':
+                commands['flask'] = 'flask run'
+                commands['django'] = f'{self.env.python_cmd} manage.py runserver'
+        
+        commands['description'] = 'Start development server' + self._sources(sources)
+        return commands
+    
+    @intent('docker_build', 'Build a Docker image')
+    def _docker_build_command(self) -> Dict[str, str]:
+        if self.env.has_docker:
+            return {
+                'docker': 'docker build -t myapp .',
+                'docker-compose': 'docker-compose build',
+                'description': 'Build Docker image'
+            }
+        else:
+            return {
+                'error': 'Docker not available',
+                'description': 'Docker is not installed or not accessible'
+            }
+    
+    @intent('git_status', 'Show Git repository status')
+    def _git_status_command(self) -> Dict[str, str]:
+        if self.env.has_git:
+            return {
+                'git': 'git status',
+                'git-short': 'git status --short',
+                'description': 'Check Git repository status'
+            }
+        else:
+            return {
+                'error': 'Git not available',
+                'description': 'Git is not installed or not accessible'
+            }
+
+CommandSyntaxProvider.INTENTS = {
+    member.intent_spec.name: member.intent_spec
+    for member in vars(CommandSyntaxProvider).values()
+    if hasattr(member, 'intent_spec')
+}
@@ -0,0 +1,186 @@
+"""
+Per-workspace state
+
+Everything the server learns about one workspace (its project index,
+detected environment snapshots and generated command sets) lives in a
+WorkspaceContext. The WorkspaceContextManager keeps the contexts in LRU
+order, bounded by both count and approximate memory, so a long-running
+server that sees many workspaces drops the least recently used ones
+instead of growing without limit.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+from .metrics import metrics
+
+if TYPE_CHECKING:
+    from .environment import EnvironmentInfo
+    from .workspace import WorkspaceIndex
+
+DEFAULT_MAX_WORKSPACES = 32
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Rough per-object costs used by the memory estimate
+RECORD_OVERHEAD_BYTES = 200
+NAME_OVERHEAD_BYTES = 60
+SNAPSHOT_BYTES = 2048
+COMMAND_SET_BYTES = 1024
+
+
+def _env_number(name: str, default: float) -> float:
+    """Read a numeric limit from the environment"""
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def index_bytes(index: 'WorkspaceIndex') -> int:
+    """Approximate memory held by a workspace index"""
+    total = 0
+    for rel, record in index.dirs.items():
+        total += RECORD_OVERHEAD_BYTES + len(rel)
+        for name in record.markers:
+            total += NAME_OVERHEAD_BYTES + len(name)
+        for name in record.subdirs:
+            total += NAME_OVERHEAD_BYTES + len(name)
+        for name in record.lockfiles:
+            total += NAME_OVERHEAD_BYTES + len(name)
+    return total
+
+
+@dataclass
+class WorkspaceContext:
+    """State cached for one workspace root"""
+    root: str
+    index: Optional['WorkspaceIndex'] = None
+    # detector fingerprint -> (monotonic time, snapshot, version-file stamp)
+    snapshots: Dict[tuple, Tuple[float, 'EnvironmentInfo', tuple]] = field(default_factory=dict)
+    # (environment fingerprint, intent, options) -> commands
+    commands: 'OrderedDict[tuple, Dict[str, str]]' = field(default_factory=OrderedDict)
+    # ManifestCache.stamp() of the root when its manifests were last read
+    manifest_stamp: Optional[tuple] = None
+    _index_bytes: int = field(default=0, repr=False)
+
+    def set_index(self, index: Optional['WorkspaceIndex']) -> None:
+        self.index = index
+        self._index_bytes = index_bytes(index) if index is not None else 0
+
+    def approx_bytes(self) -> int:
+        """Estimated memory held by this context"""
+        return (self._index_bytes + len(self.snapshots) * SNAPSHOT_BYTES
+                + len(self.commands) * COMMAND_SET_BYTES)
+
+
+class WorkspaceContextManager:
+    """LRU of WorkspaceContexts bounded by count and approximate bytes
+
+    Eviction callbacks run with each evicted context (outside the lock) so
+    owners can release external resources such as directory watches.
+    """
+
+    def __init__(self, max_workspaces: Optional[int] = None,
+                 max_bytes: Optional[int] = None):
+        if max_workspaces is None:
+            max_workspaces = int(_env_number('DEV_ENV_MCP_MAX_WORKSPACES',
+                                             DEFAULT_MAX_WORKSPACES))
+        if max_bytes is None:
+            max_bytes = int(_env_number('DEV_ENV_MCP_WORKSPACE_CACHE_MB',
+                                        DEFAULT_MAX_BYTES / (1024 * 1024)) * 1024 * 1024)
+        self.max_workspaces = max(1, max_workspaces)
+        self.max_bytes = max_bytes
+        self._evict_callbacks: List[Callable[[WorkspaceContext], None]] = []
+        self._contexts: 'OrderedDict[str, WorkspaceContext]' = OrderedDict()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(workspace_path: str) -> str:
+        return os.path.abspath(workspace_path)
+
+    def add_evict_callback(self, callback: Callable[[WorkspaceContext], None]) -> None:
+        self._evict_callbacks.append(callback)
+
+    def get(self, workspace_path: str) -> WorkspaceContext:
+        """Context for a workspace, created if needed and marked most recently used"""
+        root = self.key(workspace_path)
+        with self._lock:
+            context = self._contexts.get(root)
+            hit = context is not None
+            if hit:
+                self.hits += 1
+                self._contexts.move_to_end(root)
+            else:
+                self.misses += 1
+                context = self._contexts[root] = WorkspaceContext(root=root)
+        metrics.cache_lookup('workspace', hit)
+        if not hit:
+            self.enforce_limits()
+        return context
+
+    def peek(self, workspace_path: str) -> Optional[WorkspaceContext]:
+        """Context for a workspace if one exists, without touching LRU order or counters"""
+        with self._lock:
+            return self._contexts.get(self.key(workspace_path))
+
+    def values(self) -> List[WorkspaceContext]:
+        with self._lock:
+            return list(self._contexts.values())
+
+    def discard(self, workspace_path: Optional[str] = None) -> None:
+        """Drop one workspace's context, or all of them"""
+        with self._lock:
+            if workspace_path is None:
+                dropped = list(self._contexts.values())
+                self._contexts.clear()
+            else:
+                context = self._contexts.pop(self.key(workspace_path), None)
+                dropped = [context] if context else []
+        self._notify(dropped)
+
+    def enforce_limits(self) -> None:
+        """Evict least recently used contexts until both bounds hold
+
+        The most recently used context is never evicted, even if it alone
+        exceeds the byte budget.
+        """
+        evicted = []
+        with self._lock:
+            total = sum(c.approx_bytes() for c in self._contexts.values())
+            while len(self._contexts) > 1 and (
+                    len(self._contexts) > self.max_workspaces or total > self.max_bytes):
+                _, context = self._contexts.popitem(last=False)
+                total -= context.approx_bytes()
+                evicted.append(context)
+            self.evictions += len(evicted)
+        self._notify(evicted)
+
+    def _notify(self, contexts: List[WorkspaceContext]) -> None:
+        for context in contexts:
+            for callback in self._evict_callbacks:
+                callback(context)
+
+    def __len__(self) -> int:
+        return len(self._contexts)
+
+    def stats(self) -> Dict[str, Any]:
+        """Occupancy and hit rate, for diagnostics"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'workspaces': len(self._contexts),
+                'max_workspaces': self.max_workspaces,
+                'approx_bytes': sum(c.approx_bytes() for c in self._contexts.values()),
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'lru': [c.root for c in reversed(self._contexts.values())],
+            }
@@ -0,0 +1,123 @@
+"""
+Response encoding
+
+Tool results are JSON text. Output is indented by default; compact mode
+drops the whitespace (roughly 30% smaller payloads). When ``orjson`` is
+installed it is used instead of the standard library encoder.
+
+Encoded responses can be cached by (tool, arguments, environment
+fingerprint), so a repeated request skips both building the result and
+serializing it.
+"""
+
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # optional speedup
+    orjson = None
+
+from .metrics import metrics
+
+MAX_CACHED_RESPONSES = 1024
+MAX_CACHED_RESPONSE_BYTES = 16 * 1024 * 1024
+
+BACKENDS = ('json', 'orjson')
+
+
+def _stdlib_encoder(compact: bool) -> Callable[[Any], str]:
+    if compact:
+        return lambda payload: json.dumps(payload, separators=(',', ':'))
+    return lambda payload: json.dumps(payload, indent=2)
+
+
+def _orjson_encoder(compact: bool) -> Callable[[Any], str]:
+    option = 0 if compact else orjson.OPT_INDENT_2
+    return lambda payload: orjson.dumps(payload, option=option).decode('utf-8')
+
+
+class ResponseEncoder:
+    """Encodes payloads with the configured style and backend"""
+
+    def __init__(self, compact: Optional[bool] = None, backend: Optional[str] = None):
+        self.configure(compact, backend)
+
+    def configure(self, compact: Optional[bool] = None, backend: Optional[str] = None) -> None:
+        """Select the style and backend; None reads DEV_ENV_MCP_JSON(_BACKEND)
+
+        DEV_ENV_MCP_JSON is ``pretty`` (default) or ``compact``;
+        DEV_ENV_MCP_JSON_BACKEND is ``json``, ``orjson`` or unset to use
+        orjson whenever it is installed.
+        """
+        if compact is None:
+            compact = os.getenv('DEV_ENV_MCP_JSON', 'pretty').lower() == 'compact'
+        if backend is None:
+            backend = os.getenv('DEV_ENV_MCP_JSON_BACKEND') or None
+        if backend is None:
+            backend = 'orjson' if orjson is not None else 'json'
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown JSON backend: {backend} (choose from {', '.join(BACKENDS)})")
+        if backend == 'orjson' and orjson is None:
+            raise ValueError("JSON backend 'orjson' is not installed")
+
+        self.compact = compact
+        self.backend = backend
+        factory = _orjson_encoder if backend == 'orjson' else _stdlib_encoder
+        self._encode = factory(compact)
+
+    def encode(self, payload: Any) -> str:
+        return self._encode(payload)
+
+    def describe(self) -> Dict[str, Any]:
+        return {'backend': self.backend, 'compact': self.compact}
+
+
+class ResponseCache:
+    """LRU of encoded response text, bounded by entries and bytes"""
+
+    def __init__(self, max_entries: int = MAX_CACHED_RESPONSES,
+                 max_bytes: int = MAX_CACHED_RESPONSE_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: 'OrderedDict[Tuple[str, str, str], str]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(tool: str, arguments: Dict[str, Any], fingerprint: str) -> Tuple[str, str, str]:
+        """Cache key; arguments are canonicalized so key order does not matter"""
+        canonical = json.dumps(arguments, sort_keys=True, separators=(',', ':'), default=str)
+        return (tool, canonical, fingerprint)
+
+    def get(self, key: Tuple[str, str, str]) -> Optional[str]:
+        with self._lock:
+            text = self._entries.get(key)
+            if text is not None:
+                self._entries.move_to_end(key)
+        metrics.cache_lookup('response', text is not None)
+        return text
+
+    def put(self, key: Tuple[str, str, str], text: str) -> None:
+        if len(text) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous)
+            self._entries[key] = text
+            self._bytes += len(text)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {'entries': len(self._entries), 'bytes': self._bytes}
@@ -0,0 +1,437 @@
+"""
+Environment detection
+
+Detects the OS, shell, available tools and workspace project layout, and
+caches the result per environment fingerprint.
+"""
+
+import hashlib
+import json
+import os
+import platform
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, asdict, replace
+from typing import Any, Callable, Dict, List, Optional
+from pathlib import Path
+
+import anyio
+
+from . import cancellation
+from .metrics import metrics
+from .pathresolver import IS_WINDOWS, PathResolver
+from .contexts import WorkspaceContext
+from .inventory import SELECTION_VARIABLES, InterpreterInventory
+from .manifests import ManifestCache
+from .toolchains import ToolchainProber, version_probes_enabled
+from .tracing import tracer
+from .watcher import WorkspaceWatcher, watching_enabled
+from .workspace import MARKER_FILES, WorkspaceIndexer, classify_markers
+
+@dataclass
+class EnvironmentInfo:
+    """Environment information structure"""
+    os_type: str
+    shell: str
+    shell_syntax: str
+    python_cmd: str
+    node_cmd: str
+    user: str
+    home_dir: str
+    workspace_dir: Optional[str] = None
+    project_type: Optional[str] = None
+    projects: Optional[List[Dict[str, Any]]] = None
+    has_docker: bool = False
+    has_git: bool = False
+    # tool name -> {'command', 'path', 'version'} for tools found on PATH
+    toolchains: Optional[Dict[str, Dict[str, Any]]] = None
+    # family ('python', 'node') -> every interpreter on PATH, shims resolved
+    interpreters: Optional[Dict[str, List[Dict[str, Any]]]] = None
+    # manifest file name -> what it declares (scripts, make targets, ...)
+    manifests: Optional[Dict[str, Dict[str, Any]]] = None
+    # ecosystem ('node', 'python') -> package manager used by the workspace
+    package_managers: Optional[Dict[str, str]] = None
+    
+    def fingerprint(self) -> str:
+        """Stable hash of the detected values
+        
+        Computed once per instance; detector snapshots are read-only, so
+        the hash stays valid for the snapshot's lifetime.
+        """
+        cached = self.__dict__.get('_fingerprint')
+        if cached is None:
+            payload = json.dumps(asdict(self), sort_keys=True, default=str)
+            cached = hashlib.sha1(payload.encode('utf-8')).hexdigest()
+            self.__dict__['_fingerprint'] = cached
+        return cached
+
+# Seconds a detected environment snapshot stays valid
+DEFAULT_CACHE_TTL = 300.0
+
+# Upper bound on cached snapshots (one per distinct fingerprint)
+MAX_CACHED_SNAPSHOTS = 64
+
+
+def _default_cache_ttl() -> float:
+    """Read the snapshot TTL from DEV_ENV_MCP_CACHE_TTL"""
+    try:
+        return float(os.getenv('DEV_ENV_MCP_CACHE_TTL', DEFAULT_CACHE_TTL))
+    except ValueError:
+        return DEFAULT_CACHE_TTL
+
+class _InFlight:
+    """A detection in progress that other coroutines can wait for"""
+    
+    def __init__(self):
+        self.done = anyio.Event()
+        self.result: Optional[EnvironmentInfo] = None
+
+class EnvironmentDetector:
+    """Detects development environment configuration"""
+    
+    def __init__(self, cache_ttl: Optional[float] = None,
+                 resolver: Optional[PathResolver] = None,
+                 indexer: Optional[WorkspaceIndexer] = None,
+                 toolchains: Optional[ToolchainProber] = None):
+        # A TTL of 0 disables snapshot caching
+        self.cache_ttl = _default_cache_ttl() if cache_ttl is None else cache_ttl
+        self.resolver = resolver or PathResolver(persist=True)
+        if toolchains is None and version_probes_enabled():
+            toolchains = ToolchainProber(self.resolver)
+        self.toolchains = toolchains
+        self.inventory = InterpreterInventory(self.resolver, toolchains)
+        self.manifests = ManifestCache()
+        if indexer is None:
+            indexer = WorkspaceIndexer(
+                watcher=WorkspaceWatcher() if watching_enabled() else None)
+        self.indexer = indexer
+        # Per-workspace snapshots live in these contexts; the rest stay here
+        self.contexts = indexer.contexts
+        self._snapshots: Dict[tuple, tuple] = {}
+        self._lock = threading.Lock()
+        # fingerprint -> detection currently running on the event loop
+        self._inflight: Dict[tuple, _InFlight] = {}
+    
+    @staticmethod
+    def fingerprint(workspace_path: Optional[str] = None) -> tuple:
+        """Inputs that detection depends on; a change forces re-detection"""
+        env = os.environ
+        return (
+            env.get('PATH', ''),
+            env.get('SHELL', ''),
+            env.get('HOME', ''),
+            env.get('USER', ''),
+            env.get('USERPROFILE', ''),
+            env.get('USERNAME', ''),
+            *(env.get(name, '') for name in SELECTION_VARIABLES),
+            workspace_path,
+        )
+    
+    def detect_environment(self, workspace_path: Optional[str] = None,
+                           refresh: bool = False) -> EnvironmentInfo:
+        """Detect current environment configuration
+        
+        Results are cached per fingerprint for ``cache_ttl`` seconds and the
+        same snapshot is returned on repeated calls, so treat it as read-only.
+        Pass ``refresh=True`` to force detection to run again.
+        """
+        key = self.fingerprint(workspace_path)
+        now = time.monotonic()
+        
+        if not refresh:
+            cached = self._cached_snapshot(key, now)
+            if cached is not None:
+                return cached
+        
+        selection = self.inventory.selection_stamp(workspace_path)
+        base = self._base_environment(workspace_path)
+        results: Dict[str, Any] = {}
+        for name, probe in self._probes(workspace_path).items():
+            results.update(self._run_probe(name, probe))
+        env_info = replace(base, **results)
+        self._store_snapshot(key, now, env_info, selection)
+        return env_info
+    
+    async def detect_environment_async(self, workspace_path: Optional[str] = None,
+                                       refresh: bool = False) -> EnvironmentInfo:
+        """Detect environment without blocking the event loop
+        
+        Same caching semantics as ``detect_environment``; on a cache miss the
+        probes run concurrently in anyio worker threads. Concurrent callers
+        with the same fingerprint share one detection instead of starting
+        duplicates (a server warm-up and the first tool call, for example).
+        """
+        with tracer.span('detect', workspace=workspace_path, refresh=refresh) as span:
+            return await self._detect_async(workspace_path, refresh, span)
+    
+    async def _detect_async(self, workspace_path: Optional[str], refresh: bool,
+                            span) -> EnvironmentInfo:
+        key = self.fingerprint(workspace_path)
+        now = time.monotonic()
+        
+        if not refresh:
+            cached = self._cached_snapshot(key, now)
+            if cached is not None:
+                span.set('source', 'cache')
+                return cached
+            pending = self._inflight.get(key)
+            if pending is not None:
+                metrics.incr('detect.shared')
+                span.set('source', 'shared')
+                await pending.done.wait()
+                if pending.result is not None:
+                    return pending.result
+        
+        span.set('source', 'probes')
+        flight = _InFlight()
+        self._inflight[key] = flight
+        try:
+            # Taken before the probes, so an edit made while they run is
+            # seen as a change on the next lookup
+            selection = await cancellation.run_sync(
+                self.inventory.selection_stamp, workspace_path)
+            base = self._base_environment(workspace_path)
+            results: Dict[str, Any] = {}
+            
+            async def run_probe(name: str, probe: Callable[[], Dict[str, Any]]) -> None:
+                results.update(await cancellation.run_sync(self._run_probe, name, probe))
+            
+            async with anyio.create_task_group() as tg:
+                for name, probe in self._probes(workspace_path).items():
+                    tg.start_soon(run_probe, name, probe)
+            
+            flight.result = replace(base, **results)
+            self._store_snapshot(key, now, flight.result, selection)
+            return flight.result
+        finally:
+            if self._inflight.get(key) is flight:
+                del self._inflight[key]
+            flight.done.set()
+    
+    def invalidate(self, workspace_path: Optional[str] = None) -> None:
+        """Drop cached snapshots, optionally only those for one workspace"""
+        with self._lock:
+            if workspace_path is None:
+                self._snapshots.clear()
+                for context in self.contexts.values():
+                    context.snapshots.clear()
+                return
+            context = self.contexts.peek(workspace_path)
+            if context is not None:
+                context.snapshots.clear()
+            for key in [k for k in self._snapshots if k[-1] == workspace_path]:
+                del self._snapshots[key]
+    
+    def command_memo(self, workspace_path: Optional[str]) -> Optional["OrderedDict[tuple, Dict[str, str]]"]:
+        """Command memo of a workspace's context, or None for the shared one"""
+        context = self._context(workspace_path, create=True)
+        return context.commands if context is not None else None
+    
+    def _context(self, workspace_path: Optional[str],
+                 create: bool = False) -> Optional[WorkspaceContext]:
+        """Existing context of a workspace, without touching LRU order
+        
+        With ``create`` a missing context is created, but only for a path
+        that is an existing directory, so arbitrary paths cannot evict real
+        workspaces.
+        """
+        if not workspace_path:
+            return None
+        context = self.contexts.peek(workspace_path)
+        if context is None and create and os.path.isdir(workspace_path):
+            context = self.contexts.get(workspace_path)
+        return context
+    
+    def _snapshot_store(self, workspace_path: Optional[str]) -> Dict[tuple, tuple]:
+        """Where to store a snapshot: the workspace's context, or the detector
+        for no workspace or one that is not a directory
+        """
+        context = self._context(workspace_path, create=True)
+        return context.snapshots if context is not None else self._snapshots
+    
+    def _cached_snapshot(self, key: tuple, now: float) -> Optional[EnvironmentInfo]:
+        """Return the cached snapshot for key if it has not expired
+        
+        Snapshots of a watched workspace are also dropped as soon as the
+        watcher reports a change in it, those of any workspace as soon as
+        one of its root manifests changes, and any snapshot as soon as a
+        version file behind the shims on PATH (``.python-version``,
+        ``.tool-versions``, ...) changes.
+        """
+        workspace_path = key[-1]
+        context = self._context(workspace_path)
+        snapshots = context.snapshots if context is not None else self._snapshots
+        cached = snapshots.get(key)
+        if cached is None or now - cached[0] >= self.cache_ttl:
+            metrics.cache_lookup('snapshot', False)
+            return None
+        if workspace_path and (self.indexer.is_stale(workspace_path)
+                               or self._manifests_changed(workspace_path)):
+            metrics.cache_lookup('snapshot', False)
+            return None
+        if self.inventory.selection_stamp(workspace_path) != cached[2]:
+            metrics.cache_lookup('snapshot', False)
+            return None
+        metrics.cache_lookup('snapshot', True)
+        if context is not None:
+            # Served from the context, so mark it recently used
+            self.contexts.get(workspace_path)
+        return cached[1]
+    
+    def _manifests_changed(self, workspace_path: str) -> bool:
+        """True if a root manifest changed since the workspace was probed"""
+        context = self.contexts.peek(workspace_path)
+        if context is None or context.manifest_stamp is None:
+            return False
+        return self.manifests.stamp(context.root) != context.manifest_stamp
+    
+    def _store_snapshot(self, key: tuple, now: float, env_info: EnvironmentInfo,
+                        selection: tuple = ()) -> None:
+        """Cache a snapshot, pruning expired and surplus entries"""
+        if self.cache_ttl <= 0:
+            return
+        workspace_path = key[-1]
+        snapshots = self._snapshot_store(workspace_path)
+        with self._lock:
+            expired = [k for k, (ts, _, _) in snapshots.items()
+                       if now - ts >= self.cache_ttl]
+            for k in expired:
+                del snapshots[k]
+            while len(snapshots) >= MAX_CACHED_SNAPSHOTS:
+                # Dicts keep insertion order, so the first key is the oldest
+                del snapshots[next(iter(snapshots))]
+            snapshots[key] = (now, env_info, selection)
+        if workspace_path:
+            self.contexts.enforce_limits()
+    
+    def _base_environment(self, workspace_path: Optional[str]) -> EnvironmentInfo:
+        """Environment fields derived from the OS and variables alone"""
+        os_type = platform.system().lower()
+        
+        # Detect shell and commands based on OS
+        if os_type == 'windows':
+            shell = 'powershell'
+            shell_syntax = 'powershell'
+            python_cmd = 'python'
+            node_cmd = 'node'
+            user = os.getenv('USERNAME', 'unknown')
+            home_dir = os.getenv('USERPROFILE', '')
+        else:  # Linux/macOS
+            shell_env = os.getenv('SHELL', '/bin/bash')
+            shell = os.path.basename(shell_env)
+            shell_syntax = 'bash' if 'bash' in shell else shell
+            python_cmd = 'python3'
+            node_cmd = 'node'
+            user = os.getenv('USER', 'unknown')
+            home_dir = os.getenv('HOME', '')
+        
+        return EnvironmentInfo(
+            os_type=os_type,
+            shell=shell,
+            shell_syntax=shell_syntax,
+            python_cmd=python_cmd,
+            node_cmd=node_cmd,
+            user=user,
+            home_dir=home_dir,
+            workspace_dir=workspace_path,
+        )
+    
+    def _probes(self, workspace_path: Optional[str]) -> Dict[str, Callable[[], Dict[str, Any]]]:
+        """Blocking probes by name; each returns EnvironmentInfo fields to set"""
+        probes: Dict[str, Callable[[], Dict[str, Any]]] = {
+            'docker': lambda: {'has_docker': self._command_exists('docker')},
+            'git': lambda: {'has_git': self._command_exists('git')},
+        }
+        if self.toolchains is not None:
+            probes['toolchains'] = lambda: self._probe_toolchains(workspace_path)
+        else:
+            probes['interpreters'] = lambda: {
+                'interpreters': self.inventory.scan(workspace_path)}
+        if workspace_path:
+            probes['workspace'] = lambda: self._probe_workspace(workspace_path)
+        return probes
+    
+    @staticmethod
+    def _run_probe(name: str, probe: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """Run one probe, recording its duration"""
+        with tracer.span(f'probe.{name}'), metrics.timer(f'probe.{name}'):
+            return probe()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Sizes of the detector's caches, for diagnostics"""
+        watcher = self.indexer.watcher
+        return {
+            'snapshots': len(self._snapshots) + sum(
+                len(context.snapshots) for context in self.contexts.values()),
+            'inflight': len(self._inflight),
+            'indexed_workspaces': self.indexer.workspace_count,
+            'workspaces': self.contexts.stats(),
+            'watcher_backend': watcher.backend.name if watcher else None,
+            'watched_dirs': watcher.watch_count if watcher else 0,
+        }
+    
+    def _probe_toolchains(self, workspace_path: Optional[str]) -> Dict[str, Any]:
+        """Installed tool versions, the interpreter commands that exist and
+        the interpreter inventory (taken after probing so it can reuse the
+        versions just found)
+        """
+        found = self.toolchains.probe()
+        interpreters = self.inventory.scan(workspace_path)
+        # A shim's probed version is whichever one it ran when first probed;
+        # the inventory resolves what it selects now
+        shims = {}
+        for entries in interpreters.values():
+            for entry in entries:
+                if entry['source'] not in ('path', 'nvm'):
+                    directory = os.path.dirname(entry['path'])
+                    for command in (entry['command'], *entry['aliases']):
+                        shims[os.path.join(directory, command)] = entry
+        for tool in found.values():
+            entry = shims.get(os.path.splitext(tool['path'])[0] if IS_WINDOWS else tool['path'])
+            if entry is not None and entry['version']:
+                tool['version'] = entry['version']
+        fields: Dict[str, Any] = {
+            'toolchains': found,
+            'interpreters': interpreters,
+        }
+        if 'python' in found:
+            fields['python_cmd'] = found['python']['command']
+        if 'node' in found:
+            fields['node_cmd'] = found['node']['command']
+        return fields
+    
+    def _probe_workspace(self, workspace_path: str) -> Dict[str, Any]:
+        """Index the workspace, if it exists, for its project type, sub-projects,
+        package managers and root manifests
+        """
+        if not os.path.isdir(workspace_path):
+            if os.path.exists(workspace_path):
+                return {'project_type': self._detect_project_type(workspace_path)}
+            return {}
+        index = self.indexer.index(workspace_path)
+        context = self._context(workspace_path, create=True)
+        stamp = self.manifests.stamp(context.root)
+        manifests = self.manifests.summary(context.root, stamp)
+        context.manifest_stamp = stamp
+        package_managers = index.package_managers
+        declared = manifests.get('package.json', {}).get('package_manager')
+        if declared:
+            # "packageManager": "pnpm@8.15.0" (corepack) wins over lockfiles
+            package_managers['node'] = declared.split('@', 1)[0]
+        if (package_managers.get('python') == 'pip'
+                and manifests.get('pyproject.toml', {}).get('poetry')):
+            package_managers['python'] = 'poetry'
+        return {'project_type': index.project_type, 'projects': index.projects(),
+                'manifests': manifests, 'package_managers': package_managers}
+    
+    def _command_exists(self, command: str) -> bool:
+        """Check if a command exists in PATH"""
+        return self.resolver.exists(command)
+    
+    def _detect_project_type(self, workspace_path: str) -> str:
+        """Detect project type based on files in the workspace root"""
+        path = Path(workspace_path)
+        with tracer.span('project_type'):
+            return classify_markers({name for name in MARKER_FILES
+                                     if (path / name).exists()})
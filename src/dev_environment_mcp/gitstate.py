@@ -0,0 +1,215 @@
+"""
+Git repository state without running git
+
+Reads ``.git`` directly: HEAD, loose refs and packed-refs for the branch and
+commit, the index header for its version and entry count, and the state
+files git leaves while a merge, rebase, cherry-pick, revert or bisect is in
+progress. Worktrees and submodules (a ``.git`` file pointing elsewhere) are
+followed.
+
+States are cached per repository and revalidated with a few ``stat`` calls:
+the mtimes of HEAD, the index, the git directory (state files are created
+and removed there), packed-refs and the current branch's loose ref.
+"""
+
+import os
+import struct
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from .metrics import metrics
+
+MAX_CACHED_REPOS = 256
+
+# State files and directories -> the operation they indicate, in report order
+OPERATION_MARKERS: Tuple[Tuple[str, str], ...] = (
+    ('rebase-merge', 'rebase'),
+    ('rebase-apply/rebasing', 'rebase'),
+    ('rebase-apply/applying', 'am'),
+    ('MERGE_HEAD', 'merge'),
+    ('CHERRY_PICK_HEAD', 'cherry-pick'),
+    ('REVERT_HEAD', 'revert'),
+    ('BISECT_LOG', 'bisect'),
+)
+
+_INDEX_HEADER = struct.Struct('>4sII')
+
+
+def _read_text(path: str) -> Optional[str]:
+    try:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def _mtime(path: str) -> int:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return 0
+
+
+def find_git_dir(path: str) -> Optional[Tuple[str, str]]:
+    """(work tree, git dir) of the repository containing ``path``, or None"""
+    current = os.path.abspath(path)
+    while True:
+        dot_git = os.path.join(current, '.git')
+        if os.path.isdir(dot_git):
+            return current, dot_git
+        if os.path.isfile(dot_git):
+            # Worktree or submodule: "gitdir: <path>"
+            content = _read_text(dot_git) or ''
+            if content.startswith('gitdir:'):
+                git_dir = content[len('gitdir:'):].strip()
+                return current, os.path.normpath(os.path.join(current, git_dir))
+            return None
+        parent = os.path.dirname(current)
+        if parent == current:
+            return None
+        current = parent
+
+
+def common_dir(git_dir: str) -> str:
+    """Directory holding refs shared by all worktrees"""
+    shared = _read_text(os.path.join(git_dir, 'commondir'))
+    if shared:
+        return os.path.normpath(os.path.join(git_dir, shared))
+    return git_dir
+
+
+def resolve_ref(common: str, ref: str) -> Optional[str]:
+    """Commit a ref points to, from its loose file or packed-refs"""
+    for _ in range(5):  # symbolic refs may point at other refs
+        value = _read_text(os.path.join(common, ref))
+        if value is None:
+            return packed_ref(common, ref)
+        if not value.startswith('ref:'):
+            return value or None
+        ref = value[len('ref:'):].strip()
+    return None
+
+
+def packed_ref(common: str, ref: str) -> Optional[str]:
+    try:
+        with open(os.path.join(common, 'packed-refs'), 'r', encoding='utf-8',
+                  errors='replace') as f:
+            for line in f:
+                if line.startswith(('#', '^')):
+                    continue
+                parts = line.split()
+                if len(parts) == 2 and parts[1] == ref:
+                    return parts[0]
+    except OSError:
+        pass
+    return None
+
+
+def read_index_header(git_dir: str) -> Optional[Dict[str, int]]:
+    """Version and entry count of the index, from its 12-byte header"""
+    try:
+        with open(os.path.join(git_dir, 'index'), 'rb') as f:
+            header = f.read(_INDEX_HEADER.size)
+    except OSError:
+        return None
+    if len(header) < _INDEX_HEADER.size:
+        return None
+    signature, version, entries = _INDEX_HEADER.unpack(header)
+    if signature != b'DIRC':
+        return None
+    return {'version': version, 'entries': entries}
+
+
+def in_progress(git_dir: str) -> List[str]:
+    """Operations git has left unfinished, e.g. ['rebase']"""
+    operations: List[str] = []
+    for marker, operation in OPERATION_MARKERS:
+        if operation not in operations and os.path.exists(os.path.join(git_dir, marker)):
+            operations.append(operation)
+    return operations
+
+
+def watched_files(git_dir: str) -> Tuple[str, ...]:
+    """Files whose mtimes tell whether the repository state changed
+
+    HEAD, the index, the git directory itself (state files come and go
+    there), packed-refs and the loose ref of the current branch.
+    """
+    common = common_dir(git_dir)
+    head = _read_text(os.path.join(git_dir, 'HEAD')) or ''
+    watched = [git_dir, os.path.join(git_dir, 'HEAD'), os.path.join(git_dir, 'index'),
+               os.path.join(common, 'packed-refs')]
+    if head.startswith('ref:'):
+        watched.append(os.path.join(common, head[len('ref:'):].strip()))
+    return tuple(watched)
+
+
+def read_repo_state(work_tree: str, git_dir: str) -> Dict[str, Any]:
+    """Branch, HEAD commit, index header and in-progress operations"""
+    common = common_dir(git_dir)
+    head = _read_text(os.path.join(git_dir, 'HEAD')) or ''
+    branch = None
+    if head.startswith('ref:'):
+        ref = head[len('ref:'):].strip()
+        branch = ref[len('refs/heads/'):] if ref.startswith('refs/heads/') else ref
+        commit = resolve_ref(common, ref)
+    else:
+        commit = head or None
+    return {
+        'is_repo': True,
+        'work_tree': work_tree,
+        'git_dir': git_dir,
+        'branch': branch,
+        'detached': branch is None,
+        # None on a branch without commits yet
+        'head': commit,
+        'index': read_index_header(git_dir),
+        'in_progress': in_progress(git_dir),
+    }
+
+
+class RepoStateCache:
+    """Repository states, revalidated by the mtimes of git's state files"""
+
+    def __init__(self, max_entries: int = MAX_CACHED_REPOS):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # git dir -> (watched files, their mtimes, state)
+        self._states: 'OrderedDict[str, Tuple[Tuple[str, ...], tuple, Dict[str, Any]]]' = \
+            OrderedDict()
+
+    def state(self, path: str) -> Dict[str, Any]:
+        """State of the repository containing ``path``"""
+        found = find_git_dir(path)
+        if found is None:
+            return {'is_repo': False, 'path': os.path.abspath(path)}
+        work_tree, git_dir = found
+        with self._lock:
+            cached = self._states.get(git_dir)
+        if cached is not None and cached[1] == self._stamp(cached[0]):
+            metrics.cache_lookup('repo_state', True)
+            with self._lock:
+                if git_dir in self._states:
+                    self._states.move_to_end(git_dir)
+            return cached[2]
+        metrics.cache_lookup('repo_state', False)
+
+        # Stamp before reading: a change made during the read then shows up
+        # as a stale stamp on the next call instead of caching old content
+        watched = watched_files(git_dir)
+        stamp = self._stamp(watched)
+        state = read_repo_state(work_tree, git_dir)
+        with self._lock:
+            self._states[git_dir] = (watched, stamp, state)
+            self._states.move_to_end(git_dir)
+            while len(self._states) > self.max_entries:
+                self._states.popitem(last=False)
+        return state
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    @staticmethod
+    def _stamp(watched: Tuple[str, ...]) -> tuple:
+        return tuple(_mtime(path) for path in watched)
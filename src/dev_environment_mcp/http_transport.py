@@ -0,0 +1,152 @@
+"""
+Streamable HTTP transport
+
+Serves MCP over streamable HTTP (POST with JSON or SSE responses, GET for
+server-initiated SSE streams) so one process can serve many concurrent
+sessions, all sharing the server's detector caches. Listens on a TCP port,
+localhost by default, or on a unix socket.
+
+The endpoint has no authentication and its tools read any path the process
+can read, so listening on a non-loopback address needs ``allow_remote``.
+
+    dev-env-copilot --transport http --port 8765
+    dev-env-copilot --transport http --uds /run/dev-env-copilot.sock
+
+On SIGINT/SIGTERM the listener closes at once, in-flight requests are given
+``shutdown_timeout`` seconds to finish and then open sessions are cancelled.
+"""
+
+import contextlib
+import ipaddress
+from dataclasses import dataclass
+from typing import AsyncIterator, Optional
+
+import uvicorn
+from mcp.server import Server
+from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_MAX_SESSIONS = 64
+DEFAULT_SESSION_IDLE_TIMEOUT = 1800.0
+DEFAULT_SHUTDOWN_TIMEOUT = 10.0
+
+MCP_PATH = "/mcp"
+HEALTH_PATH = "/health"
+
+
+@dataclass
+class HttpConfig:
+    """Listener and session settings for the HTTP transport"""
+    host: str = DEFAULT_HOST
+    port: int = DEFAULT_PORT
+    uds: Optional[str] = None
+    max_sessions: int = DEFAULT_MAX_SESSIONS
+    session_idle_timeout: float = DEFAULT_SESSION_IDLE_TIMEOUT
+    shutdown_timeout: float = DEFAULT_SHUTDOWN_TIMEOUT
+    json_response: bool = False
+    # Listen on a non-loopback host, exposing the server to the network
+    allow_remote: bool = False
+
+    @property
+    def url(self) -> str:
+        """Endpoint clients connect to"""
+        if self.uds:
+            return f"http+unix://{self.uds}{MCP_PATH}"
+        return f"http://{self.host}:{self.port}{MCP_PATH}"
+
+
+def is_loopback(host: str) -> bool:
+    """Whether ``host`` only accepts connections from this machine"""
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def check_config(config: HttpConfig) -> None:
+    """Raise ValueError if the config would expose the server without opting in"""
+    if config.uds is None and not config.allow_remote and not is_loopback(config.host):
+        raise ValueError(
+            f"Refusing to listen on non-loopback address {config.host}: the HTTP "
+            "transport has no authentication; pass --allow-remote to expose it")
+
+
+def create_session_manager(server: Server, config: HttpConfig) -> StreamableHTTPSessionManager:
+    """Session manager enforcing the session limit and idle timeout"""
+    try:
+        return StreamableHTTPSessionManager(
+            app=server,
+            json_response=config.json_response,
+            session_idle_timeout=config.session_idle_timeout,
+            max_sessions=config.max_sessions,
+        )
+    except TypeError as e:
+        raise RuntimeError(
+            "The installed mcp package does not support session limits; "
+            "upgrade mcp to use the HTTP transport") from e
+
+
+class _McpEndpoint:
+    """Raw ASGI endpoint, so Starlette routes /mcp without a trailing-slash redirect"""
+
+    def __init__(self, manager: StreamableHTTPSessionManager):
+        self.manager = manager
+
+    async def __call__(self, scope, receive, send) -> None:
+        await self.manager.handle_request(scope, receive, send)
+
+
+def create_http_app(server: Server, config: HttpConfig) -> Starlette:
+    """ASGI application serving ``server`` at /mcp, with a /health probe"""
+    manager = create_session_manager(server, config)
+
+    async def health(request: Request) -> JSONResponse:
+        return JSONResponse({"status": "ok", "max_sessions": config.max_sessions})
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app: Starlette) -> AsyncIterator[None]:
+        async with manager.run():
+            yield
+
+    return Starlette(
+        routes=[
+            Route(HEALTH_PATH, health, methods=["GET"]),
+            Route(MCP_PATH, endpoint=_McpEndpoint(manager)),
+        ],
+        lifespan=lifespan,
+    )
+
+
+class _UvicornServer(uvicorn.Server):
+    """uvicorn server that does not re-raise the signal that stopped it
+
+    uvicorn re-raises SIGINT/SIGTERM after its graceful shutdown, which would
+    kill the process before the caller can flush traces and write stats.
+    """
+
+    def handle_exit(self, sig, frame) -> None:
+        super().handle_exit(sig, frame)
+        getattr(self, '_captured_signals', []).clear()
+
+
+async def serve_http(server: Server, config: HttpConfig) -> None:
+    """Serve until interrupted, then shut down gracefully"""
+    check_config(config)
+    app = create_http_app(server, config)
+    uvicorn_config = uvicorn.Config(
+        app,
+        host=config.host,
+        port=config.port,
+        uds=config.uds,
+        log_level="warning",
+        lifespan="on",
+        timeout_graceful_shutdown=config.shutdown_timeout,
+    )
+    await _UvicornServer(uvicorn_config).serve()
@@ -0,0 +1,316 @@
+"""
+Interpreter inventory
+
+Lists every Python and Node interpreter on PATH from the PathResolver's
+directory index (no extra directory scans) and works out what each one
+is without executing it:
+
+* version-manager shims (pyenv, nodenv, asdf) are resolved the way the
+  manager would, from its version environment variable, the nearest
+  version file above the workspace, or its global version file;
+* versions come from install paths (``versions/3.11.7``, nvm's
+  ``versions/node/v20.1.0``), from the probed version of the same binary
+  when one is cached, or from the binary's name (``python3.11``).
+
+Names that lead to the same binary are merged into one entry.
+"""
+
+import os
+import re
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from .pathresolver import IS_WINDOWS, PathResolver
+
+# Interpreter families and the executable names that belong to them
+FAMILIES: Tuple[Tuple[str, 're.Pattern'], ...] = (
+    ('python', re.compile(r'^(?:python|pypy)(?:\d+(?:\.\d+)?m?)?$')),
+    ('node', re.compile(r'^(?:node|nodejs)$')),
+)
+
+# Per family: (pyenv-style manager, its version variable, its version file)
+# and the asdf plugin name
+_PYENV_STYLE = {
+    'python': ('pyenv', 'PYENV_VERSION', '.python-version'),
+    'node': ('nodenv', 'NODENV_VERSION', '.node-version'),
+}
+_ASDF_PLUGINS = {'python': 'python', 'node': 'nodejs'}
+
+# Versions embedded in install paths: pyenv/nodenv/nvm and asdf layouts
+_PATH_VERSION_RES = (
+    re.compile(r'[/\\]versions[/\\](?:node[/\\])?v?(\d+(?:\.\d+)+)[^/\\]*[/\\]'),
+    re.compile(r'[/\\]installs[/\\][^/\\]+[/\\](\d+(?:\.\d+)+)[^/\\]*[/\\]'),
+)
+_NAME_VERSION_RE = re.compile(r'(\d+(?:\.\d+)+)')
+
+# Environment variables that change which interpreter a shim selects
+SELECTION_VARIABLES = (
+    'PYENV_VERSION', 'NODENV_VERSION', 'ASDF_PYTHON_VERSION', 'ASDF_NODEJS_VERSION',
+)
+
+
+@dataclass(frozen=True)
+class ShimManager:
+    """A version manager owning a shims directory"""
+    name: str
+    root: str
+    # 'versions' (pyenv/nodenv) or 'installs' (asdf)
+    layout: str
+
+
+def classify(name: str) -> Optional[Tuple[str, str]]:
+    """(family, command) for an interpreter executable name, else None"""
+    command = name
+    if IS_WINDOWS:
+        command, ext = os.path.splitext(name)
+        if ext not in ('.exe', '.bat', '.cmd'):
+            return None
+    for family, pattern in FAMILIES:
+        if pattern.match(command):
+            return family, command
+    return None
+
+
+def shim_manager(directory: str) -> Optional[ShimManager]:
+    """The version manager whose shims live in ``directory``, if any"""
+    if os.path.basename(directory.rstrip('/\\')) != 'shims':
+        return None
+    root = os.path.dirname(directory.rstrip('/\\'))
+    name = os.path.basename(root).lstrip('.')
+    if os.path.isdir(os.path.join(root, 'installs')):
+        return ShimManager(name, root, 'installs')
+    if os.path.isdir(os.path.join(root, 'versions')):
+        return ShimManager(name, root, 'versions')
+    return None
+
+
+def _find_upwards(start: Optional[str], filename: str) -> Optional[str]:
+    """Nearest ``filename`` in ``start`` or one of its parents"""
+    if not start:
+        return None
+    current = os.path.abspath(start)
+    while True:
+        candidate = os.path.join(current, filename)
+        if os.path.isfile(candidate):
+            return candidate
+        parent = os.path.dirname(current)
+        if parent == current:
+            return None
+        current = parent
+
+
+def _read_words(path: Optional[str]) -> List[str]:
+    if not path:
+        return []
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return [word for line in f for word in line.split('#', 1)[0].split()]
+    except OSError:
+        return []
+
+
+def _tool_versions(path: Optional[str], plugin: str) -> List[str]:
+    """Versions listed for ``plugin`` in an asdf .tool-versions file"""
+    if not path:
+        return []
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                words = line.split('#', 1)[0].split()
+                if words and words[0] == plugin:
+                    return words[1:]
+    except OSError:
+        pass
+    return []
+
+
+def _file_stamp(path: Optional[str]) -> Optional[Tuple[int, int]]:
+    if not path:
+        return None
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def selection_files(manager: ShimManager, workspace_path: Optional[str]) -> List[Optional[str]]:
+    """Version files that decide what ``manager``'s shims run for a workspace
+
+    The nearest local version file (None while there is none) and the
+    global one, whether or not it exists.
+    """
+    if manager.layout == 'installs':
+        return [_find_upwards(workspace_path, '.tool-versions'),
+                os.path.join(os.path.expanduser('~'), '.tool-versions')]
+    files: List[Optional[str]] = [
+        _find_upwards(workspace_path, version_file)
+        for name, _, version_file in _PYENV_STYLE.values() if name == manager.name]
+    return files + [os.path.join(manager.root, 'version')]
+
+
+def path_version(real_path: str) -> Optional[str]:
+    """Version implied by an install location (``versions/3.11.7/bin``)"""
+    for pattern in _PATH_VERSION_RES:
+        match = pattern.search(real_path)
+        if match:
+            return match.group(1)
+    return None
+
+
+def name_version(command: str, real_path: str) -> Optional[str]:
+    """Version implied by the binary's or the command's name (``python3.11``)"""
+    for name in (os.path.basename(real_path), command):
+        match = _NAME_VERSION_RE.search(name)
+        if match:
+            return match.group(1)
+    return None
+
+
+class InterpreterInventory:
+    """Enumerates the interpreters reachable through PATH"""
+
+    def __init__(self, resolver: PathResolver, toolchains=None):
+        self.resolver = resolver
+        # Optional ToolchainProber whose cached versions are reused
+        self.toolchains = toolchains
+        # (PATH directories, the python/node shim managers among them)
+        self._managers: Tuple[Tuple[str, ...], List[ShimManager]] = ((), [])
+
+    def scan(self, workspace_path: Optional[str] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """Family -> interpreters in PATH order
+
+        Each entry has the command name, the path found on PATH, the binary
+        it leads to, its version (None if unknown) and its source (a shim
+        manager, nvm, or 'path'). Other names for the same binary are
+        ``aliases``; ``default_for`` lists the names that run this binary
+        when invoked without a path.
+        """
+        directories = self.resolver.entries()
+        found: Dict[str, 'OrderedDict[str, Dict[str, Any]]'] = {
+            family: OrderedDict() for family, _ in FAMILIES}
+        seen_commands = set()
+
+        for position, (directory, names) in enumerate(directories):
+            manager = shim_manager(directory)
+            for name in sorted(names):
+                classified = classify(name)
+                if classified is None:
+                    continue
+                family, command = classified
+                path = os.path.join(directory, name)
+                if not self.resolver.is_executable(path):
+                    continue
+                default = command not in seen_commands
+                seen_commands.add(command)
+
+                version = None
+                if manager is not None:
+                    target, version = self._resolve_shim(
+                        manager, family, name, directories[position + 1:], workspace_path)
+                    if target is None:
+                        continue
+                    source = manager.name
+                else:
+                    target = path
+                    source = 'nvm' if '.nvm' in path.split(os.sep) else 'path'
+
+                real_path = os.path.realpath(target)
+                entry = found[family].get(real_path)
+                if entry is not None:
+                    if command != entry['command'] and command not in entry['aliases']:
+                        entry['aliases'].append(command)
+                    if default:
+                        entry['default_for'].append(command)
+                    continue
+                found[family][real_path] = {
+                    'command': command,
+                    'path': path,
+                    'target': real_path,
+                    'version': version or self._version(command, real_path),
+                    'source': source,
+                    'aliases': [],
+                    'default_for': [command] if default else [],
+                }
+        return {family: list(entries.values()) for family, entries in found.items()}
+
+    def selection_stamp(self, workspace_path: Optional[str] = None) -> tuple:
+        """Stamps of the version files behind the shims on PATH
+
+        Changes when one of them is edited, created or removed, so snapshots
+        holding shim resolutions can be dropped. Empty without shims on PATH.
+        """
+        stamps = []
+        for manager in self._shim_managers():
+            stamps.extend((path, _file_stamp(path))
+                          for path in selection_files(manager, workspace_path))
+        return tuple(stamps)
+
+    def _shim_managers(self) -> List[ShimManager]:
+        """Managers whose shims on PATH can run python or node, cached per PATH"""
+        directories = tuple(directory for directory, _ in self.resolver.entries())
+        if directories != self._managers[0]:
+            managers = []
+            for directory in directories:
+                manager = shim_manager(directory)
+                if manager is not None and (
+                        manager.layout == 'installs'
+                        or any(style[0] == manager.name for style in _PYENV_STYLE.values())):
+                    managers.append(manager)
+            self._managers = (directories, managers)
+        return self._managers[1]
+
+    def _version(self, command: str, real_path: str) -> Optional[str]:
+        """Best version known without running the binary"""
+        version = path_version(real_path)
+        if version is None and self.toolchains is not None:
+            version = self.toolchains.cached_version(real_path)
+        return version or name_version(command, real_path)
+
+    def _resolve_shim(self, manager: ShimManager, family: str, name: str,
+                      later_dirs: List[Tuple[str, Any]],
+                      workspace_path: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+        """(binary, version) a shim would run, or (None, None) if it would fail"""
+        for version in self._selected_versions(manager, family, workspace_path):
+            if version == 'system':
+                # The manager falls through to the rest of PATH
+                for directory, names in later_dirs:
+                    if name in names and shim_manager(directory) is None:
+                        return os.path.join(directory, name), None
+                continue
+            if manager.layout == 'installs':
+                prefix = os.path.join(manager.root, 'installs', _ASDF_PLUGINS[family], version)
+            else:
+                prefix = os.path.join(manager.root, 'versions', version)
+            binary = os.path.join(prefix, 'Scripts' if IS_WINDOWS else 'bin', name)
+            if self.resolver.is_executable(binary):
+                return binary, version
+        return None, None
+
+    @staticmethod
+    def _selected_versions(manager: ShimManager, family: str,
+                           workspace_path: Optional[str]) -> List[str]:
+        """Versions the manager would try, in order, for a workspace"""
+        if manager.layout == 'installs':
+            plugin = _ASDF_PLUGINS[family]
+            override = os.getenv(f'ASDF_{plugin.upper()}_VERSION')
+            if override:
+                return [override]
+            local = _tool_versions(_find_upwards(workspace_path, '.tool-versions'), plugin)
+            if local:
+                return local
+            home = os.path.expanduser('~')
+            return _tool_versions(os.path.join(home, '.tool-versions'), plugin) or ['system']
+
+        style = _PYENV_STYLE.get(family)
+        if style is None or style[0] != manager.name:
+            return []
+        _, variable, version_file = style
+        override = os.getenv(variable)
+        if override:
+            return override.split(':')
+        local = _read_words(_find_upwards(workspace_path, version_file))
+        if local:
+            return local
+        return _read_words(os.path.join(manager.root, 'version')) or ['system']
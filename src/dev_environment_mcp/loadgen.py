@@ -0,0 +1,489 @@
+"""
+JSON-RPC load generator
+
+Starts a server, performs the initialize handshake and then pipelines
+``tools/call`` requests without waiting for earlier responses, either with
+a fixed number in flight (``--concurrency``) or at a target request rate
+(``--rate``). Reports throughput, latency percentiles and error counts.
+
+Over stdio each session is a server process; over HTTP all sessions share
+one server, started on a free port unless ``--url`` points at a running one.
+
+    python -m dev_environment_mcp.loadgen --concurrency 32 --requests 2000
+    python -m dev_environment_mcp.loadgen --rate 200 --duration 10 \\
+        --mix detect_environment=1,get_command_syntax=4
+    python -m dev_environment_mcp.loadgen --transport http --sessions 8
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import socket
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from .client import (
+    CLIENT_INFO, PROTOCOL_VERSION, SAMPLE_TOOL_CALLS, server_command, server_env,
+)
+
+DEFAULT_TIMEOUT = 30.0
+
+# Responses can be large (batch results, project lists)
+STREAM_LIMIT = 16 * 1024 * 1024
+
+# Seconds to wait for a spawned HTTP server to answer its health check
+HTTP_START_TIMEOUT = 20.0
+
+
+class StdioTransport:
+    """Pipelined JSON-RPC over a server subprocess's stdin/stdout"""
+
+    name = "stdio"
+
+    def __init__(self, command: Optional[List[str]] = None,
+                 env: Optional[Dict[str, str]] = None):
+        self.command = command or server_command()
+        self.env = env or server_env()
+        self._proc: Optional[asyncio.subprocess.Process] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._next_id = 1
+        self._reader: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        self._proc = await asyncio.create_subprocess_exec(
+            *self.command,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+            env=self.env,
+            limit=STREAM_LIMIT,
+        )
+        self._reader = asyncio.ensure_future(self._read_loop())
+
+    async def _read_loop(self) -> None:
+        while True:
+            line = await self._proc.stdout.readline()
+            if not line:
+                break
+            try:
+                message = json.loads(line)
+            except ValueError:
+                continue
+            future = self._pending.pop(message.get("id"), None)
+            if future is not None and not future.done():
+                future.set_result(message)
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError("Server closed stdout"))
+        self._pending.clear()
+
+    async def _write(self, message: Dict[str, Any]) -> None:
+        self._proc.stdin.write((json.dumps(message) + "\n").encode("utf-8"))
+        await self._proc.stdin.drain()
+
+    async def request(self, method: str, params: Optional[Dict[str, Any]] = None
+                      ) -> Dict[str, Any]:
+        request_id = self._next_id
+        self._next_id += 1
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        message = {"jsonrpc": "2.0", "id": request_id, "method": method}
+        if params is not None:
+            message["params"] = params
+        try:
+            await self._write(message)
+            return await future
+        finally:
+            # A timed-out or cancelled request must not leave its future behind
+            self._pending.pop(request_id, None)
+
+    async def notify(self, method: str, params: Optional[Dict[str, Any]] = None) -> None:
+        message = {"jsonrpc": "2.0", "method": method}
+        if params is not None:
+            message["params"] = params
+        await self._write(message)
+
+    async def close(self) -> None:
+        if self._proc is None:
+            return
+        if self._proc.stdin and not self._proc.stdin.is_closing():
+            self._proc.stdin.close()
+        try:
+            await asyncio.wait_for(self._proc.wait(), timeout=5)
+        except asyncio.TimeoutError:
+            self._proc.kill()
+            await self._proc.wait()
+        if self._reader is not None:
+            await self._reader
+        self._proc = None
+
+
+class HttpTransport:
+    """JSON-RPC over streamable HTTP; each request is its own POST
+
+    One instance is one MCP session. Responses may come back as JSON or as
+    an SSE stream; both are accepted.
+    """
+
+    name = "http"
+
+    def __init__(self, url: str):
+        self.url = url
+        self.session_id: Optional[str] = None
+        self._client = None
+        self._next_id = 1
+
+    async def start(self) -> None:
+        self._client = httpx.AsyncClient(
+            timeout=None, limits=httpx.Limits(max_connections=None,
+                                              max_keepalive_connections=64))
+
+    async def _post(self, message: Dict[str, Any]):
+        headers = {"Accept": "application/json, text/event-stream"}
+        if self.session_id:
+            headers["mcp-session-id"] = self.session_id
+        try:
+            response = await self._client.post(self.url, json=message, headers=headers)
+        except httpx.TransportError as e:
+            raise ConnectionError(str(e)) from e
+        if self.session_id is None:
+            self.session_id = response.headers.get("mcp-session-id")
+        return response
+
+    async def request(self, method: str, params: Optional[Dict[str, Any]] = None
+                      ) -> Dict[str, Any]:
+        request_id = self._next_id
+        self._next_id += 1
+        message = {"jsonrpc": "2.0", "id": request_id, "method": method}
+        if params is not None:
+            message["params"] = params
+        response = await self._post(message)
+        if response.status_code >= 400:
+            return {"jsonrpc": "2.0", "id": request_id,
+                    "error": {"code": response.status_code, "message": response.text}}
+        if response.headers.get("content-type", "").startswith("text/event-stream"):
+            for line in response.text.splitlines():
+                if line.startswith("data:"):
+                    data = json.loads(line[5:])
+                    if data.get("id") == request_id:
+                        return data
+            raise ConnectionError("SSE stream ended without a response")
+        return response.json()
+
+    async def notify(self, method: str, params: Optional[Dict[str, Any]] = None) -> None:
+        message = {"jsonrpc": "2.0", "method": method}
+        if params is not None:
+            message["params"] = params
+        await self._post(message)
+
+    async def close(self) -> None:
+        if self._client is None:
+            return
+        if self.session_id:
+            try:
+                await self._client.delete(self.url,
+                                          headers={"mcp-session-id": self.session_id})
+            except httpx.TransportError:
+                pass
+        await self._client.aclose()
+        self._client = None
+
+
+class HttpServerProcess:
+    """A server subprocess serving streamable HTTP on a free local port"""
+
+    def __init__(self, extra_args: Optional[List[str]] = None):
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            self.port = sock.getsockname()[1]
+        self.url = f"http://127.0.0.1:{self.port}/mcp"
+        self.extra_args = extra_args or []
+        self._proc: Optional[asyncio.subprocess.Process] = None
+
+    async def start(self) -> None:
+        self._proc = await asyncio.create_subprocess_exec(
+            *server_command(), "--transport", "http", "--port", str(self.port),
+            *self.extra_args,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.DEVNULL,
+            env=server_env(),
+        )
+        health = f"http://127.0.0.1:{self.port}/health"
+        deadline = time.perf_counter() + HTTP_START_TIMEOUT
+        async with httpx.AsyncClient() as client:
+            while True:
+                try:
+                    if (await client.get(health)).status_code == 200:
+                        return
+                except httpx.TransportError:
+                    pass
+                if self._proc.returncode is not None or time.perf_counter() > deadline:
+                    await self.close()
+                    raise ConnectionError("HTTP server did not start")
+                await asyncio.sleep(0.05)
+
+    async def close(self) -> Optional[int]:
+        """Stop the server with SIGTERM (graceful shutdown); returns its exit code"""
+        if self._proc is None:
+            return None
+        if self._proc.returncode is None:
+            self._proc.terminate()
+            try:
+                await asyncio.wait_for(self._proc.wait(), timeout=15)
+            except asyncio.TimeoutError:
+                self._proc.kill()
+                await self._proc.wait()
+        returncode = self._proc.returncode
+        self._proc = None
+        return returncode
+
+
+class TransportPool:
+    """Spreads requests round-robin over several initialized sessions"""
+
+    def __init__(self, transports: List[Any]):
+        self.transports = transports
+        self.name = transports[0].name
+        self._cycle = itertools.cycle(transports)
+
+    async def start(self) -> None:
+        for transport in self.transports:
+            await transport.start()
+
+    async def request(self, method: str, params: Optional[Dict[str, Any]] = None
+                      ) -> Dict[str, Any]:
+        return await next(self._cycle).request(method, params)
+
+    async def initialize(self) -> None:
+        await asyncio.gather(*(initialize(t) for t in self.transports))
+
+    async def close(self) -> None:
+        await asyncio.gather(*(t.close() for t in self.transports))
+
+
+async def initialize(transport) -> Dict[str, Any]:
+    """The same initialize handshake the integration tests perform"""
+    response = await transport.request("initialize", {
+        "protocolVersion": PROTOCOL_VERSION,
+        "capabilities": {},
+        "clientInfo": CLIENT_INFO,
+    })
+    await transport.notify("notifications/initialized")
+    return response
+
+
+def parse_mix(spec: Optional[str]) -> List[Tuple[str, float]]:
+    """Parse 'tool=weight,tool=weight' (weights default to 1)"""
+    if not spec:
+        return [(tool, 1.0) for tool in SAMPLE_TOOL_CALLS]
+    mix = []
+    for part in spec.split(","):
+        tool, _, weight = part.strip().partition("=")
+        if tool not in SAMPLE_TOOL_CALLS:
+            raise ValueError(f"Unknown tool in mix: {tool} "
+                             f"(choose from {', '.join(SAMPLE_TOOL_CALLS)})")
+        mix.append((tool, float(weight) if weight else 1.0))
+    return mix
+
+
+def percentile(ordered: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))
+    return ordered[index]
+
+
+@dataclass
+class LoadResult:
+    """Latencies and failures collected during a load run"""
+    latencies_ms: List[float] = field(default_factory=list)
+    per_tool: Dict[str, List[float]] = field(default_factory=dict)
+    errors: Dict[str, int] = field(default_factory=dict)
+    elapsed_s: float = 0.0
+
+    def record(self, tool: str, latency_ms: float, error: Optional[str]) -> None:
+        if error is not None:
+            self.errors[error] = self.errors.get(error, 0) + 1
+            return
+        self.latencies_ms.append(latency_ms)
+        self.per_tool.setdefault(tool, []).append(latency_ms)
+
+    def report(self) -> Dict[str, Any]:
+        def stats(samples: List[float]) -> Dict[str, float]:
+            ordered = sorted(samples)
+            return {
+                "count": len(ordered),
+                "p50_ms": percentile(ordered, 0.50),
+                "p95_ms": percentile(ordered, 0.95),
+                "p99_ms": percentile(ordered, 0.99),
+                "max_ms": ordered[-1] if ordered else 0.0,
+            }
+
+        completed = len(self.latencies_ms)
+        return {
+            "completed": completed,
+            "errors": sum(self.errors.values()),
+            "error_types": dict(self.errors),
+            "elapsed_s": self.elapsed_s,
+            "throughput_rps": completed / self.elapsed_s if self.elapsed_s else 0.0,
+            "latency": stats(self.latencies_ms),
+            "per_tool": {tool: stats(samples) for tool, samples in self.per_tool.items()},
+        }
+
+
+async def _call(transport, tool: str, result: LoadResult, timeout: float) -> None:
+    started = time.perf_counter()
+    error = None
+    try:
+        response = await asyncio.wait_for(
+            transport.request("tools/call", {
+                "name": tool, "arguments": SAMPLE_TOOL_CALLS[tool]}),
+            timeout=timeout)
+        if "error" in response:
+            error = "jsonrpc_error"
+        elif response.get("result", {}).get("isError"):
+            error = "tool_error"
+    except asyncio.TimeoutError:
+        error = "timeout"
+    except ConnectionError:
+        error = "connection"
+    result.record(tool, (time.perf_counter() - started) * 1000.0, error)
+
+
+async def run_load(transport, mix: List[Tuple[str, float]],
+                   requests: Optional[int] = None, duration: Optional[float] = None,
+                   concurrency: int = 16, rate: Optional[float] = None,
+                   timeout: float = DEFAULT_TIMEOUT, seed: Optional[int] = None
+                   ) -> Dict[str, Any]:
+    """Drive ``transport`` (already initialized) and return the report
+
+    Stops after ``requests`` calls or ``duration`` seconds, whichever comes
+    first. With ``rate`` set, calls are issued open-loop at that many per
+    second; otherwise ``concurrency`` calls are kept in flight.
+    """
+    if requests is None and duration is None:
+        requests = 1000
+    rng = random.Random(seed)
+    tools = [tool for tool, _ in mix]
+    weights = [weight for _, weight in mix]
+    result = LoadResult()
+    deadline = time.perf_counter() + duration if duration else None
+    issued = 0
+
+    def more() -> bool:
+        if requests is not None and issued >= requests:
+            return False
+        return deadline is None or time.perf_counter() < deadline
+
+    started = time.perf_counter()
+    if rate:
+        interval = 1.0 / rate
+        tasks = []
+        next_at = started
+        while more():
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tool = rng.choices(tools, weights)[0]
+            tasks.append(asyncio.ensure_future(_call(transport, tool, result, timeout)))
+            issued += 1
+            next_at += interval
+        await asyncio.gather(*tasks)
+    else:
+        async def worker() -> None:
+            nonlocal issued
+            while more():
+                issued += 1
+                await _call(transport, rng.choices(tools, weights)[0], result, timeout)
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    result.elapsed_s = time.perf_counter() - started
+    return result.report()
+
+
+def create_transport(args: argparse.Namespace, url: Optional[str] = None):
+    """Transport selected on the command line"""
+    if args.transport == "stdio":
+        return StdioTransport()
+    if args.transport == "http":
+        return HttpTransport(url or args.url)
+    raise ValueError(f"Unsupported transport: {args.transport}")
+
+
+async def _main(args: argparse.Namespace) -> Dict[str, Any]:
+    server = None
+    if args.transport == "http" and not args.url:
+        server = HttpServerProcess(["--max-sessions", str(max(args.sessions, 1))])
+        await server.start()
+    pool = TransportPool([create_transport(args, server.url if server else None)
+                          for _ in range(max(args.sessions, 1))])
+    try:
+        await pool.start()
+        await pool.initialize()
+        report = await run_load(
+            pool, parse_mix(args.mix), requests=args.requests,
+            duration=args.duration, concurrency=args.concurrency, rate=args.rate,
+            timeout=args.timeout, seed=args.seed)
+    finally:
+        await pool.close()
+        if server is not None:
+            await server.close()
+    report["transport"] = pool.name
+    report["sessions"] = len(pool.transports)
+    return report
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="dev-env-copilot-loadgen",
+        description="Pipeline tools/call requests against the MCP server")
+    parser.add_argument("--transport", choices=["stdio", "http"], default="stdio")
+    parser.add_argument("--url", help="with --transport http, endpoint of a running "
+                                      "server (default: start one)")
+    parser.add_argument("--sessions", type=int, default=1,
+                        help="client sessions to spread calls over (stdio starts "
+                             "one server per session)")
+    parser.add_argument("--mix", help="weighted tool mix, e.g. "
+                                      "detect_environment=1,get_command_syntax=3")
+    parser.add_argument("--requests", type=int, help="total calls to issue")
+    parser.add_argument("--duration", type=float, help="seconds to run")
+    parser.add_argument("--concurrency", type=int, default=16,
+                        help="calls kept in flight (ignored with --rate)")
+    parser.add_argument("--rate", type=float, help="target calls per second")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT,
+                        help="per-call timeout in seconds")
+    parser.add_argument("--seed", type=int, help="random seed for the tool mix")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    return parser
+
+
+def cli(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    report = asyncio.run(_main(args))
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        latency = report["latency"]
+        print(f"transport:   {report['transport']} ({report['sessions']} session(s))")
+        print(f"completed:   {report['completed']} in {report['elapsed_s']:.2f}s "
+              f"({report['throughput_rps']:.1f} req/s)")
+        print(f"errors:      {report['errors']} {report['error_types'] or ''}")
+        print(f"latency ms:  p50 {latency['p50_ms']:.2f}  p95 {latency['p95_ms']:.2f}  "
+              f"p99 {latency['p99_ms']:.2f}  max {latency['max_ms']:.2f}")
+        for tool, stats in sorted(report["per_tool"].items()):
+            print(f"  {tool:<28} n={stats['count']:<6} p50 {stats['p50_ms']:.2f}  "
+                  f"p95 {stats['p95_ms']:.2f}  p99 {stats['p99_ms']:.2f}")
+    return 1 if report["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(cli())
@@ -0,0 +1,201 @@
+"""
+Project manifest parsing
+
+Reads the manifests in a workspace root (package.json, pyproject.toml,
+Makefile, Cargo.toml) and keeps a summary of what they declare: scripts,
+test configuration and make targets. Command generation uses it to return
+the project's own commands instead of generic guesses.
+
+Parses are cached twice: by file (mtime and size), so an unchanged file is
+only ``stat``-ed, and by content hash, so a file that was touched or
+rewritten with the same content, or an identical manifest in another
+workspace, is not parsed again.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    try:
+        import tomli as tomllib
+    except ImportError:  # pyproject.toml is then skipped
+        tomllib = None
+
+from .metrics import metrics
+
+# Largest manifest read; bigger files are ignored
+MAX_MANIFEST_BYTES = 1024 * 1024
+
+MAX_PARSED_MANIFESTS = 512
+
+# npm's placeholder for a project without tests
+_NPM_NO_TEST = 'no test specified'
+
+_MAKE_TARGET_RE = re.compile(r'^([A-Za-z0-9][A-Za-z0-9_.\-/]*)\s*::?(?!=)', re.MULTILINE)
+
+
+def _parse_package_json(data: bytes) -> Dict[str, Any]:
+    package = json.loads(data.decode('utf-8'))
+    if not isinstance(package, dict):
+        return {}
+    scripts = package.get('scripts')
+    scripts = {str(k): str(v) for k, v in scripts.items()} if isinstance(scripts, dict) else {}
+    test = scripts.get('test')
+    if test is not None and _NPM_NO_TEST in test:
+        del scripts['test']
+    summary: Dict[str, Any] = {'scripts': scripts}
+    if isinstance(package.get('packageManager'), str):
+        summary['package_manager'] = package['packageManager']
+    return summary
+
+
+def _string_keys(table: Any) -> list:
+    return sorted(str(k) for k in table) if isinstance(table, dict) else []
+
+
+def _parse_pyproject(data: bytes) -> Optional[Dict[str, Any]]:
+    if tomllib is None:
+        return None
+    document = tomllib.loads(data.decode('utf-8'))
+    tool = document.get('tool') or {}
+    project = document.get('project') or {}
+    poetry = tool.get('poetry') if isinstance(tool.get('poetry'), dict) else None
+    hatch_envs = (tool.get('hatch') or {}).get('envs') or {}
+    default_env = hatch_envs.get('default') if isinstance(hatch_envs, dict) else None
+
+    dependencies = ' '.join(str(d) for d in project.get('dependencies') or [])
+    for extra in (project.get('optional-dependencies') or {}).values():
+        dependencies += ' ' + ' '.join(str(d) for d in extra or [])
+    if poetry is not None:
+        dependencies += ' ' + ' '.join(_string_keys(poetry.get('dependencies')))
+        for group in (poetry.get('group') or {}).values():
+            dependencies += ' ' + ' '.join(_string_keys((group or {}).get('dependencies')))
+
+    return {
+        'pytest': 'pytest' in tool or 'pytest' in dependencies,
+        'scripts': _string_keys(project.get('scripts')) or
+                   _string_keys((poetry or {}).get('scripts')),
+        'poetry': poetry is not None,
+        'hatch_scripts': _string_keys((default_env or {}).get('scripts')),
+    }
+
+
+def _parse_makefile(data: bytes) -> Dict[str, Any]:
+    targets = []
+    for target in _MAKE_TARGET_RE.findall(data.decode('utf-8', errors='replace')):
+        if target not in targets:
+            targets.append(target)
+    return {'targets': targets}
+
+
+def _parse_cargo(data: bytes) -> Optional[Dict[str, Any]]:
+    if tomllib is None:
+        return None
+    document = tomllib.loads(data.decode('utf-8'))
+    package = document.get('package') or {}
+    return {
+        'name': package.get('name'),
+        'bins': [b.get('name') for b in document.get('bin') or [] if isinstance(b, dict)],
+        'workspace': 'workspace' in document,
+    }
+
+
+def _parse_presence(data: bytes) -> Dict[str, Any]:
+    return {}
+
+
+# Manifest file name -> parser of its content; None from a parser skips the file
+PARSERS: 'OrderedDict[str, Callable[[bytes], Optional[Dict[str, Any]]]]' = OrderedDict([
+    ('package.json', _parse_package_json),
+    ('pyproject.toml', _parse_pyproject),
+    ('Makefile', _parse_makefile),
+    ('makefile', _parse_makefile),
+    ('GNUmakefile', _parse_makefile),
+    ('Cargo.toml', _parse_cargo),
+    ('manage.py', _parse_presence),
+])
+
+
+class ManifestCache:
+    """Parsed manifest summaries, cached by file stamp and content hash"""
+
+    def __init__(self, max_entries: int = MAX_PARSED_MANIFESTS):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # path -> ((mtime_ns, size), content digest)
+        self._files: 'OrderedDict[str, Tuple[Tuple[int, int], str]]' = OrderedDict()
+        # (file name, content digest) -> parsed summary
+        self._parsed: 'OrderedDict[Tuple[str, str], Optional[Dict[str, Any]]]' = OrderedDict()
+
+    @staticmethod
+    def stamp(root: str) -> Tuple[Tuple[str, int, int], ...]:
+        """(name, mtime_ns, size) of each manifest present in ``root``"""
+        stamps = []
+        for name in PARSERS:
+            try:
+                st = os.stat(os.path.join(root, name))
+            except OSError:
+                continue
+            stamps.append((name, st.st_mtime_ns, st.st_size))
+        return tuple(stamps)
+
+    def summary(self, root: str, stamps: Optional[Tuple[Tuple[str, int, int], ...]] = None
+                ) -> Dict[str, Dict[str, Any]]:
+        """Manifest name -> parsed summary, for the manifests in ``root``
+
+        ``stamps`` is a ``stamp(root)`` result the caller already has.
+        """
+        found: Dict[str, Dict[str, Any]] = {}
+        for name, mtime_ns, size in self.stamp(root) if stamps is None else stamps:
+            parsed = self._load(os.path.join(root, name), name, (mtime_ns, size))
+            if parsed is not None:
+                found[name] = parsed
+        return found
+
+    def _load(self, path: str, name: str, stamp: Tuple[int, int]) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            known = self._files.get(path)
+            if known is not None and known[0] == stamp:
+                key = (name, known[1])
+                if key in self._parsed:
+                    self._files.move_to_end(path)
+                    self._parsed.move_to_end(key)
+                    metrics.cache_lookup('manifest', True)
+                    return self._parsed[key]
+        metrics.cache_lookup('manifest', False)
+
+        if stamp[1] > MAX_MANIFEST_BYTES:
+            return None
+        try:
+            with open(path, 'rb') as f:
+                data = f.read(MAX_MANIFEST_BYTES + 1)
+        except OSError:
+            return None
+        digest = hashlib.sha1(data).hexdigest()
+        key = (name, digest)
+        with self._lock:
+            reparse = key not in self._parsed
+        if reparse:
+            metrics.incr('manifest.parsed')
+            try:
+                parsed = PARSERS[name](data)
+            except (ValueError, UnicodeDecodeError, AttributeError, TypeError):
+                # Malformed JSON or TOML (tomllib errors are ValueErrors)
+                parsed = None
+        with self._lock:
+            if reparse:
+                self._parsed[key] = parsed
+            parsed = self._parsed.get(key)
+            self._files[path] = (stamp, digest)
+            while len(self._files) > self.max_entries:
+                self._files.popitem(last=False)
+            while len(self._parsed) > self.max_entries:
+                self._parsed.popitem(last=False)
+        return parsed
@@ -0,0 +1,147 @@
+"""
+In-process metrics
+
+Counters and fixed-bucket latency histograms kept in a single registry.
+Recording is a dict lookup and a bisect under a lock, cheap enough for the
+request hot path. The registry is exposed through the ``server_stats`` tool
+and can be written to a file when the server shuts down.
+"""
+
+import bisect
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+# Upper bounds (milliseconds) of the histogram buckets; the last is open-ended
+BUCKET_BOUNDS_MS = (
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50,
+    100, 250, 500, 1000, 2500, 5000, 10000,
+)
+
+
+class Histogram:
+    """Latency histogram with fixed millisecond buckets"""
+
+    __slots__ = ('count', 'total', 'min', 'max', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = float('inf')
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+
+    def observe(self, value_ms: float) -> None:
+        self.count += 1
+        self.total += value_ms
+        if value_ms < self.min:
+            self.min = value_ms
+        if value_ms > self.max:
+            self.max = value_ms
+        self.buckets[bisect.bisect_left(BUCKET_BOUNDS_MS, value_ms)] += 1
+
+    def quantile(self, fraction: float) -> float:
+        """Upper bound of the bucket holding the given quantile"""
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.buckets):
+            seen += bucket_count
+            if seen >= rank:
+                if index < len(BUCKET_BOUNDS_MS):
+                    return min(BUCKET_BOUNDS_MS[index], self.max)
+                return self.max
+        return self.max
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'mean_ms': self.total / self.count if self.count else 0.0,
+            'min_ms': self.min if self.count else 0.0,
+            'max_ms': self.max,
+            'p50_ms': self.quantile(0.50),
+            'p95_ms': self.quantile(0.95),
+            'p99_ms': self.quantile(0.99),
+            'buckets': {
+                (f'le_{bound}' if index < len(BUCKET_BOUNDS_MS) else 'inf'): n
+                for index, (bound, n) in enumerate(
+                    zip(BUCKET_BOUNDS_MS + (None,), self.buckets))
+                if n
+            },
+        }
+
+
+class Metrics:
+    """Registry of named counters and histograms"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, int] = {}
+        self._histograms: Dict[str, Histogram] = {}
+        self.started_at = time.time()
+
+    def incr(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def observe(self, name: str, value_ms: float) -> None:
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            histogram.observe(value_ms)
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        """Observe the duration of the with-block in histogram ``name``"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, (time.perf_counter() - started) * 1000.0)
+
+    def cache_lookup(self, cache: str, hit: bool) -> None:
+        """Count a hit or miss for the named cache"""
+        self.incr(f'cache.{cache}.{"hit" if hit else "miss"}')
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {name: h.snapshot() for name, h in self._histograms.items()}
+
+        caches: Dict[str, Dict[str, Any]] = {}
+        for name, value in counters.items():
+            parts = name.split('.')
+            if parts[0] == 'cache' and len(parts) == 3:
+                caches.setdefault(parts[1], {'hit': 0, 'miss': 0})[parts[2]] = value
+        for stats in caches.values():
+            lookups = stats['hit'] + stats['miss']
+            stats['hit_ratio'] = stats['hit'] / lookups if lookups else 0.0
+
+        return {
+            'uptime_s': time.time() - self.started_at,
+            'counters': dict(sorted(counters.items())),
+            'histograms': dict(sorted(histograms.items())),
+            'caches': dict(sorted(caches.items())),
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+            self.started_at = time.time()
+
+    def dump(self, path: str, extra: Optional[Dict[str, Any]] = None) -> None:
+        """Write a snapshot as JSON"""
+        snapshot = self.snapshot()
+        snapshot.update(extra or {})
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f, indent=2)
+
+
+# Process-wide registry
+metrics = Metrics()
+
@@ -0,0 +1,170 @@
+"""
+In-process executable lookup
+
+Indexes the directories on PATH once with ``os.scandir`` so that command
+existence checks never have to spawn ``which`` or ``where``. Each directory
+is re-listed only when its mtime changes. The index can be persisted so a
+restarted server only has to ``stat`` the PATH directories.
+"""
+
+import os
+import sys
+import threading
+import time
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from . import cache, cancellation
+from .metrics import metrics
+
+IS_WINDOWS = sys.platform.startswith('win')
+
+# Seconds between mtime checks of the indexed PATH directories
+DEFAULT_RECHECK_INTERVAL = 1.0
+
+PATH_INDEX_CACHE = 'path-index.json'
+
+
+class PathResolver:
+    """Resolves command names against an in-memory index of PATH"""
+
+    def __init__(self, recheck_interval: float = DEFAULT_RECHECK_INTERVAL,
+                 persist: bool = False):
+        self.recheck_interval = recheck_interval
+        self.persist = persist
+        self._loaded = False
+        self._lock = threading.Lock()
+        self._path_value: Optional[str] = None
+        self._dirs: List[str] = []
+        # directory -> (mtime_ns, entry names)
+        self._index: Dict[str, Tuple[int, FrozenSet[str]]] = {}
+        self._checked_at = 0.0
+
+    def which(self, command: str) -> Optional[str]:
+        """Return the full path of ``command`` on PATH, or None"""
+        if os.path.dirname(command):
+            return command if self.is_executable(command) else None
+
+        candidates = self._candidate_names(command)
+        for directory, names in self._snapshot():
+            for candidate in candidates:
+                if candidate in names:
+                    full_path = os.path.join(directory, candidate)
+                    if self.is_executable(full_path):
+                        return full_path
+        return None
+
+    def exists(self, command: str) -> bool:
+        """Check if a command exists in PATH"""
+        return self.which(command) is not None
+
+    def entries(self) -> List[Tuple[str, FrozenSet[str]]]:
+        """(directory, entry names) for each readable PATH directory, in PATH order"""
+        return self._snapshot()
+
+    def refresh(self) -> None:
+        """Force every PATH directory to be re-checked on the next lookup"""
+        with self._lock:
+            self._checked_at = 0.0
+
+    def _snapshot(self) -> List[Tuple[str, FrozenSet[str]]]:
+        """Bring the index up to date and return it in PATH order"""
+        with self._lock:
+            path_value = os.environ.get('PATH', '')
+            now = time.monotonic()
+            if path_value != self._path_value:
+                self._path_value = path_value
+                self._dirs = self._split_path(path_value)
+                self._index = {d: self._index[d] for d in self._dirs if d in self._index}
+                self._checked_at = 0.0
+                if self.persist and not self._loaded:
+                    self._loaded = True
+                    self._load()
+
+            if now - self._checked_at >= self.recheck_interval:
+                changed = False
+                for directory in self._dirs:
+                    # A stat can hang on a dead network mount
+                    cancellation.check()
+                    changed |= self._index_directory(directory)
+                self._checked_at = now
+                if changed and self.persist:
+                    self._save()
+
+            return [(d, self._index[d][1]) for d in self._dirs if d in self._index]
+
+    def _index_directory(self, directory: str) -> bool:
+        """(Re)list a PATH directory if its mtime changed; True if it did"""
+        try:
+            mtime_ns = os.stat(directory).st_mtime_ns
+        except OSError:
+            return self._index.pop(directory, None) is not None
+
+        cached = self._index.get(directory)
+        if cached is not None and cached[0] == mtime_ns:
+            return False
+
+        try:
+            with os.scandir(directory) as entries:
+                names = [entry.name for entry in entries]
+        except OSError:
+            return self._index.pop(directory, None) is not None
+
+        if IS_WINDOWS:
+            names = [name.lower() for name in names]
+        self._index[directory] = (mtime_ns, frozenset(names))
+        metrics.incr('path.dirs_listed')
+        return True
+
+    def _load(self) -> None:
+        """Seed the index from disk; entries are revalidated by mtime
+
+        Listings are keyed by directory rather than by the whole PATH value,
+        so a PATH that merely gained a directory (an activated virtualenv)
+        still reuses every other listing.
+        """
+        data = cache.load_json(PATH_INDEX_CACHE)
+        if not data:
+            return
+        try:
+            for directory, (mtime_ns, names) in data['dirs'].items():
+                if directory in self._dirs:
+                    self._index[directory] = (int(mtime_ns), frozenset(names))
+        except (KeyError, TypeError, ValueError):
+            self._index.clear()
+
+    def _save(self) -> None:
+        cache.save_json(PATH_INDEX_CACHE, {
+            'dirs': {d: [mtime_ns, sorted(names)]
+                     for d, (mtime_ns, names) in self._index.items()},
+        })
+
+    @staticmethod
+    def _split_path(path_value: str) -> List[str]:
+        """Split PATH into unique, non-empty directories keeping order"""
+        seen = set()
+        dirs = []
+        for directory in path_value.split(os.pathsep):
+            directory = directory.strip('"')
+            if directory and directory not in seen:
+                seen.add(directory)
+                dirs.append(directory)
+        return dirs
+
+    @staticmethod
+    def _candidate_names(command: str) -> List[str]:
+        """File names that would satisfy ``command`` on this platform"""
+        if not IS_WINDOWS:
+            return [command]
+
+        command = command.lower()
+        extensions = os.environ.get('PATHEXT', '.COM;.EXE;.BAT;.CMD').lower().split(';')
+        if os.path.splitext(command)[1] in extensions:
+            return [command]
+        return [command + ext for ext in extensions if ext]
+
+    @staticmethod
+    def is_executable(path: str) -> bool:
+        """Check that ``path`` is a file we are allowed to execute"""
+        if IS_WINDOWS:
+            return os.path.isfile(path)
+        return os.path.isfile(path) and os.access(path, os.X_OK)
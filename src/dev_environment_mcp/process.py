@@ -0,0 +1,63 @@
+"""
+Child processes
+
+Version probes run their commands through ``run_subprocess``, which counts
+spawns and timeouts and times each run by executable name. Inside a
+request the child is killed as soon as the request is cancelled.
+"""
+
+import subprocess
+from typing import List, Optional
+
+from . import cancellation
+from .cancellation import CancelToken, Cancelled
+from .metrics import metrics
+
+
+def run_subprocess(args: List[str], **kwargs) -> subprocess.CompletedProcess:
+    """subprocess.run that counts spawns and times them by executable name
+
+    Inside a request the child is killed when the request is cancelled,
+    and Cancelled is raised instead of returning its output.
+    """
+    name = args[0].replace('\\', '/').rsplit('/', 1)[-1]
+    metrics.incr('subprocess.spawned')
+    try:
+        with metrics.timer(f'subprocess.{name}'):
+            token = cancellation.current()
+            if token is None:
+                return subprocess.run(args, **kwargs)
+            return _run_cancellable(args, token, **kwargs)
+    except subprocess.TimeoutExpired:
+        metrics.incr('subprocess.timeout')
+        raise
+
+
+def _run_cancellable(args: List[str], token: CancelToken,
+                     timeout: Optional[float] = None, check: bool = False,
+                     **kwargs) -> subprocess.CompletedProcess:
+    """subprocess.run whose child is killed when ``token`` is cancelled"""
+    token.check()
+    with subprocess.Popen(args, **kwargs) as process:
+        def kill() -> None:
+            try:
+                process.kill()
+            except OSError:
+                pass
+
+        token.add_callback(kill)
+        try:
+            stdout, stderr = process.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            stdout, stderr = process.communicate()
+            raise subprocess.TimeoutExpired(process.args, timeout, stdout, stderr)
+        finally:
+            token.remove_callback(kill)
+        if token.cancelled:
+            metrics.incr('subprocess.cancelled')
+            raise Cancelled()
+        retcode = process.poll()
+    if check and retcode:
+        raise subprocess.CalledProcessError(retcode, process.args, stdout, stderr)
+    return subprocess.CompletedProcess(process.args, retcode, stdout, stderr)
@@ -0,0 +1,339 @@
+"""
+Workspace file search
+
+Walks a workspace with a pool of ``os.scandir`` workers, one directory per
+task, and matches file names (or relative paths) against a glob. Vendor and
+VCS directories are pruned, and ``.gitignore`` files (plus
+``.git/info/exclude``) are honoured through compiled regular expressions,
+so ignored trees are never listed. When the search root is inside a
+repository, the ignore files above it, up to the repository root, apply too.
+
+Matches are handed to a callback in chunks as they are found, and the walk
+stops as soon as the result limit is reached.
+"""
+
+import os
+import queue
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Pattern, Tuple
+
+from . import cancellation
+from .gitstate import common_dir, find_git_dir
+from .metrics import metrics
+from .workspace import SKIPPED_DIRS
+
+DEFAULT_MAX_RESULTS = 1000
+MAX_SEARCH_RESULTS = 10000
+DEFAULT_CHUNK_SIZE = 100
+DEFAULT_SEARCH_WORKERS = min(8, (os.cpu_count() or 1) * 2)
+
+MAX_CACHED_IGNORE_FILES = 4096
+
+
+def glob_regex(pattern: str) -> str:
+    """Regex source for a gitignore-style glob matched against a relative path
+
+    ``*`` and ``?`` stay within one path component, ``**`` spans any number
+    of them and ``[...]`` is a character class.
+    """
+    out = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == '*':
+            if pattern.startswith('**', i):
+                i += 2
+                if i < n and pattern[i] == '/':
+                    # "**/" also matches no directory at all
+                    out.append('(?:.*/)?')
+                    i += 1
+                else:
+                    out.append('.*')
+                continue
+            out.append('[^/]*')
+        elif c == '?':
+            out.append('[^/]')
+        elif c == '[':
+            end = pattern.find(']', i + 2 if pattern.startswith('[!', i) else i + 1)
+            if end == -1:
+                out.append(re.escape(c))
+            else:
+                body = pattern[i + 1:end]
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                out.append('[' + body.replace('\\', '\\\\') + ']')
+                i = end
+        elif c == '\\' and i + 1 < n:
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return ''.join(out)
+
+
+class IgnoreRules:
+    """Compiled rules of one ignore file, relative to its directory"""
+
+    def __init__(self, base: str, lines: List[str], prefix: str = ''):
+        # Relative directory of the ignore file ('' for the workspace root)
+        self.base = base
+        # For an ignore file above the search root: the root's path relative
+        # to the file's directory, with a trailing '/'
+        self.prefix = prefix
+        self.rules: List[Tuple[Pattern[str], bool, bool]] = []
+        for line in lines:
+            line = line.rstrip('\n').rstrip('\r')
+            if not line.endswith('\\ '):
+                line = line.rstrip(' ')
+            if not line or line.startswith('#'):
+                continue
+            negate = line.startswith('!')
+            if negate:
+                line = line[1:]
+            elif line.startswith('\\'):
+                line = line[1:]
+            dir_only = line.endswith('/')
+            line = line.rstrip('/')
+            if not line:
+                continue
+            anchored = '/' in line
+            line = line.lstrip('/')
+            source = glob_regex(line)
+            if not anchored:
+                source = '(?:.*/)?' + source
+            try:
+                regex = re.compile(source + r'\Z')
+            except re.error:
+                continue  # git ignores patterns it cannot parse as well
+            self.rules.append((regex, negate, dir_only))
+
+    def match(self, rel: str, is_dir: bool) -> Optional[bool]:
+        """True/False if a rule decides ``rel`` (relative to the workspace)"""
+        rel = self.prefix + rel
+        if self.base:
+            if not rel.startswith(self.base + '/'):
+                return None
+            rel = rel[len(self.base) + 1:]
+        decision = None
+        for regex, negate, dir_only in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if regex.match(rel):
+                decision = not negate
+        return decision
+
+
+def is_ignored(chain: Tuple[IgnoreRules, ...], rel: str, is_dir: bool) -> bool:
+    """Whether the ignore files from the root down to ``rel`` exclude it"""
+    ignored = False
+    for rules in chain:
+        decision = rules.match(rel, is_dir)
+        if decision is not None:
+            ignored = decision
+    return ignored
+
+
+class FileSearcher:
+    """Parallel, ignore-aware file search with a cache of compiled ignore files"""
+
+    def __init__(self, max_workers: int = DEFAULT_SEARCH_WORKERS):
+        self.max_workers = max_workers
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        # (ignore file path, its directory relative to the search root,
+        #  search root relative to it) -> ((mtime_ns, size), rules)
+        self._ignores: 'OrderedDict[Tuple[str, str, str], Tuple[Tuple[int, int], IgnoreRules]]' = \
+            OrderedDict()
+
+    def search(self, root: str, pattern: str, max_results: int = DEFAULT_MAX_RESULTS,
+               include_hidden: bool = False,
+               on_chunk: Optional[Callable[[int, List[str]], None]] = None,
+               chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict[str, Any]:
+        """Files under ``root`` matching ``pattern``, as sorted relative paths
+
+        A pattern without ``/`` matches file names (``*.py``); one with ``/``
+        matches paths relative to ``root`` (``src/**/test_*.py``).
+        ``on_chunk(found_so_far, new_matches)`` is called from this thread
+        with every ``chunk_size`` matches and with the remainder at the end.
+        Cancelling the current request stops the walk with Cancelled.
+        Raises ValueError for a pattern that cannot be compiled.
+        """
+        started = time.perf_counter()
+        root = os.path.abspath(root)
+        matches_path = '/' in pattern
+        try:
+            regex = re.compile(glob_regex(pattern.lstrip('/')) + r'\Z')
+        except re.error:
+            raise ValueError(f"Invalid pattern: {pattern!r}") from None
+        root_chain = self._root_chain(root)
+
+        matches: List[str] = []
+        chunk: List[str] = []
+        truncated = False
+        dirs_scanned = 0
+        # Workers post one result per directory; this thread consumes them
+        results: 'queue.SimpleQueue' = queue.SimpleQueue()
+        stop = threading.Event()
+        pool = self._executor()
+
+        def cancelled() -> None:
+            stop.set()
+            results.put(None)  # wake this thread up
+
+        token = cancellation.current()
+        if token is not None:
+            token.add_callback(cancelled)
+        pool.submit(self._scan_into, results, stop, root, '', root_chain, include_hidden)
+        outstanding = 1
+        try:
+            while outstanding:
+                item = results.get()
+                if item is None:
+                    cancellation.check()
+                    continue
+                files, subdirs, chain = item
+                outstanding -= 1
+                dirs_scanned += 1
+                for rel in files:
+                    name = rel if matches_path else rel.rsplit('/', 1)[-1]
+                    if regex.match(name):
+                        matches.append(rel)
+                        chunk.append(rel)
+                        if len(matches) >= max_results:
+                            truncated = True
+                            break
+                if truncated:
+                    break
+                for rel in subdirs:
+                    pool.submit(self._scan_into, results, stop, os.path.join(root, rel), rel,
+                                chain, include_hidden)
+                outstanding += len(subdirs)
+                if on_chunk is not None and len(chunk) >= chunk_size:
+                    on_chunk(len(matches), chunk)
+                    chunk = []
+        finally:
+            # Queued directories are skipped once the walk is over
+            stop.set()
+            if token is not None:
+                token.remove_callback(cancelled)
+        if on_chunk is not None and chunk:
+            on_chunk(len(matches), chunk)
+
+        elapsed_ms = (time.perf_counter() - started) * 1000.0
+        metrics.incr('search.dirs_scanned', dirs_scanned)
+        metrics.observe('search', elapsed_ms)
+        matches.sort()
+        return {
+            'root': root,
+            'pattern': pattern,
+            'matches': matches,
+            'count': len(matches),
+            'truncated': truncated,
+            'dirs_scanned': dirs_scanned,
+            'elapsed_ms': round(elapsed_ms, 3),
+        }
+
+    def _root_chain(self, root: str) -> Tuple[IgnoreRules, ...]:
+        """Ignore rules in force at ``root`` from its repository
+
+        The repository's ``info/exclude`` and the ``.gitignore`` files of the
+        directories from the repository root down to (not including) ``root``,
+        whose own ``.gitignore`` is read by the walk.
+        """
+        found = find_git_dir(root)
+        if found is None:
+            return ()
+        work_tree, git_dir = found
+        rel_root = os.path.relpath(root, work_tree).replace(os.sep, '/')
+        parts = [] if rel_root == '.' else rel_root.split('/')
+        files = [(os.path.join(common_dir(git_dir), 'info', 'exclude'), 0)]
+        files.extend((os.path.join(work_tree, *parts[:depth], '.gitignore'), depth)
+                     for depth in range(len(parts)))
+        chain = []
+        for path, depth in files:
+            prefix = '/'.join(parts[depth:])
+            rules = self._rules(path, '', prefix + '/' if prefix else '')
+            if rules is not None:
+                chain.append(rules)
+        return tuple(chain)
+
+    def _executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                thread_name_prefix='search')
+            return self._pool
+
+    def _scan_into(self, results: 'queue.SimpleQueue', stop: threading.Event, path: str,
+                   rel: str, chain: Tuple[IgnoreRules, ...], include_hidden: bool) -> None:
+        """Scan one directory and post the result, always exactly once"""
+        result: Tuple[List[str], List[str], Tuple[IgnoreRules, ...]] = ([], [], chain)
+        try:
+            if not stop.is_set():
+                result = self._scan(path, rel, chain, include_hidden)
+        finally:
+            results.put(result)
+
+    def _scan(self, path: str, rel: str, chain: Tuple[IgnoreRules, ...],
+              include_hidden: bool) -> Tuple[List[str], List[str], Tuple[IgnoreRules, ...]]:
+        """List one directory: (matching candidates, subdirs to walk, ignore chain)"""
+        try:
+            with os.scandir(path) as it:
+                entries = list(it)
+        except OSError:
+            return [], [], chain
+        if any(entry.name == '.gitignore' for entry in entries):
+            rules = self._rules(os.path.join(path, '.gitignore'), rel)
+            if rules is not None:
+                chain = chain + (rules,)
+
+        files: List[str] = []
+        subdirs: List[str] = []
+        prefix = rel + '/' if rel else ''
+        for entry in entries:
+            name = entry.name
+            if not include_hidden and name.startswith('.'):
+                continue
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                continue
+            if is_dir and name in SKIPPED_DIRS:
+                continue
+            child = prefix + name
+            if chain and is_ignored(chain, child, is_dir):
+                continue
+            (subdirs if is_dir else files).append(child)
+        return files, subdirs, chain
+
+    def _rules(self, path: str, base: str, prefix: str = '') -> Optional[IgnoreRules]:
+        """Compiled ignore file, cached until its mtime or size changes"""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        stamp = (st.st_mtime_ns, st.st_size)
+        key = (path, base, prefix)
+        with self._lock:
+            cached = self._ignores.get(key)
+            if cached is not None and cached[0] == stamp:
+                self._ignores.move_to_end(key)
+        hit = cached is not None and cached[0] == stamp
+        metrics.cache_lookup('gitignore', hit)
+        if hit:
+            return cached[1]
+        try:
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                rules = IgnoreRules(base, f.readlines(), prefix)
+        except OSError:
+            return None
+        with self._lock:
+            self._ignores[key] = (stamp, rules)
+            while len(self._ignores) > MAX_CACHED_IGNORE_FILES:
+                self._ignores.popitem(last=False)
+        return rules
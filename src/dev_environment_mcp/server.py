@@ -6,429 +6,254 @@ A Model Context Protocol server for intelligent environment detection
 and cross-platform development command assistance.
 """
 
-import asyncio
-import json
-import sys
 import os
-import platform
-import subprocess
-from dataclasses import dataclass, asdict
-from typing import Dict, List, Optional, Any
-from pathlib import Path
+import sys
+import time
+from dataclasses import asdict
+from typing import TYPE_CHECKING, Dict, List, Optional, Any
 
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
-from mcp.types import Tool, TextContent
+from mcp.types import ListToolsResult, TextContent
 import anyio
 
-# MCP Server implementation
-@dataclass
-class EnvironmentInfo:
-    """Environment information structure"""
-    os_type: str
-    shell: str
-    shell_syntax: str
-    python_cmd: str
-    node_cmd: str
-    user: str
-    home_dir: str
-    workspace_dir: Optional[str] = None
-    project_type: Optional[str] = None
-    has_docker: bool = False
-    has_git: bool = False
+from . import cancellation
+from .cancellation import CancelToken
+from .catalog import CATALOG, MAX_BATCH_ITEMS
+from .commands import CommandSyntaxProvider
+from .encoding import ResponseCache, ResponseEncoder
+from .environment import EnvironmentDetector, EnvironmentInfo
+from .gitstate import RepoStateCache
+from .search import DEFAULT_MAX_RESULTS, MAX_SEARCH_RESULTS, FileSearcher
+from .metrics import metrics
+from .tracing import tracer
 
-class EnvironmentDetector:
-    """Detects development environment configuration"""
-    
-    def detect_environment(self, workspace_path: Optional[str] = None) -> EnvironmentInfo:
-        """Detect current environment configuration"""
-        os_type = platform.system().lower()
-        
-        # Detect shell and commands based on OS
-        if os_type == 'windows':
-            shell = 'powershell'
-            shell_syntax = 'powershell'
-            python_cmd = 'python'
-            node_cmd = 'node'
-            user = os.getenv('USERNAME', 'unknown')
-            home_dir = os.getenv('USERPROFILE', '')
-        else:  # Linux/macOS
-            shell_env = os.getenv('SHELL', '/bin/bash')
-            shell = os.path.basename(shell_env)
-            shell_syntax = 'bash' if 'bash' in shell else shell
-            python_cmd = 'python3'
-            node_cmd = 'node'
-            user = os.getenv('USER', 'unknown')
-            home_dir = os.getenv('HOME', '')
-        
-        # Detect Docker and Git availability
-        has_docker = self._command_exists('docker')
-        has_git = self._command_exists('git')
-        
-        # Detect project type if workspace provided
-        project_type = None
-        if workspace_path and os.path.exists(workspace_path):
-            project_type = self._detect_project_type(workspace_path)
-        
-        return EnvironmentInfo(
-            os_type=os_type,
-            shell=shell,
-            shell_syntax=shell_syntax,
-            python_cmd=python_cmd,
-            node_cmd=node_cmd,
-            user=user,            
-            home_dir=home_dir,
-            workspace_dir=workspace_path,
-            project_type=project_type,
-            has_docker=has_docker,
-            has_git=has_git
-        )
-    
-    def _command_exists(self, command: str) -> bool:
-        """Check if a command exists in PATH"""
-        try:
-            # Use 'where' on Windows, 'which' on Unix-like systems
-            if platform.system().lower() == 'windows':
-                result = subprocess.run(['where', command], 
-                                      capture_output=True, 
-                                      check=False, 
-                                      timeout=2)
-            else:
-                result = subprocess.run(['which', command], 
-                                      capture_output=True, 
-                                      check=False, 
-                                      timeout=2)
-            return result.returncode == 0
-        except (subprocess.TimeoutExpired, FileNotFoundError, OSError):
-            return False
-    
-    def _detect_project_type(self, workspace_path: str) -> str:
-        """Detect project type based on files in workspace"""
-        path = Path(workspace_path)
-        
-        if (path / 'package.json').exists():
-            return 'nodejs'
-        elif (path / 'requirements.txt').exists() or (path / 'pyproject.toml').exists():
-            return 'python'
-        elif (path / 'Dockerfile').exists():
-            return 'docker'
-        elif (path / 'Cargo.toml').exists():
-            return 'rust'
-        elif (path / 'go.mod').exists():
-            return 'go'
-        else:
-            return 'generic'
+if TYPE_CHECKING:
+    from .http_transport import HttpConfig
 
-class CommandSyntaxProvider:
-    """Provides cross-platform command syntax assistance"""
-    
-    def __init__(self, environment: EnvironmentInfo):
-        self.env = environment
+# MCP Server setup
+app = Server("dev-env-copilot")
+
+# Tools whose result depends only on their arguments and the environment
+ENVIRONMENT_TOOLS = frozenset({
+    "detect_environment", "get_command_syntax", "get_command_syntax_batch",
+})
+
+# Tools served by call_tool; other names are recorded as "unknown"
+TOOL_NAMES = frozenset(CATALOG.names)
+
+# Global instances
+detector = EnvironmentDetector()
+encoder = ResponseEncoder()
+responses = ResponseCache()
+repo_states = RepoStateCache()
+searcher = FileSearcher()
+
+@app.list_tools()
+async def list_tools() -> ListToolsResult:
+    """List available tools (built once from the intent registry)"""
+    return CATALOG.result
+
+def _encode(payload: Any) -> str:
+    """Encode a tool result as JSON text in the configured style"""
+    with tracer.span("encode.json"), metrics.timer("encode.json"):
+        return encoder.encode(payload)
+
+def _text_response(payload: Any) -> List[TextContent]:
+    """Encode a tool result as a single JSON text block"""
+    return [TextContent(type="text", text=_encode(payload))]
+
+@app.call_tool()
+async def call_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
+    """Handle tool calls, recording per-tool call counts and latency"""
+    tool = name if name in TOOL_NAMES else "unknown"
+    metrics.incr(f"tool.{tool}.calls")
+    started = time.perf_counter()
+    token = CancelToken()
+    try:
+        with tracer.span(f"tool.{tool}"), cancellation.scope(token):
+            return await _handle_tool(name, arguments or {})
+    except anyio.get_cancelled_exc_class():
+        # notifications/cancelled (or shutdown): stop the work still running
+        token.cancel()
+        metrics.incr(f"tool.{tool}.cancelled")
+        raise
+    except Exception:
+        metrics.incr(f"tool.{tool}.errors")
+        raise
+    finally:
+        metrics.observe(f"tool.{tool}", (time.perf_counter() - started) * 1000.0)
+
+async def _handle_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
+    """Dispatch a tool call to its implementation
     
-    def get_command_syntax(self, intent: str, options: Dict[str, Any] = None) -> Dict[str, str]:
-        """Get platform-specific command syntax for a given intent"""
-        options = options or {}
+    Results of environment-dependent tools are a function of the tool, its
+    arguments and the detected environment, so their encoded text is cached
+    under those and served again without rebuilding or re-encoding it.
+    """
+    if name in ENVIRONMENT_TOOLS:
+        if name == "get_command_syntax_batch":
+            items = arguments.get("items") or []
+            if len(items) > MAX_BATCH_ITEMS:
+                raise ValueError(f"Too many items: {len(items)} (max {MAX_BATCH_ITEMS})")
         
-        commands = {
-            'list_files': self._list_files_command(),
-            'change_directory': self._change_directory_command(options.get('path', '.')),
-            'create_directory': self._create_directory_command(options.get('path', 'newdir')),
-            'copy_file': self._copy_file_command(options.get('source', 'file1'), options.get('dest', 'file2')),
-            'move_file': self._move_file_command(options.get('source', 'file1'), options.get('dest', 'file2')),
-            'delete_file': self._delete_file_command(options.get('path', 'file')),
-            'view_file': self._view_file_command(options.get('path', 'file')),
-            'edit_file': self._edit_file_command(options.get('path', 'file')),
-            'find_files': self._find_files_command(options.get('pattern', '*')),
-            'install_packages': self._install_packages_command(options.get('packages', [])),
-            'run_tests': self._run_tests_command(),
-            'start_server': self._start_server_command(),
-            'docker_build': self._docker_build_command(),
-            'git_status': self._git_status_command(),
-        }
+        workspace_path = arguments.get("workspace_path")
+        refresh = bool(arguments.get("refresh", False))
+        env_info = await detector.detect_environment_async(workspace_path, refresh=refresh)
         
-        if intent in commands:
-            return commands[intent]
-        else:
-            return {'error': f'Unknown intent: {intent}'}
+        key = responses.key(
+            name, {k: v for k, v in arguments.items() if k != "refresh"},
+            env_info.fingerprint())
+        text = responses.get(key)
+        if text is None:
+            text = _encode(_environment_result(name, arguments, env_info))
+            responses.put(key, text)
+        return [TextContent(type="text", text=text)]
     
-    def _list_files_command(self) -> Dict[str, str]:
-        if self.env.os_type == 'windows':
-            return {
-                'powershell': 'Get-ChildItem',
-                'cmd': 'dir',
-                'description': 'List files and directories'
-            }
-        else:
-            return {
-                'bash': 'ls -la',
-                'zsh': 'ls -la',
-                'description': 'List files and directories with details'
-            }
-    
-    def _change_directory_command(self, path: str) -> Dict[str, str]:
-        return {
-            'universal': f'cd "{path}"',
-            'description': f'Change to directory: {path}'
-        }
+    elif name == "repo_state":
+        # A handful of stat calls when cached, so it runs on the event loop
+        path = arguments.get("workspace_path") or os.getcwd()
+        with tracer.span("repo_state", path=path):
+            return _text_response(repo_states.state(path))
     
-    def _create_directory_command(self, path: str) -> Dict[str, str]:
-        if self.env.os_type == 'windows':
-            return {
-                'powershell': f'New-Item -ItemType Directory -Path "{path}"',
-                'cmd': f'mkdir "{path}"',
-                'description': f'Create directory: {path}'
-            }
-        else:
-            return {
-                'bash': f'mkdir -p "{path}"',
-                'description': f'Create directory (with parents): {path}'
-            }
+    elif name == "search_files":
+        return _text_response(await _search_files(arguments))
     
-    def _copy_file_command(self, source: str, dest: str) -> Dict[str, str]:
-        if self.env.os_type == 'windows':
-            return {
-                'powershell': f'Copy-Item "{source}" "{dest}"',
-                'cmd': f'copy "{source}" "{dest}"',
-                'description': f'Copy {source} to {dest}'
-            }
-        else:
-            return {
-                'bash': f'cp "{source}" "{dest}"',
-                'description': f'Copy {source} to {dest}'
-            }
+    elif name == "server_stats":
+        stats = metrics.snapshot()
+        stats["state"] = {
+            "detector": detector.stats(),
+            "command_memo": len(CommandSyntaxProvider._memo),
+            "responses": responses.stats(),
+            "repo_states": len(repo_states),
+            "encoding": encoder.describe(),
+            "catalog_version": CATALOG.version,
+        }
+        if arguments.get("reset"):
+            metrics.reset()
+        return _text_response(stats)
     
-    def _move_file_command(self, source: str, dest: str) -> Dict[str, str]:
-        if self.env.os_type == 'windows':
-            return {
-                'powershell': f'Move-Item "{source}" "{dest}"',
-                'cmd': f'move "{source}" "{dest}"',
-                'description': f'Move {source} to {dest}'
-            }
-        else:
-            return {
-                'bash': f'mv "{source}" "{dest}"',
-                'description': f'Move {source} to {dest}'
-            }
+    else:
+        raise ValueError(f"Unknown tool: {name}")
+
+def _environment_result(name: str, arguments: Dict[str, Any],
+                        env_info: EnvironmentInfo) -> Any:
+    """Build the result payload of an environment-dependent tool"""
+    if name == "detect_environment":
+        return asdict(env_info)
     
-    def _delete_file_command(self, path: str) -> Dict[str, str]:
-        if self.env.os_type == 'windows':
-            return {
-                'powershell': f'Remove-Item "{path}"',
-                'cmd': f'del "{path}"',
-                'description': f'Delete: {path}'
-            }
-        else:
-            return {
-                'bash': f'rm "{path}"',
-                'description': f'Delete: {path}'
-            }
+    syntax_provider = CommandSyntaxProvider(
+        env_info, detector.command_memo(arguments.get("workspace_path")))
     
-    def _view_file_command(self, path: str) -> Dict[str, str]:
-        if self.env.os_type == 'windows':
-            return {
-                'powershell': f'Get-Content "{path}"',
-                'cmd': f'type "{path}"',
-                'description': f'View file contents: {path}'
-            }
-        else:
-            return {
-                'bash': f'cat "{path}"',
-                'description': f'View file contents: {path}'
-            }
+    if name == "get_command_syntax":
+        intent = arguments.get("intent")
+        options = arguments.get("options", {})
+        return syntax_provider.get_command_syntax(intent, options)
     
-    def _edit_file_command(self, path: str) -> Dict[str, str]:
-        if self.env.os_type == 'windows':
-            return {
-                'powershell': f'notepad "{path}"',
-                'cmd': f'notepad "{path}"',
-                'description': f'Edit file: {path}'
-            }
-        else:
-            return {
-                'bash': f'nano "{path}"',
-                'vim': f'vim "{path}"',
-                'description': f'Edit file: {path}'
-            }
+    # get_command_syntax_batch: one environment shared across every item
+    results = []
+    for item in arguments.get("items") or []:
+        if not isinstance(item, dict):
+            item = {}
+        intent = item.get("intent")
+        options = item.get("options") or {}
+        results.append({
+            "intent": intent,
+            "commands": syntax_provider.get_command_syntax(intent, options)
+        })
+    return {"results": results}
+
+async def _search_files(arguments: Dict[str, Any]) -> Dict[str, Any]:
+    """Run a file search in a worker thread, streaming matches as progress
     
-    def _find_files_command(self, pattern: str) -> Dict[str, str]:
-        if self.env.os_type == 'windows':
-            return {
-                'powershell': f'Get-ChildItem -Recurse -Name "{pattern}"',
-                'cmd': f'dir /s /b "{pattern}"',
-                'description': f'Find files matching: {pattern}'
-            }
-        else:
-            return {
-                'bash': f'find . -name "{pattern}"',
-                'description': f'Find files matching: {pattern}'
-            }
+    When the request carries a progress token, every chunk of matches is
+    sent as a progress notification (progress = matches so far, message =
+    the new paths, one per line) while the walk continues.
+    """
+    pattern = arguments.get("pattern")
+    if not pattern or not isinstance(pattern, str):
+        raise ValueError("search_files requires a pattern")
+    root = arguments.get("workspace_path") or os.getcwd()
+    if not os.path.isdir(root):
+        raise ValueError(f"Not a directory: {root}")
+    max_results = int(arguments.get("max_results") or DEFAULT_MAX_RESULTS)
+    max_results = max(1, min(max_results, MAX_SEARCH_RESULTS))
     
-    def _install_packages_command(self, packages: List[str]) -> Dict[str, str]:
-        if not packages:
-            packages = ['package-name']
-        
-        commands = {}
-        
-        if self.env.project_type == 'nodejs':
-            pkg_list = ' '.join(packages)
-            commands['npm'] = f'npm install {pkg_list}'
-            commands['yarn'] = f'yarn add {pkg_list}'
-        elif self.env.project_type == 'python':
-            pkg_list = ' '.join(packages)
-            commands['pip'] = f'{self.env.python_cmd} -m pip install {pkg_list}'
-        
-        commands['description'] = f'Install packages: {", ".join(packages)}'
-        return commands
+    context = app.request_context
+    token = context.meta.progressToken if context.meta else None
     
-    def _run_tests_command(self) -> Dict[str, str]:
-        commands = {}
-        
-        if self.env.project_type == 'nodejs':
-            commands['npm'] = 'npm test'
-            commands['yarn'] = 'yarn test'
-        elif self.env.project_type == 'python':
-            commands['pytest'] = 'pytest'
-            commands['unittest'] = f'{self.env.python_cmd} -m unittest'
-        
-        commands['description'] = 'Run project tests'
-        return commands
+    async def send(found: int, paths: List[str]) -> None:
+        await context.session.send_progress_notification(
+            token, found, message="\n".join(paths),
+            related_request_id=str(context.request_id))
     
-    def _start_server_command(self) -> Dict[str, str]:
-        commands = {}
-        
-        if self.env.project_type == 'nodejs':
-            commands['npm'] = 'npm start'
-            commands['yarn'] = 'yarn start'
-        elif self.env.project_type == 'python':
-            commands['flask'] = 'flask run'
-            commands['django'] = f'{self.env.python_cmd} manage.py runserver'
-        
-        commands['description'] = 'Start development server'
-        return commands
+    def forward_chunk(found: int, paths: List[str]) -> None:
+        anyio.from_thread.run(send, found, paths)
     
-    def _docker_build_command(self) -> Dict[str, str]:
-        if self.env.has_docker:
-            return {
-                'docker': 'docker build -t myapp .',
-                'docker-compose': 'docker-compose build',
-                'description': 'Build Docker image'
-            }
-        else:
-            return {
-                'error': 'Docker not available',
-                'description': 'Docker is not installed or not accessible'
-            }
+    on_chunk = forward_chunk if token is not None else None
     
-    def _git_status_command(self) -> Dict[str, str]:
-        if self.env.has_git:
-            return {
-                'git': 'git status',
-                'git-short': 'git status --short',
-                'description': 'Check Git repository status'
-            }
-        else:
-            return {
-                'error': 'Git not available',
-                'description': 'Git is not installed or not accessible'
-            }
-
-# MCP Server setup
-app = Server("dev-env-copilot")
-
-# Global instances
-detector = EnvironmentDetector()
-
-@app.list_tools()
-async def list_tools() -> List[Tool]:
-    """List available tools"""
-    return [
-        Tool(
-            name="detect_environment",
-            description="Detect current development environment configuration",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "workspace_path": {
-                        "type": "string",
-                        "description": "Optional workspace path to analyze"
-                    }
-                }
-            }
-        ),
-        Tool(
-            name="get_command_syntax",
-            description="Get platform-specific command syntax for development tasks",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "intent": {
-                        "type": "string",
-                        "description": "The development task intent",
-                        "enum": [
-                            "list_files", "change_directory", "create_directory", 
-                            "copy_file", "move_file", "delete_file", "view_file", 
-                            "edit_file", "find_files", "install_packages", 
-                            "run_tests", "start_server", "docker_build", "git_status"
-                        ]
-                    },
-                    "options": {
-                        "type": "object",
-                        "description": "Additional options for the command (e.g., path, packages)"
-                    },
-                    "workspace_path": {
-                        "type": "string",
-                        "description": "Optional workspace path for context"
-                    }
-                },
-                "required": ["intent"]
-            }
-        )
-    ]
+    with tracer.span("search", root=root, pattern=pattern) as span:
+        result = await cancellation.run_sync(
+            lambda: searcher.search(root, pattern, max_results,
+                                    bool(arguments.get("include_hidden")), on_chunk))
+        span.set("matches", result["count"])
+    return result
 
-@app.call_tool()
-async def call_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
-    """Handle tool calls"""
-    if name == "detect_environment":
-        workspace_path = arguments.get("workspace_path")
-        env_info = detector.detect_environment(workspace_path)
-        
-        return [
-            TextContent(
-                type="text",
-                text=json.dumps(asdict(env_info), indent=2)
-            )
-        ]
+async def warm_up(workspace_path: Optional[str] = None) -> None:
+    """Run detection ahead of the first tool call
     
-    elif name == "get_command_syntax":
-        intent = arguments.get("intent")
-        options = arguments.get("options", {})
-        workspace_path = arguments.get("workspace_path")
-        
-        # Get environment for context
-        env_info = detector.detect_environment(workspace_path)
-        
-        # Get command syntax
-        syntax_provider = CommandSyntaxProvider(env_info)
-        commands = syntax_provider.get_command_syntax(intent, options)
-        
-        return [
-            TextContent(
-                type="text",
-                text=json.dumps(commands, indent=2)
-            )
-        ]
-    
-    else:
-        raise ValueError(f"Unknown tool: {name}")
+    Tool calls that arrive while this is running wait for it instead of
+    starting their own detection.
+    """
+    targets = [None] if workspace_path is None else [None, workspace_path]
+    try:
+        async with anyio.create_task_group() as tg:
+            for target in targets:
+                tg.start_soon(detector.detect_environment_async, target)
+    except Exception as e:
+        print(f"Warm-up failed: {e}", file=sys.stderr)
 
-async def main():
-    """Run the MCP server"""
+async def main(workspace_path: Optional[str] = None, warmup: bool = True,
+               stats_file: Optional[str] = None, trace_file: Optional[str] = None,
+               http: Optional["HttpConfig"] = None, compact_json: Optional[bool] = None):
+    """Run the MCP server
+    
+    Serves a single client over stdio, or many concurrent sessions over
+    streamable HTTP when ``http`` is given; HTTP sessions share one
+    detector and its caches.
+    Detection warm-up (including indexing ``workspace_path``, or
+    DEV_ENV_MCP_WORKSPACE) runs concurrently with the initialize handshake.
+    Metrics are written to ``stats_file`` (or DEV_ENV_MCP_STATS_FILE) on exit.
+    Spans are exported to ``trace_file`` (or DEV_ENV_MCP_TRACE_FILE) if set.
+    ``compact_json`` overrides the DEV_ENV_MCP_JSON response style.
+    """
+    workspace_path = workspace_path or os.getenv('DEV_ENV_MCP_WORKSPACE') or None
+    stats_file = stats_file or os.getenv('DEV_ENV_MCP_STATS_FILE') or None
+    trace_file = trace_file or os.getenv('DEV_ENV_MCP_TRACE_FILE') or None
+    if trace_file:
+        tracer.configure(trace_file)
+    if compact_json is not None:
+        encoder.configure(compact=compact_json)
+        responses.clear()
     try:
-        async with stdio_server() as (read_stream, write_stream):
-            await app.run(read_stream, write_stream, app.create_initialization_options())
+        async with anyio.create_task_group() as tg:
+            if warmup:
+                tg.start_soon(warm_up, workspace_path)
+            if http is not None:
+                from .http_transport import serve_http
+                await serve_http(app, http)
+            else:
+                async with stdio_server() as (read_stream, write_stream):
+                    await app.run(read_stream, write_stream,
+                                  app.create_initialization_options())
+            tg.cancel_scope.cancel()
     except Exception as e:
         print(f"Server error: {e}", file=sys.stderr)
         raise
-
-if __name__ == "__main__":
-    anyio.run(main)
+    finally:
+        tracer.flush()
+        if stats_file:
+            try:
+                metrics.dump(stats_file, {"state": {"detector": detector.stats()}})
+            except OSError as e:
+                print(f"Could not write stats to {stats_file}: {e}", file=sys.stderr)
@@ -0,0 +1,81 @@
+"""
+Startup profiler
+
+Reports per-module import time of the server (via ``python -X importtime``)
+and the wall time from process start to the first ``initialize`` response,
+optionally failing when that exceeds a budget. Run it with
+``python -m dev_environment_mcp --profile-startup``.
+"""
+
+import json
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+from .client import StdioClient, server_env
+
+SERVER_MODULE = "dev_environment_mcp.server"
+
+
+def import_times(module: str = SERVER_MODULE) -> List[Dict[str, Any]]:
+    """Import ``module`` in a fresh interpreter and collect -X importtime rows"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env=server_env(), check=False,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr}")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        rows.append({
+            "module": name.strip(),
+            "self_ms": int(self_us) / 1000.0,
+            "cumulative_ms": int(cumulative_us) / 1000.0,
+        })
+    return rows
+
+
+def time_to_initialize() -> float:
+    """Milliseconds from spawning the server to its initialize response"""
+    client = StdioClient()
+    started = time.perf_counter()
+    client.start()
+    try:
+        client.initialize()
+        return (time.perf_counter() - started) * 1000.0
+    finally:
+        client.close()
+
+
+def profile_startup(budget_ms: Optional[float] = None, top: int = 15,
+                    as_json: bool = False) -> int:
+    """Print the startup profile; returns a non-zero exit code over budget"""
+    rows = import_times()
+    server_row = next((r for r in rows if r["module"] == SERVER_MODULE), None)
+    report = {
+        "server_import_ms": server_row["cumulative_ms"] if server_row else None,
+        "time_to_initialize_ms": time_to_initialize(),
+        "budget_ms": budget_ms,
+        "slowest_modules": sorted(rows, key=lambda r: r["self_ms"], reverse=True)[:top],
+    }
+    over_budget = budget_ms is not None and report["time_to_initialize_ms"] > budget_ms
+
+    if as_json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"Server import:          {report['server_import_ms']:.1f} ms")
+        print(f"Time to initialize:     {report['time_to_initialize_ms']:.1f} ms")
+        if budget_ms is not None:
+            print(f"Budget:                 {budget_ms:.1f} ms"
+                  f" ({'EXCEEDED' if over_budget else 'ok'})")
+        print()
+        print(f"{'self ms':>9} {'cumul ms':>9}  module")
+        for row in report["slowest_modules"]:
+            print(f"{row['self_ms']:9.1f} {row['cumulative_ms']:9.1f}  {row['module']}")
+    return 1 if over_budget else 0
@@ -0,0 +1,187 @@
+"""
+Toolchain version detection
+
+Resolves each known tool through the PATH index and runs its version
+command. Probes that are not cached run concurrently in a small thread
+pool, each with a timeout. Versions are cached by the resolved binary's
+real path, inode and mtime (and persisted), so a tool is executed once per
+install or upgrade rather than once per detection.
+"""
+
+import contextvars
+import os
+import re
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import cache, cancellation
+from .metrics import metrics
+from .process import run_subprocess
+from .pathresolver import IS_WINDOWS, PathResolver
+
+DEFAULT_PROBE_TIMEOUT = 3.0
+DEFAULT_MAX_WORKERS = 8
+
+VERSION_CACHE = 'toolchain-versions.json'
+
+_VERSION_RE = re.compile(r'(\d+(?:\.\d+)+)')
+
+
+@dataclass(frozen=True)
+class ToolSpec:
+    """A tool to look for: command names in preference order and its version flag"""
+    name: str
+    commands: Tuple[str, ...]
+    args: Tuple[str, ...] = ('--version',)
+
+
+TOOLS: Tuple[ToolSpec, ...] = (
+    ToolSpec('python', ('python', 'py', 'python3') if IS_WINDOWS else ('python3', 'python')),
+    ToolSpec('pip', ('pip3', 'pip')),
+    ToolSpec('node', ('node',)),
+    ToolSpec('npm', ('npm',)),
+    ToolSpec('yarn', ('yarn',)),
+    ToolSpec('pnpm', ('pnpm',)),
+    ToolSpec('docker', ('docker',)),
+    ToolSpec('git', ('git',)),
+    ToolSpec('go', ('go',), ('version',)),
+    ToolSpec('rustc', ('rustc',)),
+    ToolSpec('cargo', ('cargo',)),
+    ToolSpec('uv', ('uv',)),
+    ToolSpec('poetry', ('poetry',)),
+)
+
+
+def parse_version(output: str) -> Optional[str]:
+    """First dotted version number in a tool's version output"""
+    match = _VERSION_RE.search(output)
+    return match.group(1) if match else None
+
+
+def version_probes_enabled() -> bool:
+    """Version probes can be turned off with DEV_ENV_MCP_VERSION_PROBES=0"""
+    return os.getenv('DEV_ENV_MCP_VERSION_PROBES', '1').lower() not in ('0', 'false', 'no', 'off')
+
+
+class ToolchainProber:
+    """Finds known tools on PATH and reports their versions"""
+
+    def __init__(self, resolver: PathResolver, timeout: float = DEFAULT_PROBE_TIMEOUT,
+                 max_workers: int = DEFAULT_MAX_WORKERS, persist: bool = True,
+                 tools: Tuple[ToolSpec, ...] = TOOLS):
+        self.resolver = resolver
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self.persist = persist
+        self.tools = tools
+        self._lock = threading.Lock()
+        self._loaded = False
+        # real path -> (inode, mtime_ns, version or None)
+        self._versions: Dict[str, Tuple[int, int, Optional[str]]] = {}
+
+    def probe(self) -> Dict[str, Dict[str, Any]]:
+        """Tool name -> command, path and version, for every tool found on PATH"""
+        found: Dict[str, Dict[str, Any]] = {}
+        real_paths: Dict[str, str] = {}
+        pending: Dict[str, Tuple[Tuple[int, int], List[str]]] = {}
+        for spec in self.tools:
+            for command in spec.commands:
+                path = self.resolver.which(command)
+                if path is not None:
+                    break
+            else:
+                continue
+            found[spec.name] = {'command': command, 'path': path, 'version': None}
+            try:
+                real_path = os.path.realpath(path)
+                st = os.stat(real_path)
+            except OSError:
+                continue
+            real_paths[spec.name] = real_path
+            stamp = (st.st_ino, st.st_mtime_ns)
+            hit, version = self._lookup(real_path, stamp)
+            if hit:
+                found[spec.name]['version'] = version
+            elif real_path not in pending:
+                pending[real_path] = (stamp, [path, *spec.args])
+
+        if pending:
+            self._run(pending)
+            for name, real_path in real_paths.items():
+                if real_path in pending:
+                    found[name]['version'] = self._versions[real_path][2]
+        return found
+
+    def cached_version(self, real_path: str) -> Optional[str]:
+        """Version already probed for this binary, without running anything"""
+        with self._lock:
+            entry = self._versions.get(real_path)
+        if entry is None:
+            return None
+        try:
+            st = os.stat(real_path)
+        except OSError:
+            return None
+        return entry[2] if (entry[0], entry[1]) == (st.st_ino, st.st_mtime_ns) else None
+
+    def _lookup(self, real_path: str, stamp: Tuple[int, int]) -> Tuple[bool, Optional[str]]:
+        """(True, version) if the binary is unchanged since it was probed"""
+        with self._lock:
+            if self.persist and not self._loaded:
+                self._loaded = True
+                self._load()
+            entry = self._versions.get(real_path)
+        hit = entry is not None and (entry[0], entry[1]) == stamp
+        metrics.cache_lookup('toolchain', hit)
+        return hit, entry[2] if hit else None
+
+    def _run(self, pending: Dict[str, Tuple[Tuple[int, int], List[str]]]) -> None:
+        """Run the uncached version probes concurrently and record the results
+
+        A cancelled request stops the probes (killing running ones) and
+        records nothing for them.
+        """
+        def run_one(item: Tuple[str, Tuple[Tuple[int, int], List[str]]]) -> None:
+            real_path, (stamp, args) = item
+            cancellation.check()
+            version = self._run_version(args)
+            with self._lock:
+                self._versions[real_path] = (stamp[0], stamp[1], version)
+
+        workers = max(1, min(self.max_workers, len(pending)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            # Each probe runs in a copy of this context, with the request's token
+            futures = [pool.submit(contextvars.copy_context().run, run_one, item)
+                       for item in pending.items()]
+            for future in futures:
+                future.result()
+        if self.persist:
+            self._save()
+
+    def _run_version(self, args: List[str]) -> Optional[str]:
+        """Version reported by one command; None if it failed or timed out"""
+        try:
+            result = run_subprocess(args, stdin=subprocess.DEVNULL,
+                                    stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                    text=True, errors='replace', timeout=self.timeout)
+        except (OSError, subprocess.SubprocessError):
+            return None
+        return parse_version(result.stdout or '')
+
+    def _load(self) -> None:
+        data = cache.load_json(VERSION_CACHE)
+        if not data:
+            return
+        try:
+            for real_path, (inode, mtime_ns, version) in data['versions'].items():
+                self._versions[real_path] = (int(inode), int(mtime_ns), version)
+        except (KeyError, TypeError, ValueError):
+            self._versions.clear()
+
+    def _save(self) -> None:
+        with self._lock:
+            versions = {path: list(entry) for path, entry in self._versions.items()}
+        cache.save_json(VERSION_CACHE, {'versions': versions})
@@ -0,0 +1,228 @@
+"""
+Request tracing
+
+Nested spans around request handling, detection probes, workspace indexing
+and response encoding, exported as JSON lines to a size-rotated file.
+Tracing is off unless a trace file is configured; ``tracer.span()`` then
+returns a shared no-op context manager, so instrumented code pays one
+attribute check per span.
+
+Spans are buffered in memory (bounded; the oldest are dropped if the file
+cannot keep up). Ending a span only appends to the buffer; a daemon writer
+thread does the encoding, writing and rotation when a request's root span
+ends, at most once per flush interval, or when the buffer fills.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, List, Optional
+
+from .metrics import metrics
+
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_BACKUPS = 3
+DEFAULT_MAX_BUFFERED = 4096
+DEFAULT_FLUSH_INTERVAL = 1.0
+
+# Spans written at once when the buffer fills between flush intervals
+FLUSH_BATCH = 512
+
+# Innermost open span of the current task or thread; anyio copies context
+# into worker threads, so probe spans nest under the request that ran them
+_current: ContextVar[Optional['Span']] = ContextVar('dev_env_mcp_span', default=None)
+
+
+class _NoopSpan:
+    """Returned by a disabled tracer"""
+
+    __slots__ = ()
+
+    def __enter__(self) -> '_NoopSpan':
+        return self
+
+    def __exit__(self, *exc_info) -> bool:
+        return False
+
+    def set(self, key: str, value: Any) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Span:
+    """A timed operation; use as a context manager"""
+
+    __slots__ = ('tracer', 'name', 'attrs', 'trace_id', 'span_id', 'parent_id',
+                 'start', '_started', '_token')
+
+    def __init__(self, tracer: 'Tracer', name: str, attrs: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+        self.trace_id = ''
+        self.span_id = ''
+        self.parent_id: Optional[str] = None
+        self.start = 0.0
+        self._started = 0.0
+        self._token = None
+
+    def set(self, key: str, value: Any) -> None:
+        """Attach an attribute to the span"""
+        self.attrs[key] = value
+
+    def __enter__(self) -> 'Span':
+        parent = _current.get()
+        self.span_id = os.urandom(8).hex()
+        if parent is None:
+            self.trace_id = os.urandom(16).hex()
+        else:
+            self.trace_id = parent.trace_id
+            self.parent_id = parent.span_id
+        self._token = _current.set(self)
+        self.start = time.time()
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        duration_ms = (time.perf_counter() - self._started) * 1000.0
+        _current.reset(self._token)
+        record = {
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'name': self.name,
+            'start': self.start,
+            'duration_ms': duration_ms,
+            'thread': threading.current_thread().name,
+        }
+        if self.attrs:
+            record['attrs'] = self.attrs
+        if exc_type is not None:
+            record['error'] = f'{exc_type.__name__}: {exc}'
+        self.tracer._emit(record, root=self.parent_id is None)
+        return False
+
+
+class Tracer:
+    """Creates spans and exports finished ones to a rotating JSONL file"""
+
+    def __init__(self):
+        self.enabled = False
+        self.path: Optional[str] = None
+        self.max_bytes = DEFAULT_MAX_BYTES
+        self.backups = DEFAULT_BACKUPS
+        self.flush_interval = DEFAULT_FLUSH_INTERVAL
+        self._buffer: Deque[Dict[str, Any]] = deque(maxlen=DEFAULT_MAX_BUFFERED)
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._size: Optional[int] = None
+        self._flushed_at = 0.0
+        # Set to wake the writer thread, started by the first configure()
+        self._wake = threading.Event()
+        self._writer: Optional[threading.Thread] = None
+
+    def configure(self, path: Optional[str], max_bytes: int = DEFAULT_MAX_BYTES,
+                  backups: int = DEFAULT_BACKUPS,
+                  max_buffered: int = DEFAULT_MAX_BUFFERED,
+                  flush_interval: float = DEFAULT_FLUSH_INTERVAL) -> None:
+        """Start exporting spans to ``path``; None disables tracing"""
+        with self._write_lock:
+            self._write_buffered()
+            with self._lock:
+                self.path = path
+                self.max_bytes = max_bytes
+                self.backups = backups
+                self.flush_interval = flush_interval
+                self._buffer = deque(maxlen=max_buffered)
+                self._size = None
+                self.enabled = bool(path)
+            if path and self._writer is None:
+                self._writer = threading.Thread(
+                    target=self._run_writer, name='trace-writer', daemon=True)
+                self._writer.start()
+
+    def span(self, name: str, **attrs: Any):
+        """Context manager timing the enclosed block as a child of the current span"""
+        if not self.enabled:
+            return _NOOP_SPAN
+        return Span(self, name, attrs)
+
+    def _emit(self, record: Dict[str, Any], root: bool) -> None:
+        with self._lock:
+            if len(self._buffer) == self._buffer.maxlen:
+                metrics.incr('trace.dropped')
+            self._buffer.append(record)
+            pending = len(self._buffer)
+        if pending >= FLUSH_BATCH or (
+                root and time.monotonic() - self._flushed_at >= self.flush_interval):
+            self._wake.set()
+
+    def flush(self) -> None:
+        """Write buffered spans to the trace file now, e.g. at shutdown"""
+        with self._write_lock:
+            self._write_buffered()
+
+    def _run_writer(self) -> None:
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            self.flush()
+
+    def _write_buffered(self) -> None:
+        """Drain the buffer into the trace file; caller holds _write_lock"""
+        with self._lock:
+            records = list(self._buffer)
+            self._buffer.clear()
+            path = self.path
+        self._flushed_at = time.monotonic()
+        if not records or not path:
+            return
+        # Split into chunks of at most max_bytes so each can rotate the file
+        chunks: List[bytes] = []
+        chunk: List[bytes] = []
+        chunk_size = 0
+        for record in records:
+            line = (json.dumps(record, default=str) + '\n').encode('utf-8')
+            if chunk and chunk_size + len(line) > self.max_bytes:
+                chunks.append(b''.join(chunk))
+                chunk, chunk_size = [], 0
+            chunk.append(line)
+            chunk_size += len(line)
+        chunks.append(b''.join(chunk))
+        try:
+            for data in chunks:
+                self._rotate_if_needed(path, len(data))
+                with open(path, 'ab') as f:
+                    f.write(data)
+                self._size = (self._size or 0) + len(data)
+            metrics.incr('trace.spans_written', len(records))
+        except OSError:
+            metrics.incr('trace.dropped', len(records))
+
+    def _rotate_if_needed(self, path: str, incoming: int) -> None:
+        """Shift path -> path.1 -> ... -> path.N when the file would exceed max_bytes"""
+        if self._size is None:
+            try:
+                self._size = os.path.getsize(path)
+            except OSError:
+                self._size = 0
+        if self._size == 0 or self._size + incoming <= self.max_bytes:
+            return
+        if self.backups > 0:
+            for index in range(self.backups - 1, 0, -1):
+                source = f'{path}.{index}'
+                if os.path.exists(source):
+                    os.replace(source, f'{path}.{index + 1}')
+            os.replace(path, f'{path}.1')
+        else:
+            os.remove(path)
+        self._size = 0
+
+
+# Process-wide tracer, configured by the server from --trace-file
+tracer = Tracer()
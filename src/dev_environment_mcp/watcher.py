@@ -0,0 +1,339 @@
+"""
+Workspace change watching
+
+Tracks the directories of indexed workspaces so the index can be refreshed
+from change notifications instead of re-walking the tree. Linux uses
+inotify (through ctypes, no extra dependency); other platforms fall back to
+polling directory mtimes. The number of watched directories is bounded and
+idle workspaces are evicted least-recently-used first.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import struct
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Mapping, Optional, Set
+
+DEFAULT_MAX_WATCHES = 8192
+DEFAULT_IDLE_TIMEOUT = 600.0
+DEFAULT_POLL_INTERVAL = 2.0
+
+# Returned by a backend when events were lost and every path must be rescanned
+OVERFLOW = '<overflow>'
+
+
+class PollingBackend:
+    """Portable backend comparing directory mtimes on each poll"""
+
+    name = 'polling'
+
+    def __init__(self, interval: float = DEFAULT_POLL_INTERVAL):
+        self.interval = interval
+        self._mtimes: Dict[str, Optional[int]] = {}
+        self._polled_at = 0.0
+
+    def add(self, path: str) -> bool:
+        self._mtimes[path] = self._mtime(path)
+        return True
+
+    def remove(self, path: str) -> None:
+        self._mtimes.pop(path, None)
+
+    def is_watching(self, path: str) -> bool:
+        return path in self._mtimes
+
+    def poll(self) -> Set[str]:
+        """Paths whose mtime changed since the last poll"""
+        now = time.monotonic()
+        if now - self._polled_at < self.interval:
+            return set()
+        self._polled_at = now
+
+        changed = set()
+        for path, mtime in self._mtimes.items():
+            current = self._mtime(path)
+            if current != mtime:
+                self._mtimes[path] = current
+                changed.add(path)
+        return changed
+
+    def close(self) -> None:
+        self._mtimes.clear()
+
+    @staticmethod
+    def _mtime(path: str) -> Optional[int]:
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+
+class InotifyBackend:
+    """Linux backend reading directory entry events from inotify"""
+
+    name = 'inotify'
+
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_MOVE_SELF = 0x00000800
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ONLYDIR = 0x01000000
+    IN_DONTFOLLOW = 0x02000000
+
+    # Directory listing changes are all the index depends on
+    WATCH_MASK = (IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO
+                  | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR | IN_DONTFOLLOW)
+
+    _EVENT_HEADER = struct.Struct('iIII')
+
+    def __init__(self):
+        libc_name = ctypes.util.find_library('c') or 'libc.so.6'
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self._fd = fd
+        self._paths: Dict[int, str] = {}
+        self._wds: Dict[str, int] = {}
+
+    @classmethod
+    def available(cls) -> bool:
+        return sys.platform.startswith('linux')
+
+    def add(self, path: str) -> bool:
+        if path in self._wds:
+            return True
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), self.WATCH_MASK)
+        if wd < 0:
+            # ENOSPC (watch limit), ENOENT, EACCES, ...
+            return False
+        self._wds[path] = wd
+        self._paths[wd] = path
+        return True
+
+    def remove(self, path: str) -> None:
+        wd = self._wds.pop(path, None)
+        if wd is not None:
+            self._paths.pop(wd, None)
+            self._libc.inotify_rm_watch(self._fd, wd)
+
+    def is_watching(self, path: str) -> bool:
+        return path in self._wds
+
+    def poll(self) -> Set[str]:
+        """Directories whose entries changed since the last poll"""
+        changed: Set[str] = set()
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            except OSError:
+                changed.add(OVERFLOW)
+                break
+            if not data:
+                break
+
+            offset = 0
+            header_size = self._EVENT_HEADER.size
+            while offset + header_size <= len(data):
+                wd, mask, _cookie, length = self._EVENT_HEADER.unpack_from(data, offset)
+                offset += header_size + length
+                if mask & self.IN_Q_OVERFLOW:
+                    changed.add(OVERFLOW)
+                    continue
+                path = self._paths.get(wd)
+                if path is None:
+                    continue
+                changed.add(path)
+                if mask & self.IN_IGNORED:
+                    # The kernel dropped the watch (directory removed)
+                    self._paths.pop(wd, None)
+                    self._wds.pop(path, None)
+        return changed
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+        self._paths.clear()
+        self._wds.clear()
+
+    def __del__(self):
+        if getattr(self, '_fd', -1) >= 0:
+            os.close(self._fd)
+
+
+def create_backend():
+    """Best available backend for this platform"""
+    if InotifyBackend.available():
+        try:
+            return InotifyBackend()
+        except (OSError, AttributeError):
+            pass
+    return PollingBackend()
+
+
+def watching_enabled() -> bool:
+    """Watching can be turned off with DEV_ENV_MCP_WATCH=0"""
+    return os.getenv('DEV_ENV_MCP_WATCH', '1').lower() not in ('0', 'false', 'no')
+
+
+class _WatchedWorkspace:
+    """Watched directories of one workspace and the changes seen so far"""
+
+    def __init__(self, root: str):
+        self.root = root
+        self.dirs: Set[str] = set()
+        self.pending: Set[str] = set()
+        self.last_used = time.monotonic()
+
+
+class WorkspaceWatcher:
+    """Watches indexed workspace directories and reports changed ones"""
+
+    def __init__(self, backend=None, max_watches: int = DEFAULT_MAX_WATCHES,
+                 idle_timeout: float = DEFAULT_IDLE_TIMEOUT):
+        self.backend = backend or create_backend()
+        self.max_watches = max_watches
+        self.idle_timeout = idle_timeout
+        self._workspaces: "OrderedDict[str, _WatchedWorkspace]" = OrderedDict()
+        # absolute directory -> roots of the workspaces watching it
+        self._owners: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def watch_count(self) -> int:
+        return len(self._owners)
+
+    def is_watched(self, root: str) -> bool:
+        return root in self._workspaces
+
+    def watch(self, root: str, dirs: Mapping[str, int]) -> bool:
+        """Watch a workspace's directories (relative path -> indexed mtime)
+
+        Returns False if the workspace cannot be watched within the watch
+        budget; the caller should then keep validating by mtime.
+        """
+        with self._lock:
+            self._evict_idle()
+            workspace = self._workspaces.get(root)
+            if workspace is None:
+                workspace = self._workspaces[root] = _WatchedWorkspace(root)
+            self._workspaces.move_to_end(root)
+            workspace.last_used = time.monotonic()
+
+            wanted = {self._abspath(root, rel): rel for rel in dirs}
+            for path in workspace.dirs - wanted.keys():
+                self._release(root, path)
+            workspace.dirs &= wanted.keys()
+
+            # Includes directories whose watch the kernel dropped (removed
+            # and recreated since the last walk)
+            new_paths = [path for path in wanted
+                         if path not in workspace.dirs or not self.backend.is_watching(path)]
+            needed = sum(1 for path in new_paths if path not in self._owners)
+            while self.watch_count + needed > self.max_watches and len(self._workspaces) > 1:
+                oldest = next(iter(self._workspaces))
+                if oldest == root:
+                    break
+                self._unwatch(oldest)
+            if self.watch_count + needed > self.max_watches:
+                self._unwatch(root)
+                return False
+
+            for path in new_paths:
+                if not self._acquire(root, path):
+                    self._unwatch(root)
+                    return False
+                workspace.dirs.add(path)
+                # Catch changes made between the index walk and the watch
+                try:
+                    if os.stat(path).st_mtime_ns != dirs[wanted[path]]:
+                        workspace.pending.add(wanted[path])
+                except OSError:
+                    workspace.pending.add(wanted[path])
+            return True
+
+    def changes(self, root: str) -> Optional[Set[str]]:
+        """Drain changed directories (relative paths) of a watched workspace
+
+        Returns None when the workspace is not watched. The set contains
+        OVERFLOW if events were lost and the whole tree must be revalidated.
+        """
+        with self._lock:
+            self._dispatch()
+            workspace = self._workspaces.get(root)
+            if workspace is None:
+                return None
+            self._workspaces.move_to_end(root)
+            workspace.last_used = time.monotonic()
+            changed, workspace.pending = workspace.pending, set()
+            return changed
+
+    def has_changes(self, root: str) -> bool:
+        """Check for pending changes without draining them"""
+        with self._lock:
+            self._dispatch()
+            workspace = self._workspaces.get(root)
+            return workspace is not None and bool(workspace.pending)
+
+    def unwatch(self, root: str) -> None:
+        with self._lock:
+            self._unwatch(root)
+
+    def close(self) -> None:
+        with self._lock:
+            for root in list(self._workspaces):
+                self._unwatch(root)
+            self.backend.close()
+
+    def _dispatch(self) -> None:
+        """Route backend events to the pending sets of owning workspaces"""
+        for path in self.backend.poll():
+            if path == OVERFLOW:
+                for workspace in self._workspaces.values():
+                    workspace.pending.add(OVERFLOW)
+                continue
+            for root in self._owners.get(path, ()):
+                rel = os.path.relpath(path, root).replace(os.sep, '/')
+                self._workspaces[root].pending.add(rel)
+
+    def _evict_idle(self) -> None:
+        now = time.monotonic()
+        for root in [r for r, w in self._workspaces.items()
+                     if now - w.last_used > self.idle_timeout]:
+            self._unwatch(root)
+
+    def _unwatch(self, root: str) -> None:
+        workspace = self._workspaces.pop(root, None)
+        if workspace is not None:
+            for path in workspace.dirs:
+                self._release(root, path)
+
+    def _acquire(self, root: str, path: str) -> bool:
+        if not self.backend.is_watching(path) and not self.backend.add(path):
+            return False
+        self._owners.setdefault(path, set()).add(root)
+        return True
+
+    def _release(self, root: str, path: str) -> None:
+        owners = self._owners.get(path)
+        if owners is None:
+            return
+        owners.discard(root)
+        if not owners:
+            del self._owners[path]
+            self.backend.remove(path)
+
+    @staticmethod
+    def _abspath(root: str, rel: str) -> str:
+        return root if rel == '.' else os.path.join(root, *rel.split('/'))
@@ -0,0 +1,338 @@
+"""
+Workspace project index
+
+Walks a workspace tree with ``os.scandir`` and records every sub-project
+(a directory containing a project marker file). Vendor and VCS directories
+are pruned. Each directory's listing is kept with its mtime, so later scans
+only re-list directories that changed; everything else is one ``stat``.
+With a WorkspaceWatcher attached, even those ``stat`` calls are skipped and
+only directories reported as changed are re-listed.
+"""
+
+import hashlib
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from . import cache, cancellation
+from .contexts import WorkspaceContext, WorkspaceContextManager
+from .metrics import metrics
+from .tracing import tracer
+from .watcher import OVERFLOW, WorkspaceWatcher
+
+# Project types in detection priority order, with the files that mark them
+PROJECT_MARKERS: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ('nodejs', ('package.json',)),
+    ('python', ('requirements.txt', 'pyproject.toml')),
+    ('docker', ('Dockerfile',)),
+    ('rust', ('Cargo.toml',)),
+    ('go', ('go.mod',)),
+)
+
+MARKER_FILES = frozenset(name for _, names in PROJECT_MARKERS for name in names)
+
+# Per ecosystem, lockfiles and config files naming its package manager, in
+# preference order; requirements*.txt files mean pip
+PACKAGE_MANAGER_FILES: Tuple[Tuple[str, Tuple[Tuple[str, str], ...]], ...] = (
+    ('node', (('pnpm-lock.yaml', 'pnpm'), ('bun.lockb', 'bun'), ('bun.lock', 'bun'),
+              ('yarn.lock', 'yarn'), ('package-lock.json', 'npm'),
+              ('npm-shrinkwrap.json', 'npm'))),
+    ('python', (('uv.lock', 'uv'), ('poetry.lock', 'poetry'), ('pdm.lock', 'pdm'),
+                ('Pipfile.lock', 'pipenv'), ('Pipfile', 'pipenv'))),
+)
+
+LOCK_FILES = frozenset(name for _, files in PACKAGE_MANAGER_FILES for name, _ in files)
+
+# VCS metadata, vendored dependencies and caches: skipped by every walk
+# (the workspace index and search_files)
+SKIPPED_DIRS = frozenset({
+    '.git', '.hg', '.svn', 'node_modules', 'bower_components', 'vendor',
+    '__pycache__', 'site-packages',
+})
+
+# Directory names the index never descends into: the above plus build output
+# and virtual environments, which search leaves to the ignore files
+PRUNED_DIRS = SKIPPED_DIRS | frozenset({'target', 'dist', 'build', 'venv'})
+
+# Present in the root of every Python virtual environment
+VENV_MARKER = 'pyvenv.cfg'
+
+DEFAULT_MAX_DEPTH = 12
+DEFAULT_MAX_DIRS = 50000
+
+# Persisted workspace indexes kept on disk; the least recently saved go first
+MAX_PERSISTED_INDEXES = 64
+
+INDEX_CACHE_PREFIX = 'index-'
+
+
+def classify_markers(markers) -> str:
+    """Project type for a set of marker file names"""
+    for project_type, names in PROJECT_MARKERS:
+        if any(name in markers for name in names):
+            return project_type
+    return 'generic'
+
+
+def _is_lockfile(name: str) -> bool:
+    return name in LOCK_FILES or (name.startswith('requirements') and name.endswith('.txt'))
+
+
+def detect_package_managers(markers, lockfiles) -> Dict[str, str]:
+    """Ecosystem ('node', 'python') -> package manager, for one directory
+
+    Lockfiles decide; an ecosystem with only a manifest gets its default
+    manager (npm, pip).
+    """
+    found: Dict[str, str] = {}
+    for ecosystem, files in PACKAGE_MANAGER_FILES:
+        for name, manager in files:
+            if name in lockfiles:
+                found[ecosystem] = manager
+                break
+    if 'node' not in found and 'package.json' in markers:
+        found['node'] = 'npm'
+    if 'python' not in found and ('pyproject.toml' in markers or any(
+            name.startswith('requirements') for name in lockfiles)):
+        found['python'] = 'pip'
+    return found
+
+
+def _is_pruned(name: str) -> bool:
+    """Hidden directories (.git, .venv, .tox, ...) and vendor dirs are skipped"""
+    return name.startswith('.') or name in PRUNED_DIRS
+
+
+@dataclass
+class DirRecord:
+    """Listing of one directory, valid while its mtime is unchanged"""
+    mtime_ns: int
+    markers: List[str] = field(default_factory=list)
+    subdirs: List[str] = field(default_factory=list)
+    is_venv: bool = False
+    # Lockfiles and requirements files (see PACKAGE_MANAGER_FILES)
+    lockfiles: List[str] = field(default_factory=list)
+
+    @property
+    def package_managers(self) -> Dict[str, str]:
+        return detect_package_managers(self.markers, self.lockfiles)
+
+    def to_json(self) -> list:
+        return [self.mtime_ns, self.markers, self.subdirs, self.is_venv, self.lockfiles]
+
+    @classmethod
+    def from_json(cls, data: list) -> 'DirRecord':
+        mtime_ns, markers, subdirs, is_venv, lockfiles = data
+        return cls(int(mtime_ns), list(markers), list(subdirs), bool(is_venv),
+                   list(lockfiles))
+
+
+@dataclass
+class WorkspaceIndex:
+    """All indexed directories of one workspace, keyed by relative path"""
+    root: str
+    dirs: Dict[str, DirRecord] = field(default_factory=dict)
+    truncated: bool = False
+    # Directories re-listed by the scan that produced this index
+    rescanned: int = 0
+
+    @property
+    def project_type(self) -> str:
+        """Project type of the workspace root"""
+        record = self.dirs.get('.')
+        return classify_markers(record.markers) if record else 'generic'
+
+    @property
+    def package_managers(self) -> Dict[str, str]:
+        """Package managers of the workspace root"""
+        record = self.dirs.get('.')
+        return record.package_managers if record else {}
+
+    def projects(self) -> List[Dict[str, Any]]:
+        """Every directory with project markers, root first"""
+        return [
+            {'path': rel, 'type': classify_markers(record.markers),
+             'markers': list(record.markers),
+             'package_managers': record.package_managers}
+            for rel, record in sorted(self.dirs.items())
+            if record.markers
+        ]
+
+
+class WorkspaceIndexer:
+    """Builds and incrementally refreshes WorkspaceIndex objects"""
+
+    def __init__(self, max_depth: int = DEFAULT_MAX_DEPTH,
+                 max_dirs: int = DEFAULT_MAX_DIRS, persist: bool = True,
+                 watcher: Optional[WorkspaceWatcher] = None,
+                 contexts: Optional[WorkspaceContextManager] = None):
+        self.max_depth = max_depth
+        self.max_dirs = max_dirs
+        self.persist = persist
+        self.watcher = watcher
+        # Indexes live in the per-workspace contexts and go when they are evicted
+        self.contexts = contexts if contexts is not None else WorkspaceContextManager()
+        self.contexts.add_evict_callback(self._evicted)
+        self._lock = threading.Lock()
+
+    def index(self, workspace_path: str) -> WorkspaceIndex:
+        """Return an up-to-date index, re-listing only changed directories"""
+        root = os.path.abspath(workspace_path)
+        with self._lock:
+            context = self.contexts.get(root)
+            previous = context.index
+            changed = None
+            if previous is not None and self.watcher is not None:
+                changed = self.watcher.changes(root)
+                if changed is not None and OVERFLOW in changed:
+                    changed = None
+                elif changed is not None and not changed:
+                    metrics.incr('workspace.watch_hits')
+                    previous.rescanned = 0
+                    return previous
+            if previous is None and self.persist:
+                previous = self._load(root)
+
+            with tracer.span('workspace.index', root=root) as span, \
+                    metrics.timer('workspace.index'):
+                try:
+                    index = self._walk(root, previous.dirs if previous else {}, changed)
+                except cancellation.Cancelled:
+                    # The watcher's pending changes were consumed; make the
+                    # next scan revalidate every directory instead
+                    context.set_index(None)
+                    raise
+                span.set('dirs_listed', index.rescanned)
+            metrics.incr('workspace.dirs_listed', index.rescanned)
+            context.set_index(index)
+            if self.watcher is not None:
+                self.watcher.watch(root, {rel: rec.mtime_ns for rel, rec in index.dirs.items()})
+            if self.persist and (previous is None or index.dirs != previous.dirs):
+                self._save(index)
+        self.contexts.enforce_limits()
+        return index
+
+    @property
+    def workspace_count(self) -> int:
+        """Number of workspaces indexed in memory"""
+        return sum(1 for context in self.contexts.values() if context.index is not None)
+
+    def is_stale(self, workspace_path: str) -> bool:
+        """True if a watched workspace changed since it was last indexed
+
+        Unwatched workspaces always report False; their freshness is left to
+        the caller's own expiry policy.
+        """
+        if self.watcher is None:
+            return False
+        return self.watcher.has_changes(os.path.abspath(workspace_path))
+
+    def invalidate(self, workspace_path: Optional[str] = None) -> None:
+        """Forget in-memory indexes so the next scan re-lists everything"""
+        with self._lock:
+            if workspace_path is None:
+                targets = self.contexts.values()
+            else:
+                targets = [self.contexts.peek(workspace_path)]
+            for context in targets:
+                if context is not None:
+                    context.set_index(None)
+
+    def _evicted(self, context: WorkspaceContext) -> None:
+        """Stop watching a workspace whose context was evicted"""
+        if self.watcher is not None:
+            self.watcher.unwatch(context.root)
+
+    def _walk(self, root: str, previous: Dict[str, DirRecord],
+              changed: Optional[Set[str]] = None) -> WorkspaceIndex:
+        """Depth-first walk reusing records whose directory mtime is unchanged
+
+        When ``changed`` is given (from a watcher) previous records outside
+        it are trusted without a ``stat``.
+        """
+        index = WorkspaceIndex(root=root)
+        stack = [('.', 0)]
+        while stack:
+            cancellation.check()
+            rel, depth = stack.pop()
+            record = previous.get(rel)
+            if record is not None and changed is not None and rel not in changed:
+                mtime_ns = record.mtime_ns
+            else:
+                path = root if rel == '.' else os.path.join(root, rel)
+                try:
+                    mtime_ns = os.stat(path).st_mtime_ns
+                except OSError:
+                    continue
+
+            if record is None or record.mtime_ns != mtime_ns:
+                record = self._scan_dir(path, mtime_ns)
+                if record is None:
+                    continue
+                index.rescanned += 1
+            index.dirs[rel] = record
+
+            if len(index.dirs) >= self.max_dirs:
+                index.truncated = bool(stack) or bool(record.subdirs)
+                break
+            if depth >= self.max_depth or record.is_venv:
+                continue
+            for name in reversed(record.subdirs):
+                stack.append((name if rel == '.' else f'{rel}/{name}', depth + 1))
+        return index
+
+    @staticmethod
+    def _scan_dir(path: str, mtime_ns: int) -> Optional[DirRecord]:
+        """List one directory, keeping marker files and walkable subdirs"""
+        record = DirRecord(mtime_ns=mtime_ns)
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    name = entry.name
+                    is_marker = name in MARKER_FILES
+                    is_lockfile = _is_lockfile(name)
+                    if is_marker or is_lockfile:
+                        if is_marker:
+                            record.markers.append(name)
+                        if is_lockfile:
+                            record.lockfiles.append(name)
+                    elif name == VENV_MARKER:
+                        record.is_venv = True
+                    elif not _is_pruned(name):
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                record.subdirs.append(name)
+                        except OSError:
+                            pass
+        except OSError:
+            return None
+        record.markers.sort()
+        record.subdirs.sort()
+        record.lockfiles.sort()
+        return record
+
+    @staticmethod
+    def _cache_name(root: str) -> str:
+        digest = hashlib.sha1(root.encode('utf-8')).hexdigest()[:16]
+        return f'{INDEX_CACHE_PREFIX}{digest}.json'
+
+    def _load(self, root: str) -> Optional[WorkspaceIndex]:
+        """Load a persisted index; its records are revalidated by the walk"""
+        data = cache.load_json(self._cache_name(root))
+        if not data or data.get('root') != root:
+            return None
+        try:
+            dirs = {rel: DirRecord.from_json(rec) for rel, rec in data['dirs'].items()}
+        except (KeyError, TypeError, ValueError):
+            return None
+        return WorkspaceIndex(root=root, dirs=dirs)
+
+    def _save(self, index: WorkspaceIndex) -> None:
+        """Persist an index, dropping the oldest ones past MAX_PERSISTED_INDEXES"""
+        saved = cache.save_json(self._cache_name(index.root), {
+            'root': index.root,
+            'dirs': {rel: record.to_json() for rel, record in index.dirs.items()},
+        })
+        if saved:
+            cache.prune(INDEX_CACHE_PREFIX, MAX_PERSISTED_INDEXES)
@@ -0,0 +1,11 @@
+"""
+Shared test fixtures.
+"""
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache_dir(tmp_path, monkeypatch):
+    """Keep persisted indexes and probe results out of the user's cache directory."""
+    monkeypatch.setenv("DEV_ENV_MCP_CACHE_DIR", str(tmp_path / "dev-env-cache"))
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Tests for the benchmark suite and its regression check.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from dev_environment_mcp.benchmark import compare, run_suite
+
+
+def _report(**medians):
+    return {"results": {name: {"median_ms": ms} for name, ms in medians.items()}}
+
+
+def test_compare_flags_only_real_regressions():
+    """Slowdowns must exceed both the ratio and the absolute delta."""
+    baseline = _report(slow=10.0, tiny=0.001, fast=5.0)
+    current = _report(slow=15.0, tiny=0.003, fast=4.0, new=1.0)
+    
+    rows = {row["name"]: row for row in compare(baseline, current, threshold=0.25)}
+    assert rows["slow"]["regression"]
+    assert not rows["tiny"]["regression"]
+    assert not rows["fast"]["regression"]
+    assert "new" not in rows
+
+
+def test_run_suite_covers_every_micro_benchmark(monkeypatch):
+    """A short in-process run reports detection, every intent and list_tools."""
+    monkeypatch.setenv("DEV_ENV_MCP_DISK_CACHE", "0")
+    report = run_suite(iterations=2, include_stdio=False)
+    results = report["results"]
+    
+    assert "detect_environment.cold" in results
+    assert "detect_environment.warm" in results
+    assert "get_command_syntax.git_status.cold" in results
+    assert "list_tools" in results
+    assert all(r["median_ms"] >= 0 for r in results.values())
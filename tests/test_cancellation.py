@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Tests for request cancellation of detection, walks and subprocess probes.
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import anyio
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from dev_environment_mcp import cancellation
+from dev_environment_mcp.cancellation import CancelToken, Cancelled
+from dev_environment_mcp.metrics import metrics
+from dev_environment_mcp.process import run_subprocess
+from dev_environment_mcp.search import FileSearcher
+
+SLEEP = shutil.which("sleep")
+
+pytestmark = pytest.mark.skipif(sys.platform.startswith("win"),
+                                reason="uses shell scripts as fake tools")
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    return True
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_cancelled_subprocess_is_killed(tmp_path):
+    token = CancelToken()
+    threading.Timer(0.1, token.cancel).start()
+    started = time.monotonic()
+    with cancellation.scope(token), pytest.raises(Cancelled):
+        run_subprocess([SLEEP, "30"], stdout=subprocess.PIPE)
+    assert time.monotonic() - started < 5
+
+
+def test_cancelled_search_stops(tmp_path):
+    for i in range(50):
+        (tmp_path / f"d{i}").mkdir()
+    token = CancelToken()
+    token.cancel()
+    with cancellation.scope(token), pytest.raises(Cancelled):
+        FileSearcher().search(str(tmp_path), "*")
+
+
+def test_cancel_notification_stops_detection(tmp_path, monkeypatch):
+    """notifications/cancelled kills a hung version probe and frees the request."""
+    from mcp.shared.exceptions import McpError
+    from mcp.shared.memory import create_connected_server_and_client_session
+    from mcp.types import (CancelledNotification, CancelledNotificationParams,
+                           ClientNotification)
+    from dev_environment_mcp import server
+    from dev_environment_mcp.environment import EnvironmentDetector
+    from dev_environment_mcp.pathresolver import PathResolver
+    from dev_environment_mcp.toolchains import ToolchainProber, ToolSpec
+
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    pid_file = tmp_path / "pid"
+    tool = bin_dir / "hangs"
+    tool.write_text(f"#!/bin/sh\necho $$ > {pid_file}\nexec {SLEEP} 30\n")
+    tool.chmod(0o755)
+    monkeypatch.setenv("PATH", str(bin_dir))
+    monkeypatch.setenv("DEV_ENV_MCP_CACHE_DIR", str(tmp_path / "cache"))
+    resolver = PathResolver()
+    prober = ToolchainProber(resolver, timeout=30, persist=False,
+                             tools=(ToolSpec("hangs", ("hangs",)),))
+    monkeypatch.setattr(server, "detector",
+                        EnvironmentDetector(cache_ttl=0, resolver=resolver, toolchains=prober))
+    cancelled = metrics.snapshot()["counters"].get("tool.detect_environment.cancelled", 0)
+    errors = []
+
+    async def call(client):
+        try:
+            await client.call_tool("detect_environment", {})
+        except McpError as e:
+            errors.append(e)
+
+    async def run():
+        async with create_connected_server_and_client_session(server.app) as client:
+            async with anyio.create_task_group() as tg:
+                tg.start_soon(call, client)
+                with anyio.fail_after(5):
+                    while not pid_file.exists() or not pid_file.read_text().strip():
+                        await anyio.sleep(0.01)
+                # The first request after initialize has id 1
+                await client.send_notification(ClientNotification(CancelledNotification(
+                    params=CancelledNotificationParams(requestId=1))))
+
+    started = time.monotonic()
+    anyio.run(run)
+    assert time.monotonic() - started < 5
+    assert errors and "cancelled" in str(errors[0]).lower()
+    pid = int(pid_file.read_text())
+    assert _wait_for(lambda: not _alive(pid))
+    assert metrics.snapshot()["counters"]["tool.detect_environment.cancelled"] == cancelled + 1
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Tests for the tool catalog generated from the intent registry.
+"""
+
+import sys
+from pathlib import Path
+
+import anyio
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from dev_environment_mcp.catalog import CATALOG, build_catalog
+from dev_environment_mcp.commands import CommandSyntaxProvider
+from dev_environment_mcp.server import TOOL_NAMES, list_tools
+
+
+def test_intent_enums_and_options_come_from_the_registry():
+    """Every schema lists exactly the registered intents and their options."""
+    tools = {tool.name: tool for tool in CATALOG.result.tools}
+    schema = tools["get_command_syntax"].inputSchema["properties"]
+    batch_item = tools["get_command_syntax_batch"].inputSchema["properties"]["items"]["items"]
+    
+    assert schema["intent"]["enum"] == list(CommandSyntaxProvider.INTENTS)
+    assert batch_item["properties"]["intent"]["enum"] == list(CommandSyntaxProvider.INTENTS)
+    assert schema["options"]["properties"]["packages"]["type"] == "array"
+    assert "copy_file" in schema["options"]["properties"]["source"]["description"]
+    assert TOOL_NAMES == frozenset(CATALOG.names)
+
+
+def test_catalog_is_served_from_memory_with_a_stable_version():
+    """list_tools returns the prebuilt result; the version tracks content."""
+    first = anyio.run(list_tools)
+    assert first is anyio.run(list_tools) is CATALOG.result
+    assert first.meta == {"catalogVersion": CATALOG.version}
+    
+    intents = CommandSyntaxProvider.INTENTS
+    assert build_catalog(intents).version == CATALOG.version
+    fewer = {name: spec for name, spec in intents.items() if name != "git_status"}
+    assert build_catalog(fewer).version != CATALOG.version
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Tests for the LRU of per-workspace contexts.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from dev_environment_mcp.commands import CommandSyntaxProvider
+from dev_environment_mcp.contexts import WorkspaceContextManager
+from dev_environment_mcp.environment import EnvironmentDetector
+from dev_environment_mcp.watcher import PollingBackend, WorkspaceWatcher
+from dev_environment_mcp.workspace import WorkspaceIndexer
+
+
+def _workspaces(tmp_path, count):
+    roots = []
+    for i in range(count):
+        root = tmp_path / f"ws{i}"
+        (root / "src").mkdir(parents=True)
+        (root / "package.json").write_text("{}")
+        roots.append(str(root))
+    return roots
+
+
+def test_least_recently_used_workspace_is_evicted(tmp_path):
+    """Count bound evicts the LRU context along with its state and watches."""
+    watcher = WorkspaceWatcher(backend=PollingBackend())
+    contexts = WorkspaceContextManager(max_workspaces=2)
+    detector = EnvironmentDetector(indexer=WorkspaceIndexer(watcher=watcher,
+                                                            contexts=contexts))
+    first, second, third = _workspaces(tmp_path, 3)
+    
+    env = detector.detect_environment(first)
+    CommandSyntaxProvider(env, detector.command_memo(first)).get_command_syntax("run_tests")
+    assert len(contexts.peek(first).commands) == 1
+    detector.detect_environment(second)
+    detector.detect_environment(first)          # first is now most recent
+    detector.detect_environment(third)
+    
+    assert contexts.peek(second) is None
+    assert not watcher.is_watched(second)
+    assert watcher.is_watched(first) and watcher.is_watched(third)
+    stats = detector.stats()["workspaces"]
+    assert stats["workspaces"] == 2
+    assert stats["evictions"] == 1
+    assert stats["lru"][0] == third
+    assert 0 < stats["hit_ratio"] < 1
+
+
+def test_memory_bound_evicts_but_keeps_most_recent(tmp_path):
+    """The byte budget evicts older contexts, never the one just used."""
+    contexts = WorkspaceContextManager(max_workspaces=10, max_bytes=1)
+    indexer = WorkspaceIndexer(contexts=contexts)
+    first, second = _workspaces(tmp_path, 2)
+    
+    indexer.index(first)
+    indexer.index(second)
+    
+    assert [c.root for c in contexts.values()] == [second]
+    assert contexts.stats()["approx_bytes"] > 0
+
+
+def test_missing_paths_do_not_create_contexts(tmp_path):
+    """Lookups for paths that are not directories leave the LRU alone."""
+    contexts = WorkspaceContextManager(max_workspaces=1)
+    detector = EnvironmentDetector(indexer=WorkspaceIndexer(contexts=contexts))
+    (root,) = _workspaces(tmp_path, 1)
+    detector.detect_environment(root)
+    
+    missing = str(tmp_path / "nonexistent")
+    detector.detect_environment(missing)
+    detector.detect_environment(missing)
+    assert detector.command_memo(missing) is None
+    assert [c.root for c in contexts.values()] == [root]
+    
+    detector.detect_environment(root)
+    stats = contexts.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
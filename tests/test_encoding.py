@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Tests for response encoding and the encoded response cache.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import anyio
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from dev_environment_mcp import encoding
+from dev_environment_mcp.encoding import ResponseCache, ResponseEncoder
+from dev_environment_mcp.metrics import metrics
+from dev_environment_mcp.server import call_tool, responses
+
+
+PAYLOAD = {"results": [{"intent": "run_tests", "commands": {"command": "pytest"}}]}
+
+
+@pytest.mark.parametrize("backend", ["json", "orjson"])
+def test_compact_and_pretty_encode_the_same_value(backend):
+    """Compact output is smaller and decodes to the same payload."""
+    if backend == "orjson" and encoding.orjson is None:
+        pytest.skip("orjson not installed")
+    pretty = ResponseEncoder(compact=False, backend=backend).encode(PAYLOAD)
+    compact = ResponseEncoder(compact=True, backend=backend).encode(PAYLOAD)
+    
+    assert json.loads(pretty) == json.loads(compact) == PAYLOAD
+    assert len(compact) < len(pretty)
+    assert "\n" not in compact
+
+
+def test_cache_key_ignores_argument_order_and_bounds_size():
+    """Equal arguments share a key; the LRU stays within its bounds."""
+    cache = ResponseCache(max_entries=2)
+    assert (cache.key("t", {"a": 1, "b": [1, 2]}, "fp")
+            == cache.key("t", {"b": [1, 2], "a": 1}, "fp"))
+    assert cache.key("t", {"a": True}, "fp") != cache.key("t", {"a": 1}, "fp")
+    
+    for i in range(3):
+        cache.put(("t", str(i), "fp"), "x" * 10)
+    assert cache.get(("t", "0", "fp")) is None
+    assert cache.stats() == {"entries": 2, "bytes": 20}
+
+
+def test_repeated_calls_are_served_from_the_response_cache():
+    """The second identical call returns the cached text without rebuilding it."""
+    responses.clear()
+    arguments = {"intent": "copy_file", "options": {"source": "a.txt", "dest": "b.txt"}}
+    
+    async def run():
+        first = await call_tool("get_command_syntax", arguments)
+        builds = metrics.snapshot()["counters"].get("cache.commands.miss", 0)
+        second = await call_tool("get_command_syntax", dict(reversed(list(arguments.items()))))
+        after = metrics.snapshot()["counters"].get("cache.commands.miss", 0)
+        return first[0].text, second[0].text, builds, after
+    
+    first, second, builds, after = anyio.run(run)
+    assert first == second
+    assert "a.txt" in json.loads(first)["description"]
+    assert builds == after
+    assert responses.stats()["entries"] == 1
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Tests for reading repository state straight from .git.
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from dev_environment_mcp import gitstate
+from dev_environment_mcp.gitstate import RepoStateCache
+from dev_environment_mcp.metrics import metrics
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+
+
+def _git(repo, *args):
+    env = dict(os.environ, GIT_AUTHOR_NAME="t", GIT_AUTHOR_EMAIL="t@example.com",
+               GIT_COMMITTER_NAME="t", GIT_COMMITTER_EMAIL="t@example.com")
+    return subprocess.run(["git", *args], cwd=repo, env=env, check=True,
+                          capture_output=True, text=True).stdout.strip()
+
+
+@pytest.fixture
+def repo(tmp_path):
+    root = tmp_path / "repo"
+    root.mkdir()
+    _git(root, "init", "-q", "-b", "main")
+    (root / "a.txt").write_text("a\n")
+    _git(root, "add", "a.txt")
+    _git(root, "commit", "-q", "-m", "first")
+    return root
+
+
+def _hits():
+    return metrics.snapshot()["caches"].get("repo_state", {}).get("hit", 0)
+
+
+def test_state_matches_git(repo):
+    state = RepoStateCache().state(str(repo / "a.txt"))
+    assert state["branch"] == "main"
+    assert state["head"] == _git(repo, "rev-parse", "HEAD")
+    assert state["index"]["entries"] == 1
+    assert state["in_progress"] == []
+    assert not state["detached"]
+
+
+def test_cache_is_invalidated_by_commits_and_checkouts(repo):
+    states = RepoStateCache()
+    first = states.state(str(repo))
+    hits = _hits()
+    assert states.state(str(repo)) is first
+    assert _hits() == hits + 1
+
+    (repo / "b.txt").write_text("b\n")
+    _git(repo, "add", "b.txt")
+    _git(repo, "commit", "-q", "-m", "second")
+    second = states.state(str(repo))
+    assert second["head"] == _git(repo, "rev-parse", "HEAD") != first["head"]
+    assert second["index"]["entries"] == 2
+
+    _git(repo, "checkout", "-q", "--detach", first["head"])
+    detached = states.state(str(repo))
+    assert detached["detached"] and detached["head"] == first["head"]
+
+
+def test_change_during_a_read_is_not_cached(repo, monkeypatch):
+    """A ref moved while the state is read is picked up by the next call."""
+    ref = repo / ".git" / "refs" / "heads" / "main"
+    moved = "f" * 40
+    read = gitstate.read_repo_state
+
+    def read_then_move(work_tree, git_dir):
+        state = read(work_tree, git_dir)
+        ref.write_text(moved + "\n")
+        os.utime(ref, ns=(0, ref.stat().st_mtime_ns + 1_000_000_000))
+        return state
+
+    states = RepoStateCache()
+    monkeypatch.setattr(gitstate, "read_repo_state", read_then_move)
+    assert states.state(str(repo))["head"] != moved
+    monkeypatch.setattr(gitstate, "read_repo_state", read)
+    assert states.state(str(repo))["head"] == moved
+
+
+def test_packed_refs_and_operations_in_progress(repo):
+    _git(repo, "pack-refs", "--all")
+    assert not (repo / ".git" / "refs" / "heads" / "main").exists()
+    states = RepoStateCache()
+    assert states.state(str(repo))["head"] == _git(repo, "rev-parse", "HEAD")
+
+    (repo / ".git" / "MERGE_HEAD").write_text(_git(repo, "rev-parse", "HEAD") + "\n")
+    assert states.state(str(repo))["in_progress"] == ["merge"]
+
+
+def test_outside_a_repository(tmp_path):
+    assert RepoStateCache().state(str(tmp_path))["is_repo"] is False
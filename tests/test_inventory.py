@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Tests for the interpreter inventory built from the PATH index.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from dev_environment_mcp.inventory import InterpreterInventory, classify, shim_manager
+from dev_environment_mcp.metrics import metrics
+from dev_environment_mcp.pathresolver import PathResolver
+
+pytestmark = pytest.mark.skipif(sys.platform.startswith("win"),
+                                reason="uses POSIX executables and symlinks")
+
+
+def _exe(path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("#!/bin/sh\nexit 1\n")
+    path.chmod(0o755)
+    return path
+
+
+@pytest.fixture
+def hosts(tmp_path, monkeypatch):
+    """pyenv shims, an nvm node and a system python, in that PATH order."""
+    pyenv = tmp_path / ".pyenv"
+    for version in ("3.8.18", "3.12.1"):
+        _exe(pyenv / "versions" / version / "bin" / "python3")
+        os.symlink("python3", pyenv / "versions" / version / "bin" / "python")
+    _exe(pyenv / "shims" / "python3")
+    _exe(pyenv / "shims" / "python")
+    (pyenv / "version").write_text("3.8.18\n")
+
+    nvm_bin = tmp_path / ".nvm" / "versions" / "node" / "v20.11.0" / "bin"
+    _exe(nvm_bin / "node")
+
+    system = tmp_path / "usr" / "bin"
+    _exe(system / "python3.11")
+    os.symlink("python3.11", system / "python3")
+    _exe(system / "python3-config")
+
+    for name in ("PYENV_VERSION", "NODENV_VERSION"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv("PATH", os.pathsep.join(
+        str(d) for d in (pyenv / "shims", nvm_bin, system)))
+    return tmp_path
+
+
+def _scan(workspace=None):
+    return InterpreterInventory(PathResolver(recheck_interval=0)).scan(workspace)
+
+
+def test_classify_and_shim_dirs(hosts):
+    assert classify("python3.12") == ("python", "python3.12")
+    assert classify("pypy3") == ("python", "pypy3")
+    assert classify("nodejs") == ("node", "nodejs")
+    assert classify("python3-config") is None
+    assert shim_manager(str(hosts / ".pyenv" / "shims")).name == "pyenv"
+    assert shim_manager(str(hosts / "usr" / "bin")) is None
+
+
+def test_inventory_resolves_shims_without_running_them(hosts):
+    """Shims resolve through the global version; nothing is executed."""
+    spawned = metrics.snapshot()["counters"].get("subprocess.spawned", 0)
+    found = _scan()
+    assert metrics.snapshot()["counters"].get("subprocess.spawned", 0) == spawned
+
+    shim, system = found["python"]
+    assert shim["source"] == "pyenv"
+    assert shim["version"] == "3.8.18"
+    assert shim["target"] == os.path.realpath(
+        hosts / ".pyenv" / "versions" / "3.8.18" / "bin" / "python3")
+    assert shim["aliases"] == ["python3"]
+    assert shim["default_for"] == ["python", "python3"]
+
+    assert system["command"] == "python3"
+    assert system["aliases"] == ["python3.11"]
+    assert system["version"] == "3.11"
+    assert system["default_for"] == ["python3.11"]
+
+    (node,) = found["node"]
+    assert node["source"] == "nvm"
+    assert node["version"] == "20.11.0"
+
+
+def test_local_version_file_and_environment_override(hosts, monkeypatch):
+    """.python-version above the workspace wins over the global version."""
+    workspace = hosts / "project" / "src"
+    workspace.mkdir(parents=True)
+    (hosts / "project" / ".python-version").write_text("3.12.1\n")
+    shim = _scan(str(workspace))["python"][0]
+    assert shim["version"] == "3.12.1"
+
+    monkeypatch.setenv("PYENV_VERSION", "system")
+    shim = _scan(str(workspace))["python"][0]
+    assert shim["source"] == "pyenv"
+    assert shim["target"] == os.path.realpath(hosts / "usr" / "bin" / "python3.11")
+    assert shim["version"] == "3.11"
+
+    monkeypatch.setenv("PYENV_VERSION", "3.10.0")
+    assert [e["source"] for e in _scan(str(workspace))["python"]] == ["path"]
+
+
+def test_version_file_edits_invalidate_detection(hosts):
+    """Editing .python-version re-resolves the shim in the next detection."""
+    from dev_environment_mcp.environment import EnvironmentDetector
+    from dev_environment_mcp.toolchains import ToolchainProber, ToolSpec
+
+    workspace = hosts / "project"
+    workspace.mkdir()
+    version_file = workspace / ".python-version"
+    version_file.write_text("3.12.1\n")
+    resolver = PathResolver(recheck_interval=0)
+    prober = ToolchainProber(resolver, persist=False,
+                             tools=(ToolSpec("python", ("python3", "python")),))
+    detector = EnvironmentDetector(resolver=resolver, toolchains=prober)
+
+    env = detector.detect_environment(str(workspace))
+    assert env.interpreters["python"][0]["version"] == "3.12.1"
+    assert env.toolchains["python"]["version"] == "3.12.1"
+    assert detector.detect_environment(str(workspace)) is env
+
+    version_file.write_text("3.8.18\n")
+    os.utime(version_file, ns=(0, version_file.stat().st_mtime_ns + 1_000_000_000))
+    env = detector.detect_environment(str(workspace))
+    assert env.interpreters["python"][0]["version"] == "3.8.18"
+    assert env.toolchains["python"]["version"] == "3.8.18"
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Tests for the JSON-RPC load generator.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from dev_environment_mcp.loadgen import (
+    HttpServerProcess, HttpTransport, StdioTransport, TransportPool,
+    initialize, parse_mix, percentile, run_load,
+)
+
+
+def test_parse_mix_and_percentile():
+    """Mix weights default to 1 and unknown tools are rejected."""
+    assert parse_mix("detect_environment=2,get_command_syntax") == [
+        ("detect_environment", 2.0), ("get_command_syntax", 1.0)]
+    with pytest.raises(ValueError):
+        parse_mix("no_such_tool=1")
+    assert percentile([1.0, 2.0, 3.0, 4.0], 0.5) == 2.0
+    assert percentile([1.0, 2.0, 3.0, 4.0], 0.99) == 4.0
+
+
+def test_pipelined_load_against_stdio_server():
+    """Pipelined calls all complete without errors."""
+    async def run():
+        transport = StdioTransport()
+        await transport.start()
+        try:
+            await initialize(transport)
+            return await run_load(transport, parse_mix(None), requests=40,
+                                  concurrency=8, seed=1)
+        finally:
+            await transport.close()
+    
+    report = asyncio.run(run())
+    assert report["completed"] == 40
+    assert report["errors"] == 0
+    assert report["latency"]["p99_ms"] >= report["latency"]["p50_ms"] > 0
+
+
+def test_timed_out_request_is_forgotten():
+    """A request abandoned by its caller does not stay pending."""
+    async def run():
+        silent = [sys.executable, "-c", "import sys; sys.stdin.read()"]
+        transport = StdioTransport(command=silent)
+        await transport.start()
+        try:
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(transport.request("ping"), timeout=0.2)
+            return dict(transport._pending)
+        finally:
+            await transport.close()
+
+    assert asyncio.run(run()) == {}
+
+
+def test_http_sessions_share_one_server_and_are_limited():
+    """Sessions beyond --max-sessions are refused; the server exits cleanly."""
+    async def run():
+        server = HttpServerProcess(["--max-sessions", "2", "--no-warmup"])
+        await server.start()
+        try:
+            pool = TransportPool([HttpTransport(server.url) for _ in range(2)])
+            await pool.start()
+            await pool.initialize()
+            report = await run_load(pool, parse_mix(None), requests=30,
+                                    concurrency=6, seed=1)
+            
+            extra = HttpTransport(server.url)
+            await extra.start()
+            refused = await initialize(extra)
+            await extra.close()
+            await pool.close()
+        finally:
+            exit_code = await server.close()
+        return report, refused, exit_code
+    
+    report, refused, exit_code = asyncio.run(run())
+    assert report["completed"] == 30
+    assert report["errors"] == 0
+    assert refused["error"]["code"] == 503
+    assert exit_code == 0
+
+
+def test_http_transport_binds_remote_only_on_request():
+    """Non-loopback hosts need allow_remote; loopback and unix sockets do not."""
+    from dev_environment_mcp.http_transport import HttpConfig, check_config
+
+    for config in (HttpConfig(), HttpConfig(host="::1"), HttpConfig(host="localhost"),
+                   HttpConfig(host="0.0.0.0", uds="/tmp/x.sock"),
+                   HttpConfig(host="0.0.0.0", allow_remote=True)):
+        check_config(config)
+    with pytest.raises(ValueError, match="--allow-remote"):
+        check_config(HttpConfig(host="0.0.0.0"))
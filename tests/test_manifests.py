@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Tests for manifest parsing and manifest-aware command generation.
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from dev_environment_mcp.commands import CommandSyntaxProvider
+from dev_environment_mcp.environment import EnvironmentDetector
+from dev_environment_mcp.manifests import ManifestCache, tomllib
+from dev_environment_mcp.metrics import metrics
+
+PYPROJECT = """
+[project]
+name = "demo"
+scripts = { demo-serve = "demo.app:main" }
+
+[project.optional-dependencies]
+test = ["pytest>=7"]
+
+[tool.hatch.envs.default.scripts]
+test = "pytest {args}"
+"""
+
+MAKEFILE = """
+VAR := 1
+.PHONY: test
+build: deps
+\tcc -o app app.c
+test:: build
+\t./app --self-test
+"""
+
+
+@pytest.fixture(autouse=True)
+def no_version_probes(monkeypatch):
+    """Detection here is about manifests; skip running toolchain --version probes."""
+    monkeypatch.setenv("DEV_ENV_MCP_VERSION_PROBES", "0")
+
+
+@pytest.fixture
+def project(tmp_path):
+    root = tmp_path / "project"
+    root.mkdir()
+    (root / "package.json").write_text(json.dumps(
+        {"scripts": {"test": "vitest run", "dev": "vite"}}))
+    (root / "Makefile").write_text(MAKEFILE)
+    (root / "pyproject.toml").write_text(PYPROJECT)
+    return root
+
+
+def _parsed():
+    return metrics.snapshot()["counters"].get("manifest.parsed", 0)
+
+
+@pytest.mark.skipif(tomllib is None, reason="needs tomllib or tomli")
+def test_summary_of_each_manifest(project):
+    summary = ManifestCache().summary(str(project))
+    assert summary["package.json"]["scripts"] == {"test": "vitest run", "dev": "vite"}
+    assert summary["Makefile"]["targets"] == ["build", "test"]
+    assert summary["pyproject.toml"] == {
+        "pytest": True, "scripts": ["demo-serve"], "poetry": False, "hatch_scripts": ["test"]}
+
+
+def test_parses_are_cached_by_stamp_and_content(project):
+    """Unchanged files are not re-read; touched files with the same content are not re-parsed."""
+    manifests = ManifestCache()
+    root = str(project)
+    first = manifests.summary(root)
+    parsed = _parsed()
+    assert manifests.summary(root) == first
+    assert _parsed() == parsed
+
+    package = project / "package.json"
+    stat = package.stat()
+    os.utime(package, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert manifests.summary(root) == first
+    assert _parsed() == parsed
+
+    package.write_text(json.dumps({"scripts": {"test": "jest"}}))
+    assert manifests.summary(root)["package.json"]["scripts"] == {"test": "jest"}
+    assert _parsed() == parsed + 1
+
+
+def test_commands_come_from_the_project_manifests(project):
+    detector = EnvironmentDetector()
+    env = detector.detect_environment(str(project))
+    provider = CommandSyntaxProvider(env)
+
+    tests = provider.get_command_syntax("run_tests")
+    assert tests["npm"] == "npm test"
+    assert tests["make"] == "make test"
+    assert "package.json" in tests["description"]
+    server = provider.get_command_syntax("start_server")
+    assert server["npm"] == "npm run dev"
+    assert server["script"] == "demo-serve"
+    assert "flask" not in server and "django" not in server
+
+
+@pytest.mark.skipif(tomllib is None, reason="needs tomllib or tomli")
+def test_cli_entry_points_are_not_servers(project):
+    """A console script that is not named like a server is not suggested."""
+    (project / "package.json").unlink()
+    (project / "Makefile").unlink()
+    (project / "pyproject.toml").write_text(
+        '[project]\nname = "demo"\nscripts = { demo-cli = "demo.cli:main" }\n')
+    env = EnvironmentDetector().detect_environment(str(project))
+    server = CommandSyntaxProvider(env).get_command_syntax("start_server")
+    assert "script" not in server
+    assert server["flask"] == "flask run"
+
+
+def test_snapshot_is_dropped_when_a_manifest_changes(project):
+    """A warm detection sees an edited manifest without waiting for the TTL."""
+    detector = EnvironmentDetector()
+    root = str(project)
+    env = detector.detect_environment(root)
+    assert detector.detect_environment(root) is env
+
+    (project / "package.json").write_text(json.dumps({"scripts": {"start": "node ."}}))
+    fresh = detector.detect_environment(root)
+    assert fresh is not env
+    assert fresh.fingerprint() != env.fingerprint()
+    server = CommandSyntaxProvider(fresh).get_command_syntax("start_server")
+    assert server["npm"] == "npm start"
+
+
+def test_install_and_run_commands_follow_the_lockfile(project):
+    (project / "pnpm-lock.yaml").write_text("")
+    (project / "uv.lock").write_text("")
+    env = EnvironmentDetector().detect_environment(str(project))
+    assert env.package_managers == {"node": "pnpm", "python": "uv"}
+
+    provider = CommandSyntaxProvider(env)
+    install = provider.get_command_syntax("install_packages", {"packages": ["left-pad"]})
+    assert install["pnpm"] == "pnpm add left-pad"
+    assert install["uv"] == "uv add left-pad"
+    assert "npm" not in install and "yarn" not in install and "pip" not in install
+    tests = provider.get_command_syntax("run_tests")
+    assert tests["pnpm"] == "pnpm test"
+    assert "npm" not in tests
@@ -4,6 +4,7 @@ Test the MCP server functionality properly with initialization handshake
 """
 
 import json
+import os
 import subprocess
 import sys
 import time
@@ -15,9 +16,10 @@ def test_mcp_server():
     print("🔍 Testing MCP server functionality...")
     
     try:        # Start the MCP server
-        server_path = Path(__file__).parent.parent / "src" / "dev_environment_mcp" / "server.py"
+        source_path = Path(__file__).parent.parent / "src"
         proc = subprocess.Popen(
-            [sys.executable, str(server_path)],
+            [sys.executable, "-m", "dev_environment_mcp"],
+            env=dict(os.environ, PYTHONPATH=str(source_path)),
             stdin=subprocess.PIPE,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
@@ -3,14 +3,17 @@
 Unit tests for the MCP server functionality.
 """
 
+import anyio
+import json
 import pytest
 import sys
+import time
 from pathlib import Path
 
 # Add the src directory to the path so we can import the server
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
-from dev_environment_mcp.server import EnvironmentDetector, CommandSyntaxProvider
+from dev_environment_mcp.server import EnvironmentDetector, CommandSyntaxProvider, call_tool
 
 
 def test_environment_detector_creation():
@@ -62,5 +65,104 @@ def test_command_syntax_provider_with_options():
     assert len(result) > 0
 
 
+def test_detect_environment_is_cached():
+    """Repeated detection returns the cached snapshot until refreshed."""
+    detector = EnvironmentDetector(cache_ttl=60)
+    first = detector.detect_environment()
+    
+    assert detector.detect_environment() is first
+    assert detector.detect_environment(refresh=True) is not first
+
+
+def test_detect_environment_cache_follows_fingerprint(monkeypatch):
+    """Changing a fingerprint input or disabling the TTL re-runs detection."""
+    detector = EnvironmentDetector(cache_ttl=60)
+    first = detector.detect_environment()
+    
+    monkeypatch.setenv("SHELL", "/bin/zsh")
+    changed = detector.detect_environment()
+    assert changed is not first
+    assert changed.shell == "zsh"
+    
+    uncached = EnvironmentDetector(cache_ttl=0)
+    assert uncached.detect_environment() is not uncached.detect_environment()
+
+
+def test_detect_environment_async_matches_sync(tmp_path, monkeypatch):
+    """The async API detects the same environment and shares the cache."""
+    monkeypatch.setenv("DEV_ENV_MCP_DISK_CACHE", "0")
+    (tmp_path / "package.json").write_text("{}")
+    detector = EnvironmentDetector(cache_ttl=60)
+    
+    async_info = anyio.run(detector.detect_environment_async, str(tmp_path))
+    assert async_info.project_type == "nodejs"
+    assert detector.detect_environment(str(tmp_path)) is async_info
+    assert detector.detect_environment(str(tmp_path), refresh=True) == async_info
+
+
+def test_concurrent_async_detection_is_shared(monkeypatch):
+    """Concurrent callers wait for one in-flight detection."""
+    monkeypatch.setenv("DEV_ENV_MCP_DISK_CACHE", "0")
+    detector = EnvironmentDetector(cache_ttl=0)
+    probed = []
+    
+    def slow_exists(command):
+        probed.append(command)
+        time.sleep(0.05)
+        return False
+    
+    monkeypatch.setattr(detector, "_command_exists", slow_exists)
+    
+    async def detect(results):
+        results.append(await detector.detect_environment_async())
+    
+    async def detect_twice():
+        results = []
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(detect, results)
+            tg.start_soon(detect, results)
+        return results
+    
+    first, second = anyio.run(detect_twice)
+    assert first is second
+    assert sorted(probed) == ["docker", "git"]
+
+
+def test_intent_registry_lists_all_intents():
+    """Every handler is registered once at class level."""
+    intents = CommandSyntaxProvider.INTENTS
+    assert "list_files" in intents
+    assert "git_status" in intents
+    assert dict(intents["copy_file"].options) == {"source": "file1", "dest": "file2"}
+
+
+def test_command_syntax_memoized_by_used_options():
+    """Results are memoized, copied out, and ignore unused options."""
+    env_info = EnvironmentDetector().detect_environment()
+    helper = CommandSyntaxProvider(env_info)
+    
+    first = helper.get_command_syntax("view_file", {"path": "a.txt"})
+    first["description"] = "mutated"
+    again = helper.get_command_syntax("view_file", {"path": "a.txt", "unused": 1})
+    assert again["description"] == "View file contents: a.txt"
+    assert helper.get_command_syntax("view_file", {"path": "b.txt"}) != again
+    assert "error" in helper.get_command_syntax("not_an_intent")
+
+
+def test_get_command_syntax_batch():
+    """The batch tool resolves every item in one response, in order."""
+    items = [
+        {"intent": "list_files"},
+        {"intent": "create_directory", "options": {"path": "build"}},
+        {"intent": "not_an_intent"},
+    ]
+    content = anyio.run(call_tool, "get_command_syntax_batch", {"items": items})
+    results = json.loads(content[0].text)["results"]
+    
+    assert [r["intent"] for r in results] == ["list_files", "create_directory", "not_an_intent"]
+    assert "build" in results[1]["commands"]["description"]
+    assert "error" in results[2]["commands"]
+
+
 if __name__ == "__main__":
     pytest.main([__file__])
@@ -4,6 +4,7 @@ Simple MCP server test with better timeout handling
 """
 
 import json
+import os
 import subprocess
 import sys
 import time
@@ -18,7 +19,8 @@ def run_mcp_test():
     try:
         # Start the MCP server
         proc = subprocess.Popen(
-            [sys.executable, "src/dev_environment_mcp/server.py"],
+            [sys.executable, "-m", "dev_environment_mcp"],
+            env=dict(os.environ, PYTHONPATH="src"),
             stdin=subprocess.PIPE,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
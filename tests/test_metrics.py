@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Tests for the metrics registry and the server_stats tool.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import anyio
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from dev_environment_mcp.metrics import Histogram, Metrics
+from dev_environment_mcp.server import call_tool
+
+
+def test_histogram_quantiles_use_bucket_bounds():
+    """Quantiles report the bucket upper bound, capped at the max seen."""
+    histogram = Histogram()
+    for value in [0.2] * 90 + [40.0] * 10:
+        histogram.observe(value)
+    
+    assert histogram.quantile(0.5) == 0.25
+    assert histogram.quantile(0.99) == 40.0
+    assert histogram.snapshot()["count"] == 100
+
+
+def test_cache_ratios():
+    """Cache lookups roll up into hit ratios."""
+    registry = Metrics()
+    registry.cache_lookup("snapshot", True)
+    registry.cache_lookup("snapshot", True)
+    registry.cache_lookup("snapshot", False)
+    assert registry.snapshot()["caches"]["snapshot"]["hit_ratio"] == 2 / 3
+
+
+def test_server_stats_reports_tool_latency():
+    """server_stats exposes per-tool counts, latency and detector state."""
+    async def run():
+        await call_tool("get_command_syntax", {"intent": "list_files"})
+        await call_tool("get_command_syntax", {"intent": "list_files"})
+        return await call_tool("server_stats", {"reset": True})
+    
+    stats = json.loads(anyio.run(run)[0].text)
+    assert stats["counters"]["tool.get_command_syntax.calls"] >= 2
+    assert stats["histograms"]["tool.get_command_syntax"]["count"] >= 2
+    assert stats["caches"]["response"]["hit"] >= 1
+    assert "snapshots" in stats["state"]["detector"]
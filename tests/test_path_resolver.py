@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the in-process PATH resolver.
+"""
+
+import os
+import stat
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from dev_environment_mcp.pathresolver import PathResolver, IS_WINDOWS
+
+
+def _make_tool(directory: Path, name: str) -> Path:
+    """Create an executable file in directory."""
+    if IS_WINDOWS:
+        name += ".exe"
+    tool = directory / name
+    tool.write_text("#!/bin/sh\n")
+    tool.chmod(tool.stat().st_mode | stat.S_IXUSR)
+    return tool
+
+
+def test_which_finds_tools_in_path_order(tmp_path, monkeypatch):
+    """The first PATH directory containing the tool wins."""
+    first, second = tmp_path / "a", tmp_path / "b"
+    first.mkdir()
+    second.mkdir()
+    _make_tool(second, "mytool")
+    expected = _make_tool(first, "mytool")
+    monkeypatch.setenv("PATH", os.pathsep.join([str(first), str(second)]))
+    
+    resolver = PathResolver()
+    assert resolver.which("mytool") == str(expected)
+    assert not resolver.exists("missing-tool")
+
+
+def test_directory_rescanned_when_mtime_changes(tmp_path, monkeypatch):
+    """New executables are picked up once the directory mtime moves."""
+    monkeypatch.setenv("PATH", str(tmp_path))
+    resolver = PathResolver(recheck_interval=0)
+    assert not resolver.exists("newtool")
+    
+    _make_tool(tmp_path, "newtool")
+    os.utime(tmp_path, ns=(0, tmp_path.stat().st_mtime_ns + 1_000_000_000))
+    assert resolver.exists("newtool")
+
+
+@pytest.mark.skipif(IS_WINDOWS, reason="execute bit is POSIX only")
+def test_non_executable_files_are_ignored(tmp_path, monkeypatch):
+    """Plain files on PATH are not reported as commands."""
+    (tmp_path / "notatool").write_text("data")
+    monkeypatch.setenv("PATH", str(tmp_path))
+    assert not PathResolver().exists("notatool")
+
+
+def test_persisted_index_skips_rescan(tmp_path, monkeypatch):
+    """A new resolver reuses the persisted listing while mtimes match."""
+    monkeypatch.setenv("DEV_ENV_MCP_CACHE_DIR", str(tmp_path / "cache"))
+    bindir = tmp_path / "bin"
+    bindir.mkdir()
+    _make_tool(bindir, "cachedtool")
+    monkeypatch.setenv("PATH", str(bindir))
+    assert PathResolver(persist=True).exists("cachedtool")
+    
+    scanned = []
+    real_scandir = os.scandir
+    monkeypatch.setattr(os, "scandir", lambda p: scanned.append(p) or real_scandir(p))
+    assert PathResolver(persist=True).exists("cachedtool")
+    assert scanned == []
+    
+    monkeypatch.setenv("PATH", os.pathsep.join([str(bindir), str(tmp_path)]))
+    assert PathResolver(persist=True).exists("cachedtool")
+    assert scanned
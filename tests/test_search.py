@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Tests for the ignore-aware parallel file search and the search_files tool.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import anyio
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from dev_environment_mcp.search import FileSearcher, IgnoreRules, is_ignored
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / "ws"
+    for rel in ("src/app.py", "src/pkg/util.py", "src/pkg/gen_pb2.py", "docs/conf.py",
+                "build/out.py", "node_modules/dep/index.py", ".hidden/secret.py",
+                "logs/keep.py", "logs/drop.py", "README.md"):
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("")
+    (root / ".gitignore").write_text("# build output\n/build/\nlogs/*\n!logs/keep.py\n")
+    (root / "src" / "pkg" / ".gitignore").write_text("*_pb2.py\n")
+    return root
+
+
+def test_ignore_rules_follow_gitignore_semantics():
+    root = IgnoreRules("", ["*.log", "/dist/", "docs/**/tmp", "!keep.log"])
+    nested = IgnoreRules("sub", ["*.txt"])
+    chain = (root, nested)
+    assert is_ignored(chain, "a/b/x.log", False)
+    assert not is_ignored(chain, "a/keep.log", False)
+    assert is_ignored(chain, "dist", True)
+    assert not is_ignored(chain, "dist", False)
+    assert not is_ignored(chain, "a/dist", True)
+    assert is_ignored(chain, "docs/tmp", True)
+    assert is_ignored(chain, "docs/x/y/tmp", True)
+    assert is_ignored(chain, "sub/deep/notes.txt", False)
+    assert not is_ignored(chain, "notes.txt", False)
+
+
+def test_search_prunes_ignored_vendor_and_hidden(tree):
+    result = FileSearcher(max_workers=4).search(str(tree), "*.py")
+    assert result["matches"] == ["docs/conf.py", "logs/keep.py", "src/app.py",
+                                 "src/pkg/util.py"]
+    assert not result["truncated"]
+
+    hidden = FileSearcher().search(str(tree), "*.py", include_hidden=True)
+    assert ".hidden/secret.py" in hidden["matches"]
+
+
+def test_path_patterns_limits_and_chunks(tree):
+    searcher = FileSearcher()
+    assert searcher.search(str(tree), "src/**/*.py")["matches"] == ["src/app.py",
+                                                                     "src/pkg/util.py"]
+
+    chunks = []
+    result = searcher.search(str(tree), "*.py", max_results=3,
+                             on_chunk=lambda found, paths: chunks.append((found, paths)),
+                             chunk_size=2)
+    assert result["count"] == 3 and result["truncated"]
+    assert [found for found, _ in chunks][-1] == 3
+    assert sorted(p for _, paths in chunks for p in paths) == result["matches"]
+
+
+def test_invalid_pattern_is_a_value_error(tree):
+    with pytest.raises(ValueError, match="Invalid pattern"):
+        FileSearcher().search(str(tree), "[z-a]")
+
+
+def test_subdirectory_search_honours_repository_ignores(tree):
+    (tree / ".git" / "info").mkdir(parents=True)
+    (tree / ".git" / "info" / "exclude").write_text("src/app.py\n")
+    (tree / "src" / ".gitignore").write_text("/pkg/util.py\n")
+    searcher = FileSearcher()
+    assert searcher.search(str(tree / "src"), "*.py")["matches"] == []
+    assert searcher.search(str(tree / "src" / "pkg"), "*.py")["matches"] == []
+    assert searcher.search(str(tree / "logs"), "*.py")["matches"] == ["keep.py"]
+
+
+def test_search_files_streams_progress(tree):
+    """Matches arrive as progress notifications before the tool result."""
+    from mcp.shared.memory import create_connected_server_and_client_session
+    from dev_environment_mcp import server
+
+    progress = []
+
+    async def on_progress(found, total, message):
+        progress.append((found, message.splitlines()))
+
+    async def run():
+        async with create_connected_server_and_client_session(server.app) as client:
+            return await client.call_tool(
+                "search_files", {"pattern": "*.py", "workspace_path": str(tree)},
+                progress_callback=on_progress)
+
+    result = anyio.run(run)
+    payload = json.loads(result.content[0].text)
+    assert payload["count"] == 4
+    assert progress and progress[-1][0] == 4
+    assert sorted(p for _, paths in progress for p in paths) == payload["matches"]
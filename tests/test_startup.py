@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Tests for the lightweight package import and CLI fast paths.
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).parent.parent / "src"
+
+
+def _run_python(*args):
+    env = dict(os.environ, PYTHONPATH=str(SRC_DIR))
+    return subprocess.run([sys.executable, *args], capture_output=True,
+                          text=True, env=env, timeout=30)
+
+
+def test_package_import_does_not_load_server():
+    """Importing the package must not pull in the server or mcp."""
+    result = _run_python("-c", (
+        "import sys, dev_environment_mcp; "
+        "print(any(m == 'mcp' or m.startswith('dev_environment_mcp.') for m in sys.modules))"
+    ))
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "False"
+
+
+def test_version_and_health_check():
+    """The fast CLI paths answer without starting the server."""
+    version = _run_python("-m", "dev_environment_mcp", "--version")
+    assert version.returncode == 0
+    assert version.stdout.startswith("dev-env-copilot ")
+    
+    health = _run_python("-m", "dev_environment_mcp", "--health-check")
+    assert health.returncode == 0, health.stderr
+    assert health.stdout.strip() == "OK"
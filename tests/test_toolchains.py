@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Tests for cached, concurrent toolchain version probes.
+"""
+
+import os
+import shutil
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from dev_environment_mcp.metrics import metrics
+from dev_environment_mcp.pathresolver import PathResolver
+from dev_environment_mcp.toolchains import ToolchainProber, ToolSpec, parse_version
+
+SLEEP = shutil.which("sleep")
+
+pytestmark = pytest.mark.skipif(sys.platform.startswith("win"),
+                                reason="uses shell scripts as fake tools")
+
+
+@pytest.fixture
+def bin_dir(tmp_path, monkeypatch):
+    """A PATH containing only fake tools."""
+    directory = tmp_path / "bin"
+    directory.mkdir()
+    monkeypatch.setenv("PATH", str(directory))
+    monkeypatch.setenv("DEV_ENV_MCP_CACHE_DIR", str(tmp_path / "cache"))
+    return directory
+
+
+def _tool(directory, name, body):
+    path = directory / name
+    path.write_text(f"#!/bin/sh\n{body}\n")
+    path.chmod(0o755)
+    return path
+
+
+def _spawned():
+    return metrics.snapshot()["counters"].get("subprocess.spawned", 0)
+
+
+def test_parse_version():
+    assert parse_version("Python 3.11.7") == "3.11.7"
+    assert parse_version("go version go1.21.6 linux/amd64") == "1.21.6"
+    assert parse_version("no version here") is None
+
+
+def test_versions_are_cached_until_the_binary_changes(bin_dir):
+    """A second probe spawns nothing; replacing the binary re-probes it."""
+    tool = _tool(bin_dir, "faketool", "echo 'faketool 1.2.3'")
+    tools = (ToolSpec("fake", ("missing", "faketool")),)
+    prober = ToolchainProber(PathResolver(recheck_interval=0), tools=tools)
+    
+    found = prober.probe()
+    assert found == {"fake": {"command": "faketool", "path": str(tool), "version": "1.2.3"}}
+    assert "subprocess.faketool" in metrics.snapshot()["histograms"]
+    spawned = _spawned()
+    assert prober.probe()["fake"]["version"] == "1.2.3"
+    assert _spawned() == spawned
+    
+    # A fresh prober reuses the persisted result
+    restarted = ToolchainProber(PathResolver(recheck_interval=0), tools=tools)
+    assert restarted.probe()["fake"]["version"] == "1.2.3"
+    assert _spawned() == spawned
+    
+    _tool(bin_dir, "faketool", "echo 'faketool 2.0.0'")
+    os.utime(tool, ns=(0, tool.stat().st_mtime_ns + 1_000_000_000))
+    assert prober.probe()["fake"]["version"] == "2.0.0"
+
+
+def test_probes_run_concurrently_with_timeouts(bin_dir):
+    """Slow tools run in parallel and a hung one times out without a version."""
+    for i in range(4):
+        _tool(bin_dir, f"slow{i}", f"{SLEEP} 0.3; echo 'slow {i}.0'")
+    _tool(bin_dir, "hangs", f"{SLEEP} 5")
+    tools = tuple(ToolSpec(f"slow{i}", (f"slow{i}",)) for i in range(4))
+    tools += (ToolSpec("hangs", ("hangs",)),)
+    prober = ToolchainProber(PathResolver(), timeout=0.5, persist=False, tools=tools)
+    
+    started = time.perf_counter()
+    found = prober.probe()
+    elapsed = time.perf_counter() - started
+    
+    assert [found[f"slow{i}"]["version"] for i in range(4)] == ["0.0", "1.0", "2.0", "3.0"]
+    assert found["hangs"]["version"] is None
+    assert elapsed < 2.0
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Tests for request tracing spans and the rotating JSONL exporter.
+"""
+
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+import anyio
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from dev_environment_mcp.environment import EnvironmentDetector
+from dev_environment_mcp.tracing import Tracer, tracer
+
+
+def _read_spans(path):
+    return [json.loads(line) for line in Path(path).read_text().splitlines()]
+
+
+def test_disabled_tracer_returns_shared_noop():
+    """With no trace file, span() allocates nothing and records nothing"""
+    disabled = Tracer()
+    first = disabled.span("a", x=1)
+    assert first is disabled.span("b")
+    with first as span:
+        span.set("ignored", True)
+
+
+def test_probe_spans_nest_under_detection(tmp_path):
+    """Probes running in worker threads are children of the detect span"""
+    trace_file = tmp_path / "trace.jsonl"
+    tracer.configure(str(trace_file))
+    try:
+        async def run():
+            with tracer.span("tool.detect_environment"):
+                await EnvironmentDetector(cache_ttl=0).detect_environment_async(str(tmp_path))
+        anyio.run(run)
+        tracer.flush()
+    finally:
+        tracer.configure(None)
+    
+    spans = {span["name"]: span for span in _read_spans(trace_file)}
+    root = spans["tool.detect_environment"]
+    assert root["parent_id"] is None
+    assert spans["detect"]["parent_id"] == root["span_id"]
+    assert spans["detect"]["attrs"]["source"] == "probes"
+    for name in ("probe.docker", "probe.git", "probe.workspace"):
+        assert spans[name]["parent_id"] == spans["detect"]["span_id"]
+        assert spans[name]["trace_id"] == root["trace_id"]
+    assert spans["workspace.index"]["parent_id"] == spans["probe.workspace"]["span_id"]
+
+
+def test_trace_file_rotates(tmp_path):
+    """The file is shifted to .1, .2 ... once it would exceed max_bytes"""
+    trace_file = tmp_path / "trace.jsonl"
+    local = Tracer()
+    local.configure(str(trace_file), max_bytes=400, backups=2, flush_interval=0)
+    for i in range(20):
+        with local.span("work", i=i):
+            pass
+    local.flush()
+    
+    assert trace_file.exists()
+    assert (tmp_path / "trace.jsonl.1").exists()
+    assert (tmp_path / "trace.jsonl.2").exists()
+    assert not (tmp_path / "trace.jsonl.3").exists()
+    assert trace_file.stat().st_size <= 400
+
+
+def test_spans_are_written_by_the_writer_thread(tmp_path):
+    """Ending a root span only wakes the writer; it never writes inline"""
+    trace_file = tmp_path / "trace.jsonl"
+    local = Tracer()
+    local.configure(str(trace_file), flush_interval=0)
+    writers = []
+    write_buffered = local._write_buffered
+
+    def record_writer():
+        writers.append(threading.current_thread().name)
+        write_buffered()
+
+    local._write_buffered = record_writer
+    with local.span("work"):
+        pass
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline and not (
+            trace_file.exists() and trace_file.stat().st_size):
+        time.sleep(0.01)
+
+    assert [span["name"] for span in _read_spans(trace_file)] == ["work"]
+    assert writers and set(writers) == {"trace-writer"}
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Unit tests for workspace change watching.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from dev_environment_mcp.watcher import (
+    InotifyBackend, PollingBackend, WorkspaceWatcher, create_backend,
+)
+from dev_environment_mcp.workspace import WorkspaceIndexer
+
+
+def _bump_mtime(path: Path) -> None:
+    """Move a directory mtime forward so polling notices the change."""
+    os.utime(path, ns=(0, path.stat().st_mtime_ns + 1_000_000_000))
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    root = tmp_path / "ws"
+    (root / "app").mkdir(parents=True)
+    (root / "lib").mkdir()
+    return root
+
+
+@pytest.mark.parametrize("backend_factory", [
+    lambda: PollingBackend(interval=0),
+    pytest.param(create_backend, marks=pytest.mark.skipif(
+        not InotifyBackend.available(), reason="inotify is Linux only")),
+])
+def test_indexer_rescans_only_changed_directory(workspace, backend_factory):
+    """After the first walk only reported directories are re-listed."""
+    watcher = WorkspaceWatcher(backend=backend_factory())
+    indexer = WorkspaceIndexer(persist=False, watcher=watcher)
+    try:
+        assert indexer.index(str(workspace)).rescanned == 3
+        assert not indexer.is_stale(str(workspace))
+        assert indexer.index(str(workspace)).rescanned == 0
+        
+        (workspace / "app" / "package.json").write_text("{}")
+        _bump_mtime(workspace / "app")
+        assert indexer.is_stale(str(workspace))
+        
+        index = indexer.index(str(workspace))
+        assert index.rescanned == 1
+        assert [p["path"] for p in index.projects()] == ["app"]
+    finally:
+        watcher.close()
+
+
+def test_watch_budget_evicts_least_recently_used(tmp_path):
+    """Adding a workspace over budget drops the oldest watched one."""
+    roots = []
+    for name in ("a", "b", "c"):
+        (tmp_path / name / "sub").mkdir(parents=True)
+        roots.append(str(tmp_path / name))
+    watcher = WorkspaceWatcher(backend=PollingBackend(interval=0), max_watches=4)
+    dirs = {".": 0, "sub": 0}
+    
+    assert watcher.watch(roots[0], dirs)
+    assert watcher.watch(roots[1], dirs)
+    watcher.changes(roots[0])  # touch a, making b the LRU entry
+    assert watcher.watch(roots[2], dirs)
+    
+    assert watcher.is_watched(roots[0])
+    assert not watcher.is_watched(roots[1])
+    assert watcher.is_watched(roots[2])
+    assert watcher.watch_count == 4
+    assert not watcher.watch(roots[1], {".": 0, "sub": 0, "x": 0, "y": 0, "z": 0})
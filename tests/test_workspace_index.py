@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the recursive workspace project index.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from dev_environment_mcp import cache, workspace
+from dev_environment_mcp.workspace import WorkspaceIndexer
+
+
+@pytest.fixture
+def monorepo(tmp_path):
+    """A small monorepo with nested packages and directories to prune."""
+    root = tmp_path / "repo"
+    (root / "packages" / "web").mkdir(parents=True)
+    (root / "packages" / "api").mkdir(parents=True)
+    (root / "node_modules" / "dep").mkdir(parents=True)
+    (root / ".venv").mkdir()
+    (root / "package.json").write_text("{}")
+    (root / "packages" / "web" / "package.json").write_text("{}")
+    (root / "packages" / "api" / "pyproject.toml").write_text("")
+    (root / "node_modules" / "dep" / "package.json").write_text("{}")
+    return root
+
+
+def test_index_records_nested_projects(monorepo):
+    """Every sub-project is found and vendor/hidden dirs are pruned."""
+    index = WorkspaceIndexer().index(str(monorepo))
+    
+    assert index.project_type == "nodejs"
+    projects = {p["path"]: p["type"] for p in index.projects()}
+    assert projects == {
+        ".": "nodejs",
+        "packages/api": "python",
+        "packages/web": "nodejs",
+    }
+
+
+def test_rescan_only_lists_changed_directories(monorepo):
+    """Unchanged directories are reused; a changed one is re-listed."""
+    indexer = WorkspaceIndexer()
+    assert indexer.index(str(monorepo)).rescanned > 0
+    assert indexer.index(str(monorepo)).rescanned == 0
+    
+    api = monorepo / "packages" / "api"
+    (api / "Dockerfile").write_text("FROM scratch\n")
+    os.utime(api, ns=(0, api.stat().st_mtime_ns + 1_000_000_000))
+    index = indexer.index(str(monorepo))
+    assert index.rescanned == 1
+    assert "Dockerfile" in index.dirs["packages/api"].markers
+
+
+def test_index_is_persisted(monorepo):
+    """A fresh indexer reuses the persisted index instead of re-listing."""
+    WorkspaceIndexer().index(str(monorepo))
+    index = WorkspaceIndexer().index(str(monorepo))
+    assert index.rescanned == 0
+    assert len(index.projects()) == 3
+
+
+def test_persisted_indexes_are_capped(tmp_path, monkeypatch):
+    """Only the most recently saved indexes stay on disk."""
+    monkeypatch.setattr(workspace, "MAX_PERSISTED_INDEXES", 2)
+    indexer = WorkspaceIndexer()
+    for i in range(4):
+        (tmp_path / f"ws{i}").mkdir()
+        indexer.index(str(tmp_path / f"ws{i}"))
+    kept = sorted(p.name for p in cache.cache_dir().glob("index-*.json"))
+    assert kept == sorted(WorkspaceIndexer._cache_name(str(tmp_path / f"ws{i}"))
+                          for i in (2, 3))
+
+
+def test_package_managers_come_from_lockfiles(monorepo):
+    """Lockfiles are picked up by the same scan and survive persistence."""
+    (monorepo / "pnpm-lock.yaml").write_text("")
+    api = monorepo / "packages" / "api"
+    (api / "poetry.lock").write_text("")
+    (api / "requirements-dev.txt").write_text("")
+    WorkspaceIndexer().index(str(monorepo))
+    
+    index = WorkspaceIndexer().index(str(monorepo))
+    assert index.rescanned == 0
+    assert index.package_managers == {"node": "pnpm"}
+    managers = {p["path"]: p["package_managers"] for p in index.projects()}
+    assert managers == {
+        ".": {"node": "pnpm"},
+        "packages/api": {"python": "poetry"},
+        "packages/web": {"node": "npm"},
+    }